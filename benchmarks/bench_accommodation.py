@@ -0,0 +1,145 @@
+"""
+숙소 선택(select_best_accommodation) 벤치마크: 기존 구현 vs 가격 정렬 인덱스 구현
+
+- legacy : 선호 숙소마다 위치 dict 조회 → 가격/예산 확인 → 클러스터 중심 배열과 평균을 매번 다시 계산
+- index  : 지역 AccommodationIndex (가격 컬럼별 오름차순) 에서 예산 안의 숙소만 searchsorted로 잘라
+           mask로 선호 숙소와 맞춘 뒤 중심 1회 + 거리/점수 배열 연산
+강릉 위치 데이터를 메모리에서 복제(id 오프셋 + 좌표 이동)해 숙소 수를 늘려 가며
+유저(선호 숙소 top-k) × 여행 일수 × 예산 × 가격 컬럼 조합에서 두 구현의 선택/점수가 같은지 확인합니다.
+
+사용법:
+    python benchmarks/bench_accommodation.py [--scales 1 20] [--users 10] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(PLANNING_DIR))
+
+import clustering  # noqa: E402
+from bench_trip_length import synthetic_prefs  # noqa: E402
+from softmax import CONFIG as SOFTMAX_CONFIG  # noqa: E402
+
+ID_STRIDE = 1_000_000  # 복제본마다 place id 오프셋
+BUDGETS = [100000, 200000, 400000, 800000]  # 1일 예산 (총 예산 = 1일 예산 × N)
+DAYS = [2, 3, 5]
+
+
+def legacy_select_best_accommodation(user_prefs, clusters, location_dict, budget, duration_days,
+                                     price_field="offpeak_weekend_price"):
+    if duration_days <= 1:
+        return None, None
+    accs = user_prefs.get("Accommodation", [])
+    total_acc_budget = budget * 0.5
+    candidates = []
+    for acc in accs:
+        aid = acc["id"]
+        if aid not in location_dict:
+            continue
+        loc = location_dict[aid]
+        price = loc.get(price_field, np.nan)
+        if pd.isna(price):
+            price = loc.get("avg_price", np.nan)
+        if pd.isna(price):
+            continue
+        total_cost = price * (duration_days - 1)
+        if total_cost > total_acc_budget:
+            continue
+        coords = np.array([[c["center_lat"], c["center_lng"]] for c in clusters])
+        mean = coords.mean(axis=0)
+        dist = clustering.haversine_vectorized(loc["latitude"], loc["longitude"], mean[0], mean[1])
+        score = clustering.CONFIG["PREFERENCE_WEIGHT"] * acc["final_score"] + (1 - clustering.CONFIG["PREFERENCE_WEIGHT"]) * (1 / (1 + dist))
+        candidates.append({"id": aid, "name": loc["name"], "score": score})
+    if not candidates:
+        return None, None
+    best = max(candidates, key=lambda x: x["score"])
+    return best["id"], best["score"]
+
+
+def scale_locations(location_dict, scale):
+    """위치 dict를 scale배 복제 (복제본마다 id 오프셋, 위도 0.01도씩 이동)"""
+    scaled = {}
+    for k in range(scale):
+        for pid, loc in location_dict.items():
+            scaled[pid + k * ID_STRIDE] = dict(loc, latitude=loc["latitude"] + 0.01 * k)
+    return scaled
+
+
+def synthetic_clusters(location_dict, rng, n):
+    """하루 1개 클러스터 중심 (장소 좌표 중 무작위)"""
+    locs = list(location_dict.values())
+    picks = rng.choice(len(locs), size=n, replace=False)
+    return [{"center_lat": locs[i]["latitude"], "center_lng": locs[i]["longitude"]} for i in picks]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="숙소 선택 기존 vs 가격 정렬 인덱스")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 20], help="강릉 위치 데이터 복제 배수")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=SOFTMAX_CONFIG["TOP_K"], help="유저별 선호 숙소 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    base_locations = clustering.place_locations()
+    rng = np.random.default_rng(args.seed)
+
+    rows, mismatches, max_diff = [], 0, 0.0
+    for scale in args.scales:
+        locations = scale_locations(base_locations, scale)
+        t = time.perf_counter()
+        index = clustering.AccommodationIndex.from_locations(locations)
+        build_ms = (time.perf_counter() - t) * 1000
+        users = [synthetic_prefs(locations, rng, args.top_k) for _ in range(args.users)]
+
+        legacy_times, index_times = [], []
+        for prefs in users:
+            for days in DAYS:
+                clusters = synthetic_clusters(locations, rng, days)
+                for per_day in BUDGETS:
+                    for price_key in clustering.PRICE_COLUMNS:
+                        budget = per_day * days
+                        t = time.perf_counter()
+                        old = legacy_select_best_accommodation(prefs, clusters, locations, budget, days,
+                                                               price_field=f"{price_key}_price")
+                        legacy_times.append(time.perf_counter() - t)
+                        t = time.perf_counter()
+                        new = clustering.select_best_accommodation(prefs, clusters, locations, budget, days,
+                                                                   price_key=price_key, index=index)
+                        index_times.append(time.perf_counter() - t)
+                        if old[0] != new[0]:
+                            mismatches += 1
+                        elif old[1] is not None:
+                            max_diff = max(max_diff, abs(old[1] - new[1]))
+
+        rows.append({"scale": scale, "accommodations": len(index.ids), "index_build_ms": round(build_ms, 2),
+                     "legacy_ms": round(statistics.median(legacy_times) * 1000, 3),
+                     "index_ms": round(statistics.median(index_times) * 1000, 3),
+                     "calls": len(index_times)})
+
+    print(f"\n[RESULT] users={args.users}, top-k={args.top_k}, 일수 {DAYS} × 1일 예산 {BUDGETS} × 가격 컬럼 {len(clustering.PRICE_COLUMNS)}개")
+    print(f"{'scale':>6}{'숙소':>8}{'index build(ms)':>17}{'legacy(ms)':>12}{'index(ms)':>11}{'speedup':>9}")
+    for r in rows:
+        speedup = r["legacy_ms"] / r["index_ms"] if r["index_ms"] else float("inf")
+        print(f"{r['scale']:>6}{r['accommodations']:>8}{r['index_build_ms']:>17}{r['legacy_ms']:>12}{r['index_ms']:>11}{speedup:>8.1f}x")
+    print(f"[RESULT] 선택 불일치 {mismatches}건, 최대 점수 차이 {max_diff:.3g}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"rows": rows, "mismatches": mismatches, "max_abs_diff": max_diff}, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+    if mismatches or max_diff > 1e-12:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+hybrid 대안 플랜 K개 벤치마크: 처음부터 K번 다시 만들기 vs 공유 구조로 한 번에 (alternatives.build_hybrid_alternatives)
+
+점수 계산(softmax) 이후 단계만 비교합니다 (점수 계산까지 K번 하면 파이프라인 K번, 유저당 수 초).
+- scratch : 대안마다 감점한 점수로 클러스터링 입력 df / BallTree 새로 만들기 → 클러스터링 → 숙소 → hybrid 일정
+- shared  : df / BallTree / seed 반경 검색 캐시 / 숙소 가격 인덱스를 대안끼리 공유
+두 방식의 플랜이 같은지, 1번 플랜이 기존 단일 hybrid 플랜과 같은지, 대안별 새 장소 비율과 평균 점수도 확인합니다.
+
+사용법:
+    python benchmarks/bench_alternatives.py [--users 10] [--k 3] [--days 2 3 5] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(PLANNING_DIR))
+
+import clustering  # noqa: E402
+from alternatives import (DIVERSITY_PENALTIES, MIN_NEW_FRACTION, build_hybrid_alternatives,  # noqa: E402
+                          new_fraction, plan_place_ids)
+from bench_trip_length import TEMPLATES, synthetic_prefs  # noqa: E402
+from catalog import load_place_catalog  # noqa: E402
+from input import expand_itinerary  # noqa: E402
+from schedule_builder import build_hybrid_schedule, food_budget  # noqa: E402
+from softmax import CONFIG as SOFTMAX_CONFIG  # noqa: E402
+
+
+def penalized_prefs(prefs, seen, penalty):
+    """이전 플랜 장소 점수 감점 (1.0이면 제외)"""
+    out = {}
+    for cat, places in prefs.items():
+        if cat == "Accommodation":
+            out[cat] = places
+            continue
+        kept = []
+        for p in places:
+            if p["id"] in seen:
+                if penalty >= 1:
+                    continue
+                p = dict(p, final_score=p["final_score"] * (1 - penalty))
+            kept.append(p)
+        out[cat] = kept
+    return out
+
+
+def scratch_alternatives(template, place_data, prefs, locations, budget, days, food, k):
+    """대안마다 처음부터 (df / BallTree / 반경 검색 / 숙소 인덱스 재생성)"""
+    def build(user_prefs):
+        df = clustering.extract_all_user_places(user_prefs, locations)
+        clusters = clustering.greedy_clustering_optimized(df, clustering.build_spatial_indices(df), days, budget)
+        acc_id, acc_score = clustering.select_best_accommodation(prefs, clusters, locations, budget, days)
+        return build_hybrid_schedule(template, place_data, {"clusters": clusters, "Accommodation": acc_id}, food)
+
+    plans = [build(prefs)]
+    seen = plan_place_ids(plans[0])
+    while len(plans) < k:
+        for penalty in DIVERSITY_PENALTIES:
+            plan = build(penalized_prefs(prefs, seen, penalty))
+            if new_fraction(plan, seen) >= MIN_NEW_FRACTION:
+                break
+        else:
+            break
+        plans.append(plan)
+        seen |= plan_place_ids(plan)
+    return plans
+
+
+def mean_score(plan, score_by_id):
+    ids = plan_place_ids(plan)
+    return statistics.mean(score_by_id.get(pid, 0.0) for pid in ids) if ids else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="hybrid 대안 플랜 K개: 처음부터 vs 공유 구조")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--days", type=int, nargs="+", default=[2, 3, 5])
+    parser.add_argument("--budget", type=int, default=150000, help="1일 예산")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    locations = clustering.place_locations()
+    acc_index = clustering.accommodation_index()
+    place_data = load_place_catalog()
+    templates = []
+    for name in TEMPLATES:
+        with open(PLANNING_DIR / "templates" / name, "r", encoding="utf-8") as f:
+            templates.append(json.load(f))
+    rng = np.random.default_rng(args.seed)
+    users = [synthetic_prefs(locations, rng, SOFTMAX_CONFIG["TOP_K"]) for _ in range(args.users)]
+    import sklearn.neighbors  # noqa: F401  첫 측정의 import 시간 제외
+
+    rows, mismatches = [], 0
+    for days in args.days:
+        scratch_times, shared_times, single_times = [], [], []
+        produced, fractions, score_ratio = [], [], []
+        for u, prefs in enumerate(users):
+            template = dict(templates[u % len(templates)])
+            template["itinerary"] = expand_itinerary(template["itinerary"], days)
+            budget, food = args.budget * days, food_budget(args.budget)
+
+            t = time.perf_counter()
+            df = clustering.extract_all_user_places(prefs, locations)
+            clusters = clustering.greedy_clustering_optimized(df, clustering.build_spatial_indices(df), days, budget)
+            acc_id, _ = clustering.select_best_accommodation(prefs, clusters, locations, budget, days, index=acc_index)
+            single = build_hybrid_schedule(template, place_data, {"clusters": clusters, "Accommodation": acc_id}, food)
+            single_times.append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            scratch = scratch_alternatives(template, place_data, prefs, locations, budget, days, food, args.k)
+            scratch_times.append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            shared = build_hybrid_alternatives(template, place_data, prefs, locations, budget, days, food, args.k,
+                                               acc_index=acc_index)
+            shared_times.append(time.perf_counter() - t)
+
+            shared_plans = [alt["days"] for alt in shared]
+            if shared_plans != scratch or shared_plans[0] != single:
+                mismatches += 1
+                print(f"[MISMATCH] user={u} days={days}: 공유/처음부터 플랜이 다릅니다")
+            produced.append(len(shared))
+            fractions.extend(alt["new_fraction"] for alt in shared[1:])
+            score_by_id = {p["id"]: p["final_score"] for places in prefs.values() for p in places}
+            base = mean_score(shared_plans[0], score_by_id)
+            score_ratio.extend(mean_score(p, score_by_id) / base for p in shared_plans[1:] if base)
+
+        rows.append({
+            "days": days,
+            "single_ms": round(statistics.median(single_times) * 1000, 2),
+            "scratch_ms": round(statistics.median(scratch_times) * 1000, 2),
+            "shared_ms": round(statistics.median(shared_times) * 1000, 2),
+            "plans": round(statistics.mean(produced), 2),
+            "min_new_fraction": round(min(fractions), 3) if fractions else None,
+            "score_ratio": round(statistics.mean(score_ratio), 3) if score_ratio else None
+        })
+
+    print(f"\n[RESULT] users={args.users}, K={args.k}, 최소 새 장소 비율 {MIN_NEW_FRACTION} (유저별 중앙값, ms)")
+    print(f"{'days':>5}{'single':>9}{'scratch':>10}{'shared':>9}{'plans':>7}{'min new':>9}{'score ratio':>13}")
+    for r in rows:
+        print(f"{r['days']:>5}{r['single_ms']:>9}{r['scratch_ms']:>10}{r['shared_ms']:>9}{r['plans']:>7}"
+              f"{str(r['min_new_fraction']):>9}{str(r['score_ratio']):>13}")
+    print("[RESULT] single: 플랜 1개, score ratio: 대안 플랜 평균 점수 / 1번 플랜 평균 점수")
+    print(f"[RESULT] 공유/처음부터 플랜 불일치 {mismatches}건")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"k": args.k, "rows": rows, "mismatches": mismatches}, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
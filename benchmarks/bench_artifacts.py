@@ -0,0 +1,121 @@
+"""
+중간 점수 파일 형식 벤치마크: JSON (기존, indent=2) vs npz (카테고리별 id/점수 배열)
+
+카탈로그 id로 softmax 결과와 같은 모양의 점수 파일(카테고리 4개 × top-k, 점수 내림차순)을 만들어
+형식별로 다음을 측정합니다.
+- size  : 파일 크기
+- write : save_scores 저장 시간
+- load  : load_scores 읽기 시간 (JSON은 파싱 + 배열 변환 포함)
+- use   : 읽기 + 클러스터링 입력 구성(extract_all_user_places) + 숙소 후보 배열 (다음 단계가 실제로 쓰는 만큼)
+두 형식으로 읽은 id / 점수가 원본과 같은지도 확인합니다.
+
+사용법:
+    python benchmarks/bench_artifacts.py [--top-k 300 4000] [--repeat 20] [--json out.json]
+"""
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(PLANNING_DIR))
+
+from artifacts import FORMATS, artifact_path, load_scores, save_scores, score_arrays  # noqa: E402
+from catalog import load_review_counts  # noqa: E402
+from clustering import extract_all_user_places, place_locations  # noqa: E402
+
+
+def synthetic_scores(catalog_ids, rng, top_k):
+    """카테고리별 {"id", "final_score"} 목록 (전체 정밀도 점수, 내림차순)"""
+    data = {}
+    for cat, ids in catalog_ids.items():
+        chosen = rng.choice(ids, size=top_k, replace=top_k > len(ids))
+        scores = np.sort(rng.random(top_k))[::-1]
+        data[cat] = [{"id": int(pid), "final_score": float(s)} for pid, s in zip(chosen, scores)]
+    return data
+
+
+def median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="점수 파일 JSON vs npz 크기/읽기 시간")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[300, 4000], help="카테고리별 장소 수")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    catalog_ids = {cat: ids for cat, (ids, _) in load_review_counts().items()}
+    locations = place_locations()
+    rng = np.random.default_rng(args.seed)
+    work_dir = Path(tempfile.mkdtemp(prefix="hci_bench_artifacts_"))
+
+    rows = []
+    mismatches = 0
+    try:
+        for top_k in args.top_k:
+            data = synthetic_scores(catalog_ids, rng, top_k)
+            for fmt in FORMATS:
+                base = work_dir / f"{fmt}_{top_k}_recommendations_softmax.json"
+                write_ms = median_ms(lambda: save_scores(base, data, "final_score", fmt), args.repeat)
+                load_ms = median_ms(lambda: load_scores(base), args.repeat)
+
+                def use():
+                    scores = load_scores(base)
+                    extract_all_user_places(scores, locations)
+                    score_arrays(scores["Accommodation"], "final_score")
+
+                use_ms = median_ms(use, args.repeat)
+                loaded = load_scores(base)
+                for cat, places in data.items():
+                    ids, scores = score_arrays(places, "final_score")
+                    if not (np.array_equal(ids, loaded[cat].ids) and np.array_equal(scores, loaded[cat].scores)):
+                        mismatches += 1
+                rows.append({"top_k": top_k, "format": fmt, "size_kb": round(artifact_path(base, fmt).stat().st_size / 1024, 1),
+                             "write_ms": write_ms, "load_ms": load_ms, "use_ms": use_ms})
+
+        # 기존 코드 경로 기준: json.load 만 (배열 변환 없이 dict 리스트)
+        legacy = {}
+        for top_k in args.top_k:
+            path = artifact_path(work_dir / f"json_{top_k}_recommendations_softmax.json", "json")
+
+            def json_load():
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+            legacy[top_k] = median_ms(json_load, args.repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n[RESULT] 카테고리 {len(catalog_ids)}개, 중앙값 {args.repeat}회")
+    print(f"{'top_k':>6} {'format':<6}{'size(KB)':>10}{'write(ms)':>11}{'load(ms)':>10}{'use(ms)':>9}")
+    for r in rows:
+        print(f"{r['top_k']:>6} {r['format']:<6}{r['size_kb']:>10}{r['write_ms']:>11}{r['load_ms']:>10}{r['use_ms']:>9}")
+    for top_k, ms in legacy.items():
+        print(f"[RESULT] top_k={top_k} json.load만 (기존 읽기): {ms}ms")
+    print(f"[RESULT] 원본과 다른 카테고리 {mismatches}건")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"rows": rows, "json_load_ms": legacy, "mismatches": mismatches}, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
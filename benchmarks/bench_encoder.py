@@ -0,0 +1,185 @@
+"""
+인코더 백엔드 벤치마크 (torch FP32 vs ONNX int8)
+
+측정 항목 (백엔드별 별도 프로세스에서 측정):
+  - 모델 로드 시간, 로드 후 최대 RSS
+  - 쿼리 1건 인코딩 지연 (파이프라인과 같은 "키워드 join" 문장) p50/p95
+  - 배치 인코딩 처리량
+
+추천 결과 변화 확인:
+  장소 벡터는 기준 백엔드(torch)로 고정하고, 유저 쿼리만 각 백엔드로 인코딩해서
+  카테고리별 top-k 장소 집합의 겹침 비율(overlap@k)과 쿼리 벡터 코사인 유사도를 비교합니다.
+  (Weaviate에 저장된 장소 벡터는 그대로 두고 쿼리 인코더만 바꾸는 상황과 같음)
+  장소 텍스트는 카탈로그의 like 키워드 + description으로 근사합니다.
+
+사용법:
+    python benchmarks/bench_encoder.py [--backends torch onnx-int8] [--k 10] [--json out.json]
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(PLANNING_DIR))
+
+MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+
+# 유저 like 키워드 예시 (번역 후 형태)
+QUERY_SETS = [
+    ["Cultural heritage", "Scenic mountains", "Local food", "Trekking", "Cozy"],
+    ["Traditional culture experience", "Sea view", "Cost-effective price", "Photo spot", "Neat"],
+    ["Culture", "Park", "Dessert", "Shopping", "Luxury"],
+    ["History museum", "Quiet beach", "Seafood", "Surfing", "Clean room"],
+    ["Temple", "Forest walk", "Noodles", "Cycling", "Ocean view hotel"],
+    ["Art gallery", "Lake", "Coffee", "Hiking", "Family friendly"],
+    ["Palace", "Sunrise", "Tofu", "Water sports", "Pension"],
+    ["Festival", "Pine forest", "Bakery", "Rail bike", "Spa"],
+]
+
+
+def rss_mb():
+    """최대 RSS (MB, Linux 기준 ru_maxrss는 KB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def place_texts():
+    """카테고리별 장소 텍스트 (like 키워드 + description)"""
+    import pandas as pd
+    from catalog import SCHEDULE_FILES
+    from regions import DATA_SET_DIR
+
+    texts, cats = [], []
+    for cat, filename in SCHEDULE_FILES.items():
+        df = pd.read_csv(DATA_SET_DIR / filename)
+        for row in df.to_dict("records"):
+            parts = [row.get("like"), row.get("description")]
+            parts = [str(p) for p in parts if isinstance(p, str) and p]
+            texts.append(". ".join(parts) or str(row["name"]))
+            cats.append(cat)
+    return texts, np.array(cats)
+
+
+def run_child(backend, out_dir, repeat, encode_places):
+    """백엔드 1개 측정 (별도 프로세스에서 실행)"""
+    from encoders import load_encoder
+
+    rss_before = rss_mb()
+    t = time.perf_counter()
+    encoder = load_encoder(backend, MODEL_NAME)
+    load_s = time.perf_counter() - t
+    encoder.encode("warm up", convert_to_numpy=True)
+    rss_loaded = rss_mb()
+
+    queries = [" ".join(q) for q in QUERY_SETS]
+    latencies = []
+    for _ in range(repeat):
+        for q in queries:
+            t = time.perf_counter()
+            encoder.encode(q, convert_to_numpy=True)
+            latencies.append((time.perf_counter() - t) * 1000)
+    latencies.sort()
+
+    query_vecs = np.vstack([encoder.encode(q, convert_to_numpy=True) for q in queries]).astype(np.float32)
+    np.save(Path(out_dir) / f"queries_{backend}.npy", query_vecs)
+
+    batch = queries * 8
+    t = time.perf_counter()
+    encoder.encode(batch, convert_to_numpy=True)
+    batch_s = time.perf_counter() - t
+
+    if encode_places:
+        texts, _ = place_texts()
+        place_vecs = np.asarray(encoder.encode(texts, convert_to_numpy=True), dtype=np.float32)
+        np.save(Path(out_dir) / "places.npy", place_vecs)
+
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 3),
+        "rss_before_mb": round(rss_before, 1),
+        "rss_loaded_mb": round(rss_loaded, 1),
+        "rss_peak_mb": round(rss_mb(), 1),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        "batch_sentences_per_s": round(len(batch) / batch_s, 1),
+    }
+
+
+def normalize(m):
+    return m / np.clip(np.linalg.norm(m, axis=1, keepdims=True), 1e-12, None)
+
+
+def compare_topk(out_dir, base, other, k):
+    """카테고리별 top-k 겹침 비율"""
+    _, cats = place_texts()
+    places = normalize(np.load(Path(out_dir) / "places.npy"))
+    q_base = normalize(np.load(Path(out_dir) / f"queries_{base}.npy"))
+    q_other = normalize(np.load(Path(out_dir) / f"queries_{other}.npy"))
+
+    overlap = {}
+    for cat in sorted(set(cats)):
+        cat_vecs = places[cats == cat]
+        kk = min(k, len(cat_vecs))
+        scores = []
+        for qb, qo in zip(q_base, q_other):
+            top_b = set(np.argsort(-(cat_vecs @ qb), kind="stable")[:kk])
+            top_o = set(np.argsort(-(cat_vecs @ qo), kind="stable")[:kk])
+            scores.append(len(top_b & top_o) / kk)
+        overlap[cat] = round(float(np.mean(scores)), 4)
+    query_cos = float(np.mean(np.sum(q_base * q_other, axis=1)))
+    return {"k": k, "overlap_at_k": overlap, "mean_query_cosine": round(query_cos, 5)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인코더 백엔드 지연/메모리/추천 변화 비교")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx-int8"])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--out-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--encode-places", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.out_dir, args.repeat, args.encode_places)))
+        return
+
+    base = args.backends[0]
+    results = {"model": MODEL_NAME, "backends": [], "topk": {}}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for backend in args.backends:
+            cmd = [sys.executable, __file__, "--child", backend, "--out-dir", out_dir, "--repeat", str(args.repeat)]
+            if backend == base:
+                cmd.append("--encode-places")
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"[ERROR] {backend} 측정 실패:\n{proc.stderr[-1000:]}")
+                sys.exit(1)
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            results["backends"].append(r)
+            print(f"[{backend}] load {r['load_s']}s | RSS {r['rss_loaded_mb']}MB | "
+                  f"query p50 {r['query_p50_ms']}ms p95 {r['query_p95_ms']}ms | "
+                  f"batch {r['batch_sentences_per_s']} sent/s")
+
+        for backend in args.backends[1:]:
+            cmp = compare_topk(out_dir, base, backend, args.k)
+            results["topk"][backend] = cmp
+            print(f"[TOP-{args.k}] {base} vs {backend}: cos={cmp['mean_query_cosine']} overlap={cmp['overlap_at_k']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n[SAVE] {args.json}")
+
+
+if __name__ == "__main__":
+    main()
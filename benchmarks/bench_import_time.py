@@ -0,0 +1,74 @@
+"""
+planning 모듈 import 시간 벤치마크
+
+각 모듈을 새 인터프리터에서 import 하는 데 걸리는 시간(인터프리터 기동 시간 제외)을
+여러 번 측정해 중앙값/최솟값을 출력합니다.
+
+사용법:
+    python benchmarks/bench_import_time.py [--repeat 5] [--modules clustering run_pipeline]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+
+DEFAULT_MODULES = ["catalog", "plan_store", "clustering", "run_pipeline", "softmax", "input"]
+
+# 새 프로세스에서 import 시간만 측정 (인터프리터 기동 시간 제외)
+SNIPPET = """
+import sys, time
+sys.path.insert(0, {planning!r})
+t = time.perf_counter()
+import {module}
+print(time.perf_counter() - t)
+"""
+
+
+def measure(module, repeat):
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(planning=str(PLANNING_DIR), module=module)],
+            cwd=str(BASE_DIR), capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return {"module": module, "error": result.stderr.strip().splitlines()[-1]}
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return {
+        "module": module,
+        "median_s": round(statistics.median(times), 4),
+        "min_s": round(min(times), 4),
+        "repeat": repeat
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="planning 모듈 import 시간 측정")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'module':<16}{'median(s)':>12}{'min(s)':>10}")
+    for module in args.modules:
+        r = measure(module, args.repeat)
+        results.append(r)
+        if "error" in r:
+            print(f"{module:<16}  [ERROR] {r['error']}")
+        else:
+            print(f"{module:<16}{r['median_s']:>12.4f}{r['min_s']:>10.4f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n[SAVE] {args.json}")
+
+
+if __name__ == "__main__":
+    main()
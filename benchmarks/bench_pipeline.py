@@ -0,0 +1,248 @@
+"""
+설문 입력 → 플랜 JSON 전체 파이프라인 벤치마크 (오프라인)
+
+Weaviate / OpenAI / 임베딩 모델 대신 로컬 대체물을 사용합니다.
+- ENCODER_BACKEND=fake : 토큰 해시 기반 결정적 임베딩 (encoders.FakeEncoder)
+- VECTOR_BACKEND=local : 카탈로그 CSV로 빌드한 로컬 IVF 인덱스 (vector_store)
+- TRANSLATOR=fake      : 키워드를 그대로 사용하는 가짜 번역 (input.fake_translate)
+
+합성 유저 N명을 각각 새 프로세스에서 process_single_student.main 으로 처리하고
+(API의 subprocess 실행과 같은 조건) 단계별/전체 wall time, CPU time, peak RSS를 집계합니다.
+--memory 를 주면 tracemalloc으로 단계별 Python 할당 peak과 상위 할당 위치도 집계합니다
+(tracemalloc 때문에 시간은 느려지므로 시간 비교용 실행과 분리하세요).
+
+사용법:
+    python benchmarks/bench_pipeline.py [--users 10] [--json results.json] [--keep] [--memory]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+PLANS_DIR = BASE_DIR / "data" / "plans"
+DEFAULT_INDEX_DIR = Path(tempfile.gettempdir()) / "hci_bench_vector_index_fake"
+
+STUDENT_PREFIX = "bench"
+KEYWORD_POOLS = {
+    "keyword_history": ["Culture", "Museum", "Traditional village", "Temple"],
+    "keyword_nature": ["Park", "Sea view", "Forest walk", "Lake"],
+    "keyword_food": ["Dessert", "Seafood", "Local noodles", "Coffee"],
+    "keyword_activity": ["Shopping", "Surfing", "Hiking", "Photo spot"],
+    "keyword_accomodation": ["Luxury", "Cost-effective", "Ocean view", "Clean"]
+}
+
+# 자식 프로세스: 파이프라인 1회 실행 후 계측 결과 저장
+CHILD = """
+import json, sys
+sys.path.insert(0, {planning!r})
+from instrumentation import StageRecorder
+from process_single_student import main
+recorder = StageRecorder()
+ok = main({student_id!r}, {input_path!r}, recorder=recorder)
+report = recorder.report()
+report["ok"] = bool(ok)
+with open({report_path!r}, "w", encoding="utf-8") as f:
+    json.dump(report, f)
+"""
+
+
+def offline_env(index_dir, trace_memory=False):
+    env = dict(os.environ)
+    env.update({
+        "ENCODER_BACKEND": "fake",
+        "VECTOR_BACKEND": "local",
+        "LOCAL_INDEX_DIR": str(index_dir),
+        "TRANSLATOR": "fake",
+        "PLANNER_MEMORY_TRACE": "1" if trace_memory else "0",
+        "PYTHONIOENCODING": "utf-8"
+    })
+    return env
+
+
+def ensure_index(index_dir, rebuild=False):
+    """가짜 인코더로 카탈로그 인덱스 빌드 (이미 있으면 재사용)"""
+    if (index_dir / "meta.json").exists() and not rebuild:
+        return
+    sys.path.insert(0, str(PLANNING_DIR))
+    from encoders import FakeEncoder
+    from vector_store import build_local_index, export_from_catalog
+    build_local_index(index_dir, *export_from_catalog(FakeEncoder()))
+
+
+def synthetic_payloads(n, out_dir, seed=0, duration_days=None):
+    """planning/input.json 형식의 합성 설문 N건 (학번 bench0000..., duration_days 지정 시 여행 일수 포함)"""
+    rng = random.Random(seed)
+    with open(PLANNING_DIR / "input.json", "r", encoding="utf-8") as f:
+        base = json.load(f)
+
+    styles = list(base["responses"]["rank_category"].keys())
+    payloads = []
+    for i in range(n):
+        responses = dict(base["responses"])
+        student_id = f"{STUDENT_PREFIX}{i:04d}"
+        ranks = rng.sample(range(1, len(styles) + 1), len(styles))
+        responses.update({
+            "name": f"Bench User {i}",
+            "studentID": student_id,
+            "rank_category": {s: str(r) for s, r in zip(styles, ranks)},
+            "budget": str(rng.choice([100000, 200000, 300000, 500000]))
+        })
+        for key, pool in KEYWORD_POOLS.items():
+            responses[key] = rng.choice(pool)
+        if duration_days:
+            responses["duration_days"] = str(duration_days)
+        path = out_dir / f"{student_id}_input.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"responses": responses}, f, ensure_ascii=False)
+        payloads.append((student_id, path))
+    return payloads
+
+
+def cleanup(student_id):
+    """파이프라인이 학번별로 남기는 중간/최종 산출물 삭제"""
+    paths = [
+        PLANNING_DIR / "user_templates" / f"{student_id}_template.json",
+        PLANNING_DIR / "user_info" / f"{student_id}_user_info.csv",
+        PLANNING_DIR / "softmax_result_test" / f"{student_id}_recommendations_softmax.json",
+        PLANNING_DIR / "softmax_result_test" / f"{student_id}_recommendations_softmax.npz",
+        PLANNING_DIR / "softmax_result_test" / f"{student_id}_candidates.npz",
+        PLANNING_DIR / "clustering_result_test" / f"{student_id}_daily_clusters.json",
+        PLANNING_DIR / "pure_preference_only" / f"{student_id}_recommendations_preference.json",
+        PLANNING_DIR / "pure_preference_only" / f"{student_id}_recommendations_preference.npz",
+        PLANS_DIR / f"{student_id}_plan.json",
+        BASE_DIR / "data" / "checkpoints" / f"{student_id}.json"
+    ]
+    for p in paths:
+        if p.exists():
+            p.unlink()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, round(q / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def summarize(reports):
+    """단계별 median / p95 / max 집계"""
+    by_stage = {}
+    for r in reports:
+        for s in r["stages"]:
+            by_stage.setdefault(s["stage"], []).append(s)
+        by_stage.setdefault("total", []).append(r["total"])
+
+    summary = {}
+    for stage, rows in by_stage.items():
+        walls = [x["wall_s"] for x in rows]
+        cpus = [x["cpu_s"] for x in rows]
+        rss = [x["peak_rss_mb"] for x in rows if x.get("peak_rss_mb") is not None]
+        deltas = [x["peak_rss_delta_mb"] for x in rows if x.get("peak_rss_delta_mb") is not None]
+        py_peaks = [x["py_peak_mb"] for x in rows if x.get("py_peak_mb") is not None]
+        summary[stage] = {
+            "n": len(rows),
+            "wall_median_s": round(statistics.median(walls), 4),
+            "wall_p95_s": round(percentile(walls, 95), 4),
+            "wall_max_s": round(max(walls), 4),
+            "cpu_median_s": round(statistics.median(cpus), 4),
+            "peak_rss_max_mb": round(max(rss), 1) if rss else None,
+            "peak_rss_delta_max_mb": round(max(deltas), 1) if deltas else None,
+            "py_peak_max_mb": round(max(py_peaks), 2) if py_peaks else None,
+            "top_allocations": top_allocation_sites(rows)
+        }
+    return summary
+
+
+def top_allocation_sites(rows, top=5):
+    """여러 실행의 단계별 상위 할당 위치를 위치별 평균 증가량으로 합산"""
+    totals = {}
+    for row in rows:
+        for a in row.get("top_allocations") or []:
+            totals[a["site"]] = totals.get(a["site"], 0) + a["size_diff_kb"]
+    ranked = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return [{"site": site, "avg_size_diff_kb": round(kb / len(rows), 1)} for site, kb in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 전체 파이프라인 벤치마크")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, help="설문 여행 일수 (기본: 설문에 없음 → 2일)")
+    parser.add_argument("--index-dir", default=str(DEFAULT_INDEX_DIR), help="로컬 벡터 인덱스 경로 (없으면 빌드)")
+    parser.add_argument("--rebuild-index", action="store_true")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    parser.add_argument("--keep", action="store_true", help="학번별 산출물 삭제하지 않음")
+    parser.add_argument("--memory", action="store_true", help="tracemalloc 상위 할당 위치 집계 (느려짐)")
+    args = parser.parse_args()
+
+    index_dir = Path(args.index_dir)
+    ensure_index(index_dir, args.rebuild_index)
+    env = offline_env(index_dir, args.memory)
+    env["PIPELINE_RESUME"] = "0"  # --keep 로 남은 체크포인트가 있어도 매번 전체 단계 측정
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_pipeline_"))
+    reports, failures = [], []
+    try:
+        for student_id, input_path in synthetic_payloads(args.users, work_dir, args.seed, args.days):
+            report_path = work_dir / f"{student_id}_report.json"
+            child = CHILD.format(planning=str(PLANNING_DIR), student_id=student_id,
+                                 input_path=str(input_path), report_path=str(report_path))
+            t = time.perf_counter()
+            result = subprocess.run([sys.executable, "-c", child], cwd=str(BASE_DIR), env=env,
+                                    capture_output=True, text=True, encoding="utf-8")
+            if result.returncode != 0 or not report_path.exists():
+                failures.append({"student_id": student_id, "stderr": result.stderr.strip()[-2000:]})
+                print(f"[FAIL] {student_id}")
+                continue
+            with open(report_path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            report["student_id"] = student_id
+            report["process_wall_s"] = round(time.perf_counter() - t, 4)
+            reports.append(report)
+            if not report["ok"]:
+                failures.append({"student_id": student_id, "stderr": result.stdout.strip()[-2000:]})
+            print(f"[OK] {student_id}: {report['total']['wall_s']:.2f}s (process {report['process_wall_s']:.2f}s)")
+            if not args.keep:
+                cleanup(student_id)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = summarize(reports) if reports else {}
+    print(f"\n{'stage':<16}{'median(s)':>11}{'p95(s)':>10}{'max(s)':>10}{'cpu(s)':>10}"
+          f"{'peakRSS(MB)':>13}{'+peak(MB)':>11}{'pyPeak(MB)':>12}")
+    for stage, s in summary.items():
+        print(f"{stage:<16}{s['wall_median_s']:>11}{s['wall_p95_s']:>10}{s['wall_max_s']:>10}"
+              f"{s['cpu_median_s']:>10}{str(s['peak_rss_max_mb']):>13}"
+              f"{str(s['peak_rss_delta_max_mb']):>11}{str(s['py_peak_max_mb']):>12}")
+    for stage, s in summary.items():
+        if s["top_allocations"]:
+            print(f"\n[MEMORY] {stage} 상위 할당 위치 (실행당 평균 증가량)")
+            for a in s["top_allocations"]:
+                print(f"   +{a['avg_size_diff_kb']:>10}KB  {a['site']}")
+    if failures:
+        print(f"\n[WARNING] 실패 {len(failures)}건: {[f['student_id'] for f in failures]}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "users": args.users,
+                "seed": args.seed,
+                "backends": {k: env[k] for k in ("ENCODER_BACKEND", "VECTOR_BACKEND", "TRANSLATOR")},
+                "memory_trace": args.memory,
+                "summary": summary,
+                "runs": reports,
+                "failures": failures
+            }, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+플랜 편집 벤치마크 (고정 / 삭제 / 교체 → 편집한 day만 다시 계산)
+
+합성 유저 N명을 오프라인 파이프라인(bench_pipeline과 같은 로컬 대체물)으로 한 번 처리한 뒤
+hybrid 계열 플랜(hybrid, hybrid_2, ...)에 무작위 편집(pin / unpin / remove / swap)을 --edits번씩 적용하고
+마지막에 예산 재계획(replan_budget)을 한 번 실행하며
+- 편집 1회 응답 시간 (플랜 읽기 → day 재계산 → 저장 포함, 유저별 중앙값 / p95)
+- 편집마다 플랜이 지켜야 할 조건 위반 수:
+  version +1, 다른 day 그대로, 숙소 외 중복 없음, 고정 장소 유지, 삭제한 장소 없음,
+  음식 지출 <= 하루 음식 예산 (고정한 카페/음식점만으로 넘는 경우 제외)
+- 재계획 후 조건 위반 수 (replan_*): 고정 장소가 같은 day / 시간 / 카테고리에 그대로, 삭제한 장소 없음,
+  숙소 외 중복 없음, 음식 지출 <= 새 하루 음식 예산
+을 확인합니다. 파이프라인 1회 시간도 함께 출력합니다.
+
+사용법:
+    python benchmarks/bench_plan_edit.py [--users 5] [--days 3] [--edits 40] [--alternatives 2] [--json out.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(PLANNING_DIR))
+
+from bench_pipeline import DEFAULT_INDEX_DIR, PLANS_DIR, cleanup, ensure_index, offline_env, percentile, synthetic_payloads  # noqa: E402
+
+OPS = ["pin", "unpin", "remove", "swap"]
+
+
+def over_food_budget(day, pinned, food_limit, place_data):
+    """음식 지출이 하루 음식 예산을 넘는지 (고정한 카페/음식점만으로 넘는 경우는 제외)"""
+    from schedule_builder import food_price
+
+    if food_limit is None:
+        return False
+    food = [p for p in day if p["category"] in ("Cafe", "Restaurant")]
+    spent = sum(food_price(place_data[p["id"]]) for p in food)
+    pinned_spent = sum(food_price(place_data[p["id"]]) for p in food if p["id"] in pinned)
+    return spent > food_limit and pinned_spent <= food_limit
+
+
+def check_edit(before, after, plan_key, day_key, food_limit, place_data):
+    """편집 전후 플랜(펼쳐진 구조)으로 조건 위반 목록 반환"""
+    from plan_store import compact_day, plan_version
+
+    errors = []
+    if plan_version(after) != plan_version(before) + 1:
+        errors.append("version")
+    old_days, new_days = before["plans"][plan_key]["days"], after["plans"][plan_key]["days"]
+    if any(compact_day(old_days[k]) != compact_day(new_days[k]) for k in old_days if k != day_key):
+        errors.append("other_day")
+    ids = [p["id"] for places in new_days.values() for p in places if p["category"] != "Accommodation"]
+    if len(ids) != len(set(ids)):
+        errors.append("duplicate")
+    plan = after["plans"][plan_key]
+    day = new_days[day_key]
+    present = {p["id"] for p in day}
+    if not set(plan.get("pinned", {}).get(day_key, [])) <= present:
+        errors.append("pinned")
+    if set(plan.get("removed", [])) & set(ids):
+        errors.append("removed")
+    if over_food_budget(day, set(plan.get("pinned", {}).get(day_key, [])), food_limit, place_data):
+        errors.append("budget")
+    return errors
+
+
+def check_replan(before, after, food_limit, place_data):
+    """예산 재계획 전후 플랜으로 조건 위반 목록 반환 (hybrid 계열 플랜마다 편집 상태 유지)"""
+    from plan_store import plan_version
+
+    errors = []
+    if plan_version(after) != plan_version(before) + 1:
+        errors.append("replan_version")
+    for plan_key in ["hybrid"] + before.get("hybrid_alternatives", []):
+        old, new = before["plans"][plan_key], after["plans"].get(plan_key)
+        if new is None:
+            continue  # 새 예산으로는 대안을 만들 수 없는 경우
+        slots = {(day_key, p["id"], p["time"], p["category"]) for day_key, places in new["days"].items() for p in places}
+        if any((day_key, p["id"], p["time"], p["category"]) not in slots
+               for day_key, ids in old.get("pinned", {}).items()
+               for p in old["days"][day_key] if p["id"] in ids):
+            errors.append("replan_pinned")
+        if {k: sorted(v) for k, v in old.get("pinned", {}).items()} != \
+                {k: sorted(v) for k, v in new.get("pinned", {}).items()}:
+            errors.append("replan_pinned")
+        ids = [p["id"] for places in new["days"].values() for p in places if p["category"] != "Accommodation"]
+        if len(ids) != len(set(ids)):
+            errors.append("replan_duplicate")
+        if set(new.get("removed", [])) != set(old.get("removed", [])) or set(old.get("removed", [])) & set(ids):
+            errors.append("replan_removed")
+        if any(over_food_budget(day, set(new.get("pinned", {}).get(day_key, [])), food_limit, place_data)
+               for day_key, day in new["days"].items()):
+            errors.append("replan_budget")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="플랜 편집 응답 시간 / 편집 후 플랜 조건 확인")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--days", type=int, default=3, help="여행 일수")
+    parser.add_argument("--edits", type=int, default=40, help="유저별 편집 수")
+    parser.add_argument("--alternatives", type=int, default=2, help="hybrid 플랜 수 (HYBRID_ALTERNATIVES)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--index-dir", default=str(DEFAULT_INDEX_DIR))
+    parser.add_argument("--keep", action="store_true", help="파이프라인 산출물 유지")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    index_dir = Path(args.index_dir)
+    ensure_index(index_dir)
+    os.environ.update(offline_env(index_dir))
+    os.environ["PIPELINE_RESUME"] = "0"
+    os.environ["HYBRID_ALTERNATIVES"] = str(args.alternatives)
+
+    import process_single_student
+    from catalog import load_place_catalog
+    from plan_edit import edit_plan
+    from plan_store import load_plan
+    from replan import artifact_paths, replan_budget
+    from schedule_builder import food_budget
+
+    rng = random.Random(args.seed)
+    work_dir = Path(tempfile.mkdtemp(prefix="hci_bench_plan_edit_"))
+    payloads = synthetic_payloads(args.users, work_dir, duration_days=args.days)
+
+    pipeline_times, edit_times, replan_times, all_times, violations, op_counts = [], [], [], [], {}, {}
+    try:
+        for student_id, input_path in payloads:
+            t = time.perf_counter()
+            if not process_single_student.main(student_id, input_path):
+                raise SystemExit(f"[ERROR] {student_id} 파이프라인 실패")
+            pipeline_times.append(time.perf_counter() - t)
+
+            plan_path = PLANS_DIR / f"{student_id}_plan.json"
+            with open(artifact_paths(student_id)["template"], "r", encoding="utf-8") as f:
+                food_limit = food_budget(json.load(f)["budget_per_day"])
+            before = load_plan(plan_path)
+            place_data = load_place_catalog(before.get("region"))
+            by_cat = {}
+            for pid, info in place_data.items():
+                by_cat.setdefault(info["category"], []).append(pid)
+
+            user_times = []
+            for _ in range(args.edits):
+                plan_key = rng.choice(["hybrid"] + before.get("hybrid_alternatives", []))
+                days = before["plans"][plan_key]["days"]
+                day_key = rng.choice([k for k, places in days.items() if places])
+                slot = rng.randrange(len(days[day_key]))
+                op = rng.choice(OPS)
+                place_id = None
+                if op == "swap":
+                    cat = days[day_key][slot]["category"]
+                    used = {p["id"] for places in days.values() for p in places}
+                    place_id = rng.choice([pid for pid in by_cat[cat] if pid not in used])
+
+                t = time.perf_counter()
+                edit_plan(student_id, plan_path, plan_key, day_key, slot, op, place_id,
+                          expected_version=before.get("version", 0))
+                user_times.append(time.perf_counter() - t)
+
+                after = load_plan(plan_path)
+                for error in check_edit(before, after, plan_key, day_key, food_limit, place_data):
+                    violations[error] = violations.get(error, 0) + 1
+                    print(f"[VIOLATION] {student_id} {op} {plan_key}/{day_key}/{slot}: {error}")
+                op_counts[op] = op_counts.get(op, 0) + 1
+                before = after
+
+            # 편집한 플랜을 새 예산으로 재계획 → 고정 / 삭제가 그대로인지
+            budget = rng.choice([100000, 200000, 300000, 500000])
+            t = time.perf_counter()
+            replan_budget(student_id, budget, plan_path)
+            replan_times.append(time.perf_counter() - t)
+            with open(artifact_paths(student_id)["template"], "r", encoding="utf-8") as f:
+                food_limit = food_budget(json.load(f)["budget_per_day"])
+            after = load_plan(plan_path)
+            for error in check_replan(before, after, food_limit, place_data):
+                violations[error] = violations.get(error, 0) + 1
+                print(f"[VIOLATION] {student_id} replan {budget}: {error}")
+            before = after
+
+            edit_times.append(statistics.median(user_times))
+            all_times.extend(user_times)
+            print(f"[USER] {student_id}: pipeline {pipeline_times[-1]:.2f}s, edit median {edit_times[-1] * 1000:.2f}ms "
+                  f"/ p95 {percentile(user_times, 95) * 1000:.2f}ms, replan {replan_times[-1] * 1000:.1f}ms "
+                  f"(version {before.get('version')})")
+    finally:
+        if not args.keep:
+            for student_id, _ in payloads:
+                cleanup(student_id)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = {
+        "users": args.users,
+        "days": args.days,
+        "alternatives": args.alternatives,
+        "edits": len(all_times),
+        "ops": op_counts,
+        "pipeline_s": round(statistics.median(pipeline_times), 3),
+        "edit_ms": round(statistics.median(edit_times) * 1000, 2),
+        "edit_p95_ms": round(percentile(all_times, 95) * 1000, 2),
+        "edit_max_ms": round(max(all_times) * 1000, 2),
+        "replan_ms": round(statistics.median(replan_times) * 1000, 2),
+        "violations": violations
+    }
+    print(f"\n[RESULT] users={args.users}, days={args.days}, 편집 {len(all_times)}회 {op_counts}")
+    print(f"[RESULT] 파이프라인 1회 중앙값 {summary['pipeline_s']}s")
+    print(f"[RESULT] 편집 1회 중앙값 {summary['edit_ms']}ms / p95 {summary['edit_p95_ms']}ms / 최대 {summary['edit_max_ms']}ms")
+    print(f"[RESULT] 편집 후 예산 재계획 1회 중앙값 {summary['replan_ms']}ms")
+    print(f"[RESULT] 조건 위반 {sum(violations.values())}건 {violations}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
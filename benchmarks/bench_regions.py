@@ -0,0 +1,147 @@
+"""
+지역 샤드 벤치마크: 플랜 1건 비용이 전체 카탈로그가 아니라 고른 지역 크기에 비례하는지 확인
+
+강릉 카탈로그를 복제(id 오프셋 + 좌표 이동)해 크기가 다른 합성 지역을 임시 REGION_DATA_DIR에 만들고
+(기본 ×1, ×8, ×48 → 합계 약 11만 곳), 지역별로 다음을 측정합니다.
+- cold: 샤드 첫 로드 (카탈로그 dict + 클러스터링 위치 dict)
+- warm: 캐시된 샤드 조회
+- plan: 클러스터링 + 숙소 선택 + 3가지 일정 (유저 선호도 TOP_K 기준)
+- all regions: 모든 지역 cold 로드 합계 (샤드 이전처럼 전체 카탈로그를 읽을 때의 비용)
+REGION_CACHE_SIZE 보다 많은 지역을 번갈아 쓰며 LRU 해제 횟수도 확인합니다.
+
+사용법:
+    python benchmarks/bench_regions.py [--scales 1 8 48] [--cache-size 2] [--json out.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(PLANNING_DIR))
+
+ID_STRIDE = 1_000_000  # 복제본마다 place id 오프셋
+
+
+def make_region(src_dir, out_dir, scale, filenames, region_index):
+    """src_dir CSV들을 scale배 복제한 지역 샤드 (복제본마다 id 오프셋, 위도 0.5도씩 이동)"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for filename in filenames:
+        src = src_dir / filename
+        if not src.exists():
+            continue
+        df = pd.read_csv(src)
+        copies = []
+        for k in range(scale):
+            part = df.copy()
+            part["id"] = part["id"] + (region_index * 100 + k + 1) * ID_STRIDE
+            for col in ("latitude", "lat"):
+                if col in part.columns:
+                    part[col] = part[col] + 0.5 * k
+            copies.append(part)
+        pd.concat(copies, ignore_index=True).to_csv(out_dir / filename, index=False)
+
+
+def timed(fn):
+    t = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지역 샤드 로드/플랜 시간")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 8, 48], help="지역별 강릉 카탈로그 복제 배수")
+    parser.add_argument("--cache-size", type=int, default=2, help="REGION_CACHE_SIZE")
+    parser.add_argument("--days", type=int, default=2)
+    parser.add_argument("--keep", action="store_true", help="합성 지역 디렉토리 유지")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="hci_bench_regions_"))
+    os.environ["REGION_DATA_DIR"] = str(work_dir)
+    os.environ["REGION_CACHE_SIZE"] = str(args.cache_size)
+
+    # 환경 변수를 설정한 뒤 import (REGIONS_DIR / REGION_CACHE_SIZE 는 import 시점에 결정)
+    import clustering
+    from bench_trip_length import synthetic_prefs
+    from catalog import SCHEDULE_FILES, _catalogs, load_place_catalog
+    from input import expand_itinerary
+    from regions import DATA_SET_DIR
+    from schedule_builder import (build_hybrid_schedule, build_personalized_schedule,
+                                  build_popularity_schedule, food_budget)
+    from softmax import CONFIG as SOFTMAX_CONFIG
+
+    filenames = list(SCHEDULE_FILES.values()) + [clustering.CONFIG["PLACE_FILENAME"]]
+    regions = []
+    try:
+        for i, scale in enumerate(args.scales):
+            region = f"synthetic_x{scale}"
+            make_region(DATA_SET_DIR, work_dir / region, scale, filenames, i)
+            regions.append(region)
+        print(f"[REGION] 합성 지역 {len(regions)}개 생성 -> {work_dir}")
+
+        with open(PLANNING_DIR / "templates" / "Cultural_template.json", "r", encoding="utf-8") as f:
+            template = json.load(f)
+        template["itinerary"] = expand_itinerary(template["itinerary"], args.days)
+        rng = np.random.default_rng(0)
+        import sklearn.neighbors  # noqa: F401  첫 플랜의 import 시간 제외
+
+        rows = []
+        for region in regions:
+            place_data, cold_catalog = timed(lambda: load_place_catalog(region))
+            locations, cold_locations = timed(lambda: clustering.place_locations(region))
+            _, warm = timed(lambda: (load_place_catalog(region), clustering.place_locations(region)))
+
+            prefs = synthetic_prefs(locations, rng, SOFTMAX_CONFIG["TOP_K"])
+
+            def plan():
+                df = clustering.extract_all_user_places(prefs, locations)
+                clusters = clustering.greedy_clustering_optimized(
+                    df, clustering.build_spatial_indices(df), args.days, 300000)
+                acc_id, _ = clustering.select_best_accommodation(prefs, clusters, locations, 300000, args.days)
+                build_popularity_schedule(template, place_data, prefs)
+                build_personalized_schedule(template, place_data, prefs)
+                build_hybrid_schedule(template, place_data, {"clusters": clusters, "Accommodation": acc_id},
+                                      food_budget(150000))
+
+            _, plan_s = timed(plan)
+            rows.append({"region": region, "places": len(place_data),
+                         "cold_ms": round((cold_catalog + cold_locations) * 1000, 1),
+                         "warm_ms": round(warm * 1000, 3), "plan_ms": round(plan_s * 1000, 1)})
+
+        # LRU: 지역을 번갈아 조회 (캐시 크기보다 지역이 많으면 해제 후 다시 로드)
+        before = _catalogs.evictions
+        for region in regions * 2:
+            load_place_catalog(region)
+        evictions = _catalogs.evictions - before
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n[RESULT] REGION_CACHE_SIZE={args.cache_size}, {args.days}일 플랜")
+    print(f"{'region':<16}{'places':>9}{'cold(ms)':>11}{'warm(ms)':>11}{'plan(ms)':>11}")
+    for r in rows:
+        print(f"{r['region']:<16}{r['places']:>9}{r['cold_ms']:>11}{r['warm_ms']:>11}{r['plan_ms']:>11}")
+    total_places = sum(r["places"] for r in rows)
+    total_cold = sum(r["cold_ms"] for r in rows)
+    print(f"[RESULT] 전체 지역 로드 (샤드 이전 방식): {total_places}곳 {total_cold:.1f}ms")
+    print(f"[RESULT] 지역 {len(regions)}개 2회 순환 → 샤드 해제 {evictions}회, 현재 로드: {_catalogs.loaded()}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"cache_size": args.cache_size, "rows": rows, "all_regions_cold_ms": round(total_cold, 1),
+                       "all_regions_places": total_places, "evictions": evictions}, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+
+
+if __name__ == "__main__":
+    main()
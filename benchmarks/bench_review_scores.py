@@ -0,0 +1,138 @@
+"""
+리뷰 수 정규화 + 최종 점수(attach_review_scores_and_final) 벤치마크: 기존 구현 vs 배열 구현
+
+- legacy : 유저·카테고리마다 카테고리 CSV를 다시 읽어 dict 조회 → 튜플/dict 리스트 → Python 정렬
+- array  : 지역 카탈로그에서 한 번 만든 정렬된 id/리뷰 수 배열 조회 → 배열 연산 → argsort
+합성 검색 결과(카테고리별 TOP_K, 카탈로그에 없는 id와 동점 포함)로 두 결과의 id 순서와 점수 차이를 확인합니다.
+
+사용법:
+    python benchmarks/bench_review_scores.py [--users 20] [--top-k 300] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(PLANNING_DIR))
+
+from softmax import CATEGORY_FILES, CATEGORY_TRANSLATE, CONFIG, attach_review_scores_and_final  # noqa: E402
+from vector_store import PlaceHit  # noqa: E402
+
+
+def legacy_attach_review_scores_and_final(results_by_cat, data_dir, gamma=0.3):
+    final_scores = {}
+
+    for cat, scored_list in results_by_cat.items():
+        if not scored_list:
+            continue
+
+        df = pd.read_csv(os.path.join(data_dir, CATEGORY_FILES[cat]))
+        review_col = "review_count" if cat == "Accommodation" else "all_review_count"
+        review_dict = dict(zip(df["id"], df[review_col]))
+
+        enriched = []
+        for hit, sim_score in scored_list:
+            pid = hit.place_id
+            rc = review_dict.get(pid, 0)
+            if pd.isna(rc):
+                rc = 0
+            enriched.append((pid, sim_score, rc))
+
+        counts = np.array([rc for _, _, rc in enriched], dtype=float)
+        if counts.sum() > 0:
+            counts = np.log1p(counts)
+            exp_counts = np.exp(counts - counts.max())
+            review_norms = exp_counts / exp_counts.sum()
+        else:
+            review_norms = np.ones(len(enriched)) / len(enriched)
+
+        cat_list = []
+        for (pid, sim_score, _), rn in zip(enriched, review_norms):
+            final_score = (1 - gamma) * sim_score + gamma * rn
+            cat_list.append({
+                "id": pid,
+                "final_score": float(final_score)
+            })
+
+        cat_list = sorted(cat_list, key=lambda x: x["final_score"], reverse=True)
+        final_scores[CATEGORY_TRANSLATE[cat]] = cat_list
+
+    return final_scores
+
+
+def synthetic_results(catalog_ids, rng, top_k):
+    """카테고리별 (PlaceHit, sim_score) 목록: 카탈로그 id + 없는 id 약간, 점수 반올림으로 동점 포함"""
+    results = {}
+    for cat, ids in catalog_ids.items():
+        chosen = [int(x) for x in rng.choice(ids, size=min(top_k, len(ids)), replace=False)]
+        chosen[::25] = [-(i + 1) for i in range(len(chosen[::25]))]  # 카탈로그에 없는 id
+        sims = np.round(rng.random(len(chosen)), 3)
+        sims[::40] = 0  # rerank의 max(0, ...) 결과
+        results[cat] = [(PlaceHit(pid, 1 - s, []), 0 if s == 0 else float(s)) for pid, s in zip(chosen, sims)]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 수 정규화/최종 점수 기존 vs 배열 구현")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=CONFIG["TOP_K"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    data_dir = CONFIG["DATA_DIR"]
+    catalog_ids = {cat: pd.read_csv(os.path.join(data_dir, f))["id"].to_numpy() for cat, f in CATEGORY_FILES.items()}
+    rng = np.random.default_rng(args.seed)
+    users = [synthetic_results(catalog_ids, rng, args.top_k) for _ in range(args.users)]
+
+    t = time.perf_counter()
+    attach_review_scores_and_final(users[0], gamma=CONFIG["GAMMA"])  # 지역 리뷰 수 배열 첫 로드
+    first_load = time.perf_counter() - t
+
+    legacy_times, array_times = [], []
+    max_diff, order_mismatches = 0.0, 0
+    for results in users:
+        t = time.perf_counter()
+        old = legacy_attach_review_scores_and_final(results, data_dir, gamma=CONFIG["GAMMA"])
+        legacy_times.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        new = attach_review_scores_and_final(results, gamma=CONFIG["GAMMA"])
+        array_times.append(time.perf_counter() - t)
+
+        for cat in old:
+            if [x["id"] for x in old[cat]] != [x["id"] for x in new[cat]]:
+                order_mismatches += 1
+            max_diff = max(max_diff, max(abs(a["final_score"] - b["final_score"]) for a, b in zip(old[cat], new[cat])))
+
+    result = {
+        "users": args.users,
+        "top_k": args.top_k,
+        "legacy_ms": round(statistics.median(legacy_times) * 1000, 2),
+        "array_ms": round(statistics.median(array_times) * 1000, 2),
+        "first_load_ms": round(first_load * 1000, 2),
+        "max_abs_diff": max_diff,
+        "order_mismatches": order_mismatches
+    }
+    print(f"\n[RESULT] users={args.users} top_k={args.top_k} (유저 1명, 4개 카테고리 중앙값)")
+    print(f"legacy {result['legacy_ms']}ms / array {result['array_ms']}ms "
+          f"(리뷰 수 배열 첫 로드 {result['first_load_ms']}ms)")
+    print(f"[RESULT] 최대 점수 차이 {max_diff:.3g}, 순서 불일치 {order_mismatches}건")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+    if order_mismatches or max_diff > 1e-12:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
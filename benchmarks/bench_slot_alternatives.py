@@ -0,0 +1,128 @@
+"""
+슬롯 대체 장소 벤치마크: 이웃 목록 + 공간 kNN 후보 vs 카테고리 전체 탐색
+
+가짜 인코더 로컬 벡터 인덱스(bench_pipeline.ensure_index)로 이웃 목록을 임시 디렉토리에 빌드하고,
+합성 유저 hybrid 플랜의 모든 슬롯(숙소 포함)에서 neighbours.slot_alternatives 를 호출합니다.
+- knn        : 임베딩 이웃 K개 + 앞뒤 장소 근처 GEO_CANDIDATES개만 점수 계산 (API와 같은 경로)
+- exhaustive : 같은 점수식으로 카테고리 전체 장소를 계산 (GEO_CANDIDATES = 카테고리 전체)
+슬롯별 응답 시간(중앙값 / p95)과 exhaustive 상위 limit개 대비 recall을 출력합니다.
+
+사용법:
+    python benchmarks/bench_slot_alternatives.py [--users 20] [--days 3] [--limit 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(PLANNING_DIR))
+
+from bench_pipeline import DEFAULT_INDEX_DIR, ensure_index, percentile  # noqa: E402
+from bench_trip_length import TEMPLATES, synthetic_prefs  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="슬롯 대체 장소: 이웃 목록 vs 전체 탐색")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=150000, help="1일 예산")
+    parser.add_argument("--index-dir", default=str(DEFAULT_INDEX_DIR))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    index_dir = Path(args.index_dir)
+    ensure_index(index_dir)
+    work_dir = Path(tempfile.mkdtemp(prefix="hci_bench_neighbours_"))
+    os.environ["NEIGHBOUR_INDEX_DIR"] = str(work_dir)
+
+    import clustering
+    import neighbours
+    from catalog import load_place_catalog
+    from input import expand_itinerary
+    from schedule_builder import build_hybrid_schedule, food_budget
+    from softmax import CONFIG as SOFTMAX_CONFIG
+    from vector_store import LocalPlaceStore
+
+    try:
+        t = time.perf_counter()
+        store = LocalPlaceStore(index_dir)
+        neighbours.build_neighbour_index(np.asarray(store.place_ids), np.asarray(store.vectors))
+        build_s = time.perf_counter() - t
+
+        locations = clustering.place_locations()
+        place_data = load_place_catalog()
+        rng = np.random.default_rng(args.seed)
+        plans = []
+        for u in range(args.users):
+            with open(PLANNING_DIR / "templates" / TEMPLATES[u % len(TEMPLATES)], "r", encoding="utf-8") as f:
+                template = json.load(f)
+            template["itinerary"] = expand_itinerary(template["itinerary"], args.days)
+            prefs = synthetic_prefs(locations, rng, SOFTMAX_CONFIG["TOP_K"])
+            df = clustering.extract_all_user_places(prefs, locations)
+            budget = args.budget * args.days
+            clusters = clustering.greedy_clustering_optimized(df, clustering.build_spatial_indices(df), args.days, budget)
+            acc_id, _ = clustering.select_best_accommodation(prefs, clusters, locations, budget, args.days,
+                                                             index=clustering.accommodation_index())
+            plans.append(build_hybrid_schedule(template, place_data, {"clusters": clusters, "Accommodation": acc_id},
+                                               food_budget(args.budget)))
+
+        neighbours.slot_alternatives(plans[0], "day1", 0, budget_per_day=args.budget)  # 샤드 로드 제외
+        geo_candidates = neighbours.GEO_CANDIDATES
+        times, exhaustive_times, recalls, by_cat = [], [], [], {}
+        for days in plans:
+            for day_key, places in days.items():
+                for slot, place in enumerate(places):
+                    neighbours.GEO_CANDIDATES = geo_candidates
+                    t = time.perf_counter()
+                    fast = neighbours.slot_alternatives(days, day_key, slot, budget_per_day=args.budget, limit=args.limit)
+                    times.append(time.perf_counter() - t)
+
+                    neighbours.GEO_CANDIDATES = 10 ** 9  # 카테고리 전체
+                    t = time.perf_counter()
+                    full = neighbours.slot_alternatives(days, day_key, slot, budget_per_day=args.budget, limit=args.limit)
+                    exhaustive_times.append(time.perf_counter() - t)
+
+                    if full:
+                        recall = len({p["id"] for p in fast} & {p["id"] for p in full}) / len(full)
+                        recalls.append(recall)
+                        by_cat.setdefault(place["category"], []).append(recall)
+        neighbours.GEO_CANDIDATES = geo_candidates
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = {
+        "users": args.users, "days": args.days, "slots": len(times), "limit": args.limit,
+        "build_s": round(build_s, 3),
+        "knn_ms": round(statistics.median(times) * 1000, 3),
+        "knn_p95_ms": round(percentile(times, 95) * 1000, 3),
+        "exhaustive_ms": round(statistics.median(exhaustive_times) * 1000, 3),
+        "exhaustive_p95_ms": round(percentile(exhaustive_times, 95) * 1000, 3),
+        "recall": round(statistics.mean(recalls), 4) if recalls else None,
+        "recall_by_category": {cat: round(statistics.mean(r), 4) for cat, r in sorted(by_cat.items())}
+    }
+    print(f"\n[RESULT] users={args.users}, days={args.days}, 슬롯 {len(times)}개, limit={args.limit}, "
+          f"이웃 목록 빌드 {summary['build_s']}s")
+    print(f"[RESULT] knn        중앙값 {summary['knn_ms']}ms / p95 {summary['knn_p95_ms']}ms")
+    print(f"[RESULT] exhaustive 중앙값 {summary['exhaustive_ms']}ms / p95 {summary['exhaustive_p95_ms']}ms")
+    print(f"[RESULT] exhaustive 상위 {args.limit}개 대비 recall {summary['recall']} {summary['recall_by_category']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+
+
+if __name__ == "__main__":
+    main()
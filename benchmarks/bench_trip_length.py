@@ -0,0 +1,217 @@
+"""
+여행 일수(N일)에 따른 플랜 생성 시간 벤치마크 (클러스터링 + 숙소 선택 + STEP 4 일정 생성)
+
+합성 유저 선호도(카테고리별 TOP_K 장소, 동점이 생기도록 점수 반올림)로 N = 1 ~ 14일을 측정합니다.
+- legacy   : 기존 pandas 클러스터링 (seed 후보마다 카테고리별 반경 검색 + DataFrame 필터/nlargest)
+- numpy    : 현재 clustering.greedy_clustering_optimized (seed 후보 20개 일괄 반경 검색 + bool 마스크)
+- accommodation / schedules : 숙소 선택, 템플릿 N일 확장 + popularity / personalized / hybrid 일정
+두 클러스터링 결과가 완전히 같은지도 매번 확인합니다 (다르면 종료 코드 1).
+
+사용법:
+    python benchmarks/bench_trip_length.py [--users 5] [--days 1 2 3 5 7 10 14] [--no-legacy] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(PLANNING_DIR))
+
+import clustering  # noqa: E402
+from clustering import CLUSTER_CATEGORIES, CONFIG  # noqa: E402
+
+DEFAULT_DAYS = [1, 2, 3, 5, 7, 10, 14]
+TEMPLATES = ["Cultural_template.json", "Healing_template.json", "Foodie_template.json", "Activity_template.json"]
+
+
+# ========== 기존 구현 (비교 기준) ==========
+def legacy_find_nearest_places(seed_loc, spatial_index, n, max_radius_km, used_ids):
+    if not spatial_index:
+        return pd.DataFrame()
+    tree = spatial_index["tree"]
+    df = spatial_index["df"]
+    seed_radians = np.radians([[seed_loc[0], seed_loc[1]]])
+    indices = tree.query_radius(seed_radians, r=max_radius_km/6371)[0]
+    if len(indices) == 0:
+        return pd.DataFrame()
+
+    sub = df.iloc[indices].copy()
+    sub = sub[~sub["id"].isin(used_ids)]
+    sub["distance"] = clustering.haversine_vectorized(seed_loc[0], seed_loc[1], sub["latitude"].values, sub["longitude"].values)
+    sub["distance_score"] = 1 - (sub["distance"] / max_radius_km)
+    sub["combined_score"] = (
+        CONFIG["PREFERENCE_WEIGHT"] * sub["final_score"] +
+        CONFIG["DISTANCE_WEIGHT"] * sub["distance_score"]
+    )
+    return sub.nlargest(n, "combined_score")
+
+
+def legacy_greedy_clustering(df, spatial_indices, n_clusters, budget):
+    clusters = []
+    used_ids = set()
+    used_seed_ids = set()
+    for i in range(n_clusters):
+        seed_candidates = df[~df["id"].isin(used_seed_ids)].copy()
+        if len(seed_candidates) == 0:
+            seed_candidates = df.copy()
+        top_candidates = seed_candidates.nlargest(min(20, len(seed_candidates)), "final_score")
+        valid_seeds = []
+        for _, s in top_candidates.iterrows():
+            seed_loc = (s["latitude"], s["longitude"])
+            total_score = 0
+            valid = True
+            for cat in CLUSTER_CATEGORIES:
+                if cat not in spatial_indices:
+                    valid = False
+                    break
+                found = legacy_find_nearest_places(seed_loc, spatial_indices[cat],
+                                                   CONFIG["PLACES_PER_CATEGORY"],
+                                                   CONFIG["MAX_CLUSTER_RADIUS_KM"],
+                                                   used_ids)
+                if len(found) < CONFIG["MIN_PLACES_PER_CATEGORY"]:
+                    valid = False
+                    break
+                total_score += found["final_score"].sum()
+            if valid:
+                valid_seeds.append((s, total_score))
+        seed = max(valid_seeds, key=lambda x: x[1])[0] if valid_seeds else seed_candidates.iloc[0]
+        used_ids.add(seed["id"])
+        used_seed_ids.add(seed["id"])
+        seed_loc = (seed["latitude"], seed["longitude"])
+        cluster = {
+            "cluster_id": i,
+            "seed_category": seed["category"],
+            "seed_place": {"id": int(seed["id"]), "name": seed["name"], "final_score": round(float(seed["final_score"]), 4)},
+            "center_lat": seed_loc[0],
+            "center_lng": seed_loc[1],
+            "categories": {}
+        }
+        for cat in CLUSTER_CATEGORIES:
+            if cat not in spatial_indices:
+                continue
+            found = legacy_find_nearest_places(seed_loc, spatial_indices[cat],
+                                               CONFIG["PLACES_PER_CATEGORY"],
+                                               CONFIG["MAX_CLUSTER_RADIUS_KM"],
+                                               used_ids)
+            cat_places = []
+            for _, p in found.iterrows():
+                used_ids.add(p["id"])
+                cat_places.append({"id": int(p["id"]), "name": p["name"], "final_score": round(float(p["final_score"]), 4)})
+            cluster["categories"][cat] = cat_places
+        clusters.append(cluster)
+    return clusters
+
+
+# ========== 합성 입력 ==========
+def synthetic_prefs(location_dict, rng, top_k):
+    """softmax 결과 형태의 선호도 (카테고리별 상위 top_k, 점수 내림차순)"""
+    by_cat = {}
+    for pid, loc in location_dict.items():
+        by_cat.setdefault(loc["category"], []).append(pid)
+    prefs = {}
+    for cat, ids in by_cat.items():
+        chosen = rng.permutation(ids)[:top_k]
+        scores = np.round(rng.random(len(chosen)), 2)  # 반올림으로 동점을 만들어 tie 처리까지 비교
+        prefs[cat] = sorted(({"id": int(pid), "final_score": float(s)} for pid, s in zip(chosen, scores)),
+                            key=lambda x: x["final_score"], reverse=True)
+    return prefs
+
+
+def timed(fn):
+    t = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여행 일수별 플랜 생성 시간")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--days", type=int, nargs="+", default=DEFAULT_DAYS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=int, default=150000, help="1일 예산 (총 예산 = 1일 예산 × N)")
+    parser.add_argument("--no-legacy", action="store_true", help="기존 pandas 클러스터링 측정 생략")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    from catalog import load_place_catalog
+    from input import expand_itinerary
+    from schedule_builder import (build_hybrid_schedule, build_personalized_schedule,
+                                  build_popularity_schedule, food_budget)
+    from softmax import CONFIG as SOFTMAX_CONFIG
+
+    location_dict = clustering.load_place_locations(CONFIG["PLACE_FILE"])
+    place_data = load_place_catalog()
+    templates = []
+    for name in TEMPLATES:
+        with open(PLANNING_DIR / "templates" / name, "r", encoding="utf-8") as f:
+            templates.append(json.load(f))
+
+    rng = np.random.default_rng(args.seed)
+    users = [synthetic_prefs(location_dict, rng, SOFTMAX_CONFIG["TOP_K"]) for _ in range(args.users)]
+
+    rows, mismatches = [], 0
+    for days in args.days:
+        timings = {"legacy": [], "numpy": [], "accommodation": [], "schedules": []}
+        for u, prefs in enumerate(users):
+            df = clustering.extract_all_user_places(prefs, location_dict)
+            indices = clustering.build_spatial_indices(df)
+            budget = args.budget * days
+
+            clusters, elapsed = timed(lambda: clustering.greedy_clustering_optimized(df, indices, days, budget))
+            timings["numpy"].append(elapsed)
+            if not args.no_legacy:
+                legacy, elapsed = timed(lambda: legacy_greedy_clustering(df, indices, days, budget))
+                timings["legacy"].append(elapsed)
+                if legacy != clusters:
+                    mismatches += 1
+                    print(f"[MISMATCH] user={u} days={days}: 기존/현재 클러스터 결과가 다릅니다")
+
+            (acc_id, acc_score), elapsed = timed(lambda: clustering.select_best_accommodation(
+                prefs, clusters, location_dict, budget, days))
+            timings["accommodation"].append(elapsed)
+
+            template = dict(templates[u % len(templates)])
+            cluster_data = {"clusters": clusters, "Accommodation": acc_id}
+
+            def schedules():
+                template["itinerary"] = expand_itinerary(templates[u % len(templates)]["itinerary"], days)
+                build_popularity_schedule(template, place_data, prefs)
+                build_personalized_schedule(template, place_data, prefs)
+                return build_hybrid_schedule(template, place_data, cluster_data, food_budget(args.budget))
+
+            hybrid, elapsed = timed(schedules)
+            timings["schedules"].append(elapsed)
+            assert len(hybrid) == days
+
+        row = {"days": days}
+        for name, values in timings.items():
+            row[f"{name}_ms"] = round(statistics.median(values) * 1000, 2) if values else None
+        rows.append(row)
+
+    print(f"\n[RESULT] users={args.users} (유저별 중앙값, ms)")
+    print(f"{'days':>5}{'legacy':>10}{'numpy':>10}{'speedup':>9}{'accomm.':>10}{'schedules':>11}")
+    for r in rows:
+        speedup = f"{r['legacy_ms'] / r['numpy_ms']:.1f}x" if r["legacy_ms"] and r["numpy_ms"] else "-"
+        legacy = r["legacy_ms"] if r["legacy_ms"] is not None else "-"
+        print(f"{r['days']:>5}{legacy:>10}{r['numpy_ms']:>10}{speedup:>9}"
+              f"{r['accommodation_ms']:>10}{r['schedules_ms']:>11}")
+    if not args.no_legacy:
+        print(f"[RESULT] 클러스터 결과 불일치: {mismatches}건")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"users": args.users, "rows": rows, "mismatches": mismatches}, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+로컬 벡터 인덱스(IVF) recall / 지연시간 벤치마크
+
+같은 데이터에 대해 brute force(카테고리 전체 코사인 정렬)를 정답으로 두고
+LocalPlaceStore.near_vector 의 recall@k 와 쿼리 지연시간을 nprobe별로 측정합니다.
+
+데이터:
+- 기본: 실제 카탈로그 크기(카테고리별 장소 수)에 맞춘 합성 클러스터 벡터 (768차원)
+- --index DIR: 이미 빌드한 인덱스(vector_store.py build)를 그대로 사용
+
+사용법:
+    python benchmarks/bench_vector_index.py [--queries 200] [--k 300] [--nprobe 4 8 16]
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR / "planning"))
+
+from vector_store import LocalPlaceStore, build_local_index, _normalize  # noqa: E402
+
+# 카탈로그 CSV 기준 카테고리별 장소 수
+CATALOG_SIZES = {"Accommodation": 577, "카페": 223, "음식점": 959, "관광지": 118}
+
+
+def synthetic_catalog(dim, seed=0):
+    """카테고리별로 주제 클러스터가 있는 합성 장소 벡터"""
+    rng = np.random.default_rng(seed)
+    place_ids, categories, vectors, dislikes = [], [], [], []
+    pid = 0
+    for cat, n in CATALOG_SIZES.items():
+        topics = rng.normal(size=(12, dim))
+        labels = rng.integers(0, len(topics), n)
+        vecs = topics[labels] + 0.6 * rng.normal(size=(n, dim))
+        for i in range(n):
+            place_ids.append(pid)
+            categories.append(cat)
+            dislikes.append(rng.normal(size=dim) if rng.random() < 0.7 else None)
+            pid += 1
+        vectors.append(vecs)
+    return place_ids, categories, np.vstack(vectors).astype(np.float32), dislikes
+
+
+def brute_force(store, query, category, k):
+    meta = store.meta["categories"][category]
+    rows = np.arange(meta["start"], meta["end"])
+    sims = np.asarray(store.vectors[rows]) @ _normalize(query)
+    top = np.argsort(-sims, kind="stable")[:k]
+    return [int(store.place_ids[r]) for r in rows[top]]
+
+
+def run(store, queries, k, n_probe):
+    store.n_probe = n_probe
+    recalls, latencies, exact_latencies = [], [], []
+    for category, query in queries:
+        t = time.perf_counter()
+        truth = brute_force(store, query, category, k)
+        exact_latencies.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        hits = store.near_vector(query, category, k)
+        latencies.append(time.perf_counter() - t)
+        recalls.append(len({h.place_id for h in hits} & set(truth)) / max(1, len(truth)))
+    return {
+        "n_probe": n_probe,
+        "k": k,
+        "recall_mean": round(float(np.mean(recalls)), 4),
+        "recall_min": round(float(np.min(recalls)), 4),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 3),
+        "brute_p50_ms": round(statistics.median(exact_latencies) * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 벡터 인덱스 recall/지연시간 측정")
+    parser.add_argument("--index", help="기존 인덱스 디렉토리 (없으면 합성 데이터로 빌드)")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, nargs="+", default=[30, 300])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.index:
+        index_dir = Path(args.index)
+    else:
+        index_dir = Path(tempfile.mkdtemp(prefix="vector_index_"))
+        t = time.perf_counter()
+        build_local_index(index_dir, *synthetic_catalog(args.dim))
+        print(f"[BUILD] {time.perf_counter() - t:.2f}s")
+
+    store = LocalPlaceStore(index_dir)
+    rng = np.random.default_rng(1)
+    categories = list(store.meta["categories"])
+    # 쿼리: 저장된 벡터 + 노이즈 (유저 like 벡터가 장소 주제 근처에 있다고 가정)
+    queries = []
+    for _ in range(args.queries):
+        cat = categories[rng.integers(len(categories))]
+        meta = store.meta["categories"][cat]
+        row = rng.integers(meta["start"], meta["end"])
+        queries.append((cat, np.asarray(store.vectors[row]) + 0.05 * rng.normal(size=store.meta["dim"])))
+
+    results = []
+    print(f"{'k':>5}{'nprobe':>8}{'recall':>9}{'min':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'brute(ms)':>11}")
+    for k in args.k:
+        for n_probe in args.nprobe:
+            r = run(store, queries, k, n_probe)
+            results.append(r)
+            print(f"{k:>5}{n_probe:>8}{r['recall_mean']:>9}{r['recall_min']:>8}"
+                  f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['brute_p50_ms']:>11}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+벡터 검색 응답 크기 / 클라이언트 메모리 벤치마크 (기존 검색 vs 슬림 검색)
+
+- 기존: 카테고리별 limit=4000, 장소 벡터 포함(include_vector=True), 전체 속성 반환 → 클라이언트에서 전부 정렬
+- 슬림: limit=candidate_limit(TOP_K), 벡터 제외, place_id / dislike_embedding 만 반환,
+        스트림 점수화 + 상위 TOP_K 힙 (부족하면 limit 2배로 재검색)
+
+측정값 (유저 1명 = like 벡터 1개 × 4개 카테고리):
+- 반환 객체 수, 예상 전송 바이트 (속성 JSON + float32 벡터), 결과 객체를 만드는 동안의 tracemalloc peak
+- 슬림 검색의 재검색(limit 확장) 횟수
+
+모드:
+- 기본(오프라인): 가짜 인코더 + 카탈로그 CSV 로컬 인덱스로 두 응답 형태를 재현
+- --weaviate   : 실제 Weaviate Place 컬렉션에 두 형태로 질의 (지연시간 포함)
+
+사용법:
+    python benchmarks/bench_vector_payload.py [--users 20] [--weaviate] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(PLANNING_DIR))
+
+from bench_pipeline import DEFAULT_INDEX_DIR, KEYWORD_POOLS, ensure_index  # noqa: E402
+
+CATEGORIES = ["Accommodation", "카페", "음식점", "관광지"]
+OLD_LIMIT = 4000
+FLOAT_BYTES = 4
+
+
+def user_texts(n, seed=0):
+    """합성 유저 like 키워드 문장 / dislike 키워드"""
+    rng = np.random.default_rng(seed)
+    users = []
+    for _ in range(n):
+        likes = [pool[rng.integers(len(pool))] for pool in KEYWORD_POOLS.values()]
+        dislikes = [pool[rng.integers(len(pool))] for pool in KEYWORD_POOLS.values()][:2]
+        users.append((" ".join(likes), dislikes))
+    return users
+
+
+def payload_bytes(properties, vector):
+    """응답 1건의 예상 전송 크기 (속성 JSON + float32 벡터)"""
+    props = dict(properties)
+    dislike = props.pop("dislike_embedding", None)
+    size = len(json.dumps(props, ensure_ascii=False, default=str).encode("utf-8"))
+    if dislike is not None:
+        size += len(dislike) * FLOAT_BYTES
+    if vector is not None:
+        size += len(vector) * FLOAT_BYTES
+    return size
+
+
+# ========== 오프라인: 로컬 인덱스로 두 응답 형태 재현 ==========
+def catalog_properties():
+    """place_id → 카탈로그 행 전체 (Weaviate 전체 속성 반환에 해당)"""
+    import pandas as pd
+    from catalog import SCHEDULE_FILES
+    from regions import DATA_SET_DIR
+
+    rows = {}
+    for filename in SCHEDULE_FILES.values():
+        for row in pd.read_csv(DATA_SET_DIR / filename).to_dict("records"):
+            rows[row["id"]] = {k: v for k, v in row.items() if not (isinstance(v, float) and np.isnan(v))}
+    return rows
+
+
+def old_shape_offline(store, rows, row_of, vector, category):
+    """기존 형태: limit=4000, 장소 벡터 + 전체 속성"""
+    hits = store.near_vector(vector, category, OLD_LIMIT)
+    objects = []
+    for hit in hits:
+        row = row_of[int(hit.place_id)]
+        properties = dict(rows.get(hit.place_id, {}), place_id=hit.place_id,
+                          dislike_embedding=[float(x) for x in hit.dislike_embedding])
+        objects.append((properties, [float(x) for x in store.vectors[row]], hit.distance))
+    return objects
+
+
+def slim_shape_offline(store, vector, category, limit):
+    """슬림 형태: place_id / dislike_embedding 만"""
+    return [({"place_id": h.place_id, "dislike_embedding": [float(x) for x in h.dislike_embedding]}, None, h.distance)
+            for h in store.near_vector(vector, category, limit)]
+
+
+# ========== Weaviate ==========
+def old_shape_weaviate(collection, vector, category):
+    import weaviate.classes.query as wq
+    res = collection.query.near_vector(
+        near_vector=[float(x) for x in vector], limit=OLD_LIMIT, return_metadata=["distance"],
+        include_vector=True, filters=wq.Filter.by_property("category").equal(category))
+    return [(o.properties, o.vector.get("default") if isinstance(o.vector, dict) else o.vector, o.metadata.distance)
+            for o in res.objects]
+
+
+def slim_shape_weaviate(collection, vector, category, limit):
+    import weaviate.classes.query as wq
+    from vector_store import RETURN_PROPERTIES
+    res = collection.query.near_vector(
+        near_vector=[float(x) for x in vector], limit=limit, return_metadata=["distance"],
+        return_properties=RETURN_PROPERTIES, include_vector=False,
+        filters=wq.Filter.by_property("category").equal(category))
+    return [(o.properties, None, o.metadata.distance) for o in res.objects]
+
+
+def measure(fetch):
+    """fetch() 결과의 (객체 수, 예상 바이트, tracemalloc peak MB, 소요 시간)"""
+    tracemalloc.start()
+    t = time.perf_counter()
+    objects = fetch()
+    elapsed = time.perf_counter() - t
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = sum(payload_bytes(p, v) for p, v, _ in objects)
+    return len(objects), size, peak / 1024 / 1024, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 검색 응답 크기/메모리 비교")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--weaviate", action="store_true", help="실제 Weaviate 컬렉션에 질의")
+    parser.add_argument("--index-dir", default=str(DEFAULT_INDEX_DIR))
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    import softmax
+    from softmax import CONFIG, candidate_limit, max_dislike_similarity, top_k_candidates
+
+    top_k = CONFIG["TOP_K"]
+    slim_limit = candidate_limit(top_k)
+
+    if args.weaviate:
+        from vector_store import get_collection, get_place_store
+        encoder = softmax.get_model()
+        collection = get_collection()
+        store = get_place_store()
+
+        def old_fetch(vec, cat):
+            return old_shape_weaviate(collection, vec, cat)
+
+        def slim_fetch(vec, cat, limit):
+            return slim_shape_weaviate(collection, vec, cat, limit)
+    else:
+        from encoders import FakeEncoder
+        from vector_store import LocalPlaceStore
+        index_dir = Path(args.index_dir)
+        ensure_index(index_dir)
+        encoder = FakeEncoder()
+        store = LocalPlaceStore(index_dir)
+        row_of = {int(pid): i for i, pid in enumerate(store.place_ids)}
+        rows = catalog_properties()
+
+        def old_fetch(vec, cat):
+            return old_shape_offline(store, rows, row_of, vec, cat)
+
+        def slim_fetch(vec, cat, limit):
+            return slim_shape_offline(store, vec, cat, limit)
+
+    # 슬림 경로의 실제 검색 횟수/후보 수 (limit 확장 포함)
+    fetched = []
+
+    def counting_near_vector(vector, category, limit):
+        fetched.append(limit)
+        return store.near_vector(vector, category, limit)
+
+    softmax.near_vector = counting_near_vector
+
+    old_rows, slim_rows = [], []
+    expansions = 0
+    for like_text, dislikes in user_texts(args.users, args.seed):
+        vec = encoder.encode(like_text, convert_to_numpy=True)
+        dislike_vecs = [encoder.encode(d, convert_to_numpy=True) for d in dislikes]
+        old_user, slim_user = [0, 0, 0.0, 0.0], [0, 0, 0.0, 0.0]
+        for cat in CATEGORIES:
+            for acc, result in ((old_user, measure(lambda: old_fetch(vec, cat))),
+                                (slim_user, measure(lambda: slim_fetch(vec, cat, slim_limit)))):
+                acc[0] += result[0]
+                acc[1] += result[1]
+                acc[2] = max(acc[2], result[2])
+                acc[3] += result[3]
+
+            # 슬림 경로가 첫 limit으로 부족해 재검색한 경우 추가 응답도 합산
+            fetched.clear()
+            top_k_candidates(vec, cat, top_k,
+                             lambda h, s: s - 0.5 * max_dislike_similarity(dislike_vecs, h.dislike_embedding))
+            for extra in fetched[1:]:
+                expansions += 1
+                result = measure(lambda: slim_fetch(vec, cat, extra))
+                slim_user[0] += result[0]
+                slim_user[1] += result[1]
+                slim_user[3] += result[3]
+        old_rows.append(old_user)
+        slim_rows.append(slim_user)
+
+    def summary(rows):
+        return {
+            "objects_median": statistics.median(r[0] for r in rows),
+            "bytes_median_kb": round(statistics.median(r[1] for r in rows) / 1024, 1),
+            "client_peak_max_mb": round(max(r[2] for r in rows), 2),
+            "latency_median_ms": round(statistics.median(r[3] for r in rows) * 1000, 1)
+        }
+
+    result = {
+        "mode": "weaviate" if args.weaviate else "offline",
+        "users": args.users,
+        "top_k": top_k,
+        "slim_limit": slim_limit,
+        "slim_expansions": expansions,
+        "old": summary(old_rows),
+        "slim": summary(slim_rows)
+    }
+
+    print(f"\n[RESULT] mode={result['mode']} users={args.users} TOP_K={top_k} "
+          f"slim limit={slim_limit} (재검색 {expansions}회)")
+    print(f"{'shape':<8}{'objects':>10}{'bytes(KB)':>12}{'peak(MB)':>11}{'latency(ms)':>13}")
+    for name in ("old", "slim"):
+        s = result[name]
+        print(f"{name:<8}{s['objects_median']:>10}{s['bytes_median_kb']:>12}"
+              f"{s['client_peak_max_mb']:>11}{s['latency_median_ms']:>13}")
+    if result["old"]["bytes_median_kb"]:
+        ratio = result["slim"]["bytes_median_kb"] / result["old"]["bytes_median_kb"]
+        print(f"[RESULT] 전송량 {ratio:.1%} (유저 1명, 4개 카테고리 합계 중앙값)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+가중치 what-if 벤치마크 (오프라인 파이프라인 결과로)
+
+합성 유저 N명을 오프라인 파이프라인(bench_pipeline과 같은 로컬 대체물)으로 한 번 처리한 뒤
+- 현재 가중치 그대로 what_if → 저장된 hybrid 플랜과 같은지 (후보 배열로 다시 계산한 점수가 softmax 결과와 같은지)
+- 가중치 격자(preference/distance × gamma × beta)마다 what_if 응답 시간 (유저별 중앙값 / p95)과 바뀐 장소 비율
+을 확인합니다. 파이프라인 1회(임베딩 + 검색 포함) 시간도 함께 출력합니다.
+
+사용법:
+    python benchmarks/bench_whatif.py [--users 5] [--days 2] [--json out.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(PLANNING_DIR))
+
+from bench_pipeline import DEFAULT_INDEX_DIR, PLANS_DIR, cleanup, ensure_index, offline_env, percentile, synthetic_payloads  # noqa: E402
+
+PREFERENCE_WEIGHTS = [0.5, 0.7, 0.9]  # distance_weight = 1 - preference_weight
+GAMMAS = [0.0, 0.3, 0.6]
+BETAS = [0.25, 0.5, 1.0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가중치 what-if 응답 시간 / 기본 가중치 재현 확인")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--days", type=int, default=2, help="여행 일수")
+    parser.add_argument("--index-dir", default=str(DEFAULT_INDEX_DIR))
+    parser.add_argument("--keep", action="store_true", help="파이프라인 산출물 유지")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    index_dir = Path(args.index_dir)
+    ensure_index(index_dir)
+    os.environ.update(offline_env(index_dir))
+    os.environ["PIPELINE_RESUME"] = "0"
+
+    import process_single_student
+    from plan_store import load_plan
+    from whatif import what_if
+
+    work_dir = Path(tempfile.mkdtemp(prefix="hci_bench_whatif_"))
+    payloads = synthetic_payloads(args.users, work_dir, duration_days=args.days)
+    grid = [{"preference_weight": pw, "distance_weight": round(1 - pw, 2), "gamma": g, "beta": b}
+            for pw, g, b in itertools.product(PREFERENCE_WEIGHTS, GAMMAS, BETAS)]
+
+    pipeline_times, whatif_times, changed, mismatches = [], [], [], 0
+    try:
+        for student_id, input_path in payloads:
+            t = time.perf_counter()
+            if not process_single_student.main(student_id, input_path):
+                raise SystemExit(f"[ERROR] {student_id} 파이프라인 실패")
+            pipeline_times.append(time.perf_counter() - t)
+
+            stored = load_plan(PLANS_DIR / f"{student_id}_plan.json")["plans"]["hybrid"]["days"]
+            result = what_if(student_id)
+            if result["days"] != stored:
+                mismatches += 1
+                print(f"[MISMATCH] {student_id}: 기본 가중치 what-if 가 저장된 hybrid 플랜과 다릅니다")
+
+            user_times = []
+            for weights in grid:
+                t = time.perf_counter()
+                result = what_if(student_id, weights)
+                user_times.append(time.perf_counter() - t)
+                changed.append(result["changed_fraction"])
+            whatif_times.append(statistics.median(user_times))
+            user_p95 = percentile(user_times, 95)
+            print(f"[USER] {student_id}: pipeline {pipeline_times[-1]:.2f}s, "
+                  f"what-if median {whatif_times[-1] * 1000:.1f}ms / p95 {user_p95 * 1000:.1f}ms")
+    finally:
+        if not args.keep:
+            for student_id, _ in payloads:
+                cleanup(student_id)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = {
+        "users": args.users,
+        "days": args.days,
+        "grid": len(grid),
+        "pipeline_s": round(statistics.median(pipeline_times), 3),
+        "whatif_ms": round(statistics.median(whatif_times) * 1000, 2),
+        "whatif_p95_ms": round(percentile(whatif_times, 95) * 1000, 2),
+        "changed_fraction": round(statistics.mean(changed), 3),
+        "mismatches": mismatches
+    }
+    print(f"\n[RESULT] users={args.users}, days={args.days}, 가중치 조합 {len(grid)}개")
+    print(f"[RESULT] 파이프라인 1회 중앙값 {summary['pipeline_s']}s")
+    print(f"[RESULT] what-if 중앙값 {summary['whatif_ms']}ms (유저별 중앙값의 p95 {summary['whatif_p95_ms']}ms)")
+    print(f"[RESULT] 기존 hybrid 대비 바뀐 장소 비율 평균 {summary['changed_fraction']}")
+    print(f"[RESULT] 기본 가중치 재현 불일치 {mismatches}건")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+플랜 생성기 오프라인 평가: popularity / personalized / hybrid 를 같은 유저 집합에서 비교
+
+유저 집합 (--source)
+- synthetic : 합성 유저 N명 (기본 1000, bench_trip_length.synthetic_prefs 점수 + 템플릿 4종 순환 + 무작위 일수/1일 예산)
+              personalized 는 같은 점수의 id 순서를 선호도 목록으로 씁니다.
+- pipeline  : 파이프라인이 남긴 학번별 중간 결과 (user_templates / softmax_result_test / pure_preference_only /
+              clustering_result_test). 평가용 유저 세트(예: 1000명)를 파이프라인으로 돌려 둔 뒤 그대로 평가합니다.
+
+유저를 ProcessPoolExecutor(--workers)로 나눠 처리합니다. 워커마다 지역 카탈로그 / 위치 / 숙소 인덱스 /
+리뷰 정렬 목록을 한 번만 읽고, 플랜 생성기별 시간은 데이터 로드를 빼고 플랜 1개 만드는 시간만 잽니다
+(hybrid 는 클러스터링 + 숙소 선택 + 일정, popularity / personalized 는 일정 채우기).
+
+품질 지표 (플랜 생성기별 유저 평균)
+- km_per_day    : 하루 일정 순서대로 이동 거리 합 (하버사인, 숙소 포함)
+- budget_ratio  : (카페/음식점 가격 합 + 숙소 1박 가격 × 박수) / 총 예산, within_budget: 그 값이 1 이하인 유저 비율
+                  (가격은 hybrid 일정과 같은 기준: schedule_builder.food_price, clustering ACCOMMODATION_PRICE)
+- score_sum     : 일정 장소(숙소 포함, 장소별 1번)의 유저 점수(final_score) 합
+- fill_rate     : 템플릿 장소 슬롯(숙소 제외) 중 채운 비율
+- coverage      : 전체 유저 일정의 서로 다른 장소 수 / 전체 장소 슬롯 수 (유저 간 다양성, 1이면 모두 다른 장소)
+
+사용법:
+    python benchmarks/eval_planners.py [--source synthetic|pipeline] [--users 1000] [--workers 4] [--json report.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(PLANNING_DIR))
+
+import clustering  # noqa: E402
+from artifacts import find_artifact, load_scores, score_ids  # noqa: E402
+from bench_pipeline import percentile  # noqa: E402
+from bench_trip_length import TEMPLATES, synthetic_prefs  # noqa: E402
+from catalog import load_place_catalog  # noqa: E402
+from input import expand_itinerary  # noqa: E402
+from regions import normalize_region  # noqa: E402
+from run_pipeline import load_sorted_by_review  # noqa: E402
+from schedule_builder import (build_hybrid_schedule, build_personalized_schedule, build_popularity_schedule,  # noqa: E402
+                              food_budget, food_price)
+from softmax import CONFIG as SOFTMAX_CONFIG  # noqa: E402
+
+PLANNERS = ("popularity", "personalized", "hybrid")
+SYNTHETIC_DAYS = [1, 2, 3, 5]
+SYNTHETIC_BUDGETS = [100000, 150000, 200000, 300000, 500000]  # 1일 예산
+
+_regions = {}  # 워커 프로세스별 지역 데이터 캐시
+_templates = []
+
+
+def _init_worker():
+    import sklearn.neighbors  # noqa: F401  첫 유저 측정에서 import 시간 제외
+
+    for name in TEMPLATES:
+        with open(PLANNING_DIR / "templates" / name, "r", encoding="utf-8") as f:
+            _templates.append(json.load(f))
+
+
+def region_data(region):
+    """워커에서 지역별 1회: 카탈로그, 위치 dict, 숙소 인덱스, 리뷰 수 정렬 목록"""
+    region = normalize_region(region)
+    if region not in _regions:
+        _regions[region] = {
+            "place_data": load_place_catalog(region),
+            "locations": clustering.place_locations(region),
+            "acc_index": clustering.accommodation_index(region),
+            "sorted_data": load_sorted_by_review(region),
+        }
+    return _regions[region]
+
+
+def synthetic_user(i, seed):
+    """합성 유저 i (seed와 i로 결정적)"""
+    rng = np.random.default_rng([seed, i])
+    days = int(rng.choice(SYNTHETIC_DAYS))
+    template = dict(_templates[i % len(_templates)])
+    template["itinerary"] = expand_itinerary(template["itinerary"], days)
+    template["budget_per_day"] = int(rng.choice(SYNTHETIC_BUDGETS))
+    scores = synthetic_prefs(region_data(None)["locations"], rng, SOFTMAX_CONFIG["TOP_K"])
+    return {"user": f"synthetic{i:04d}", "region": None, "template": template, "days": days,
+            "budget": template["budget_per_day"] * days, "scores": scores,
+            "preference": {cat: [p["id"] for p in places] for cat, places in scores.items()}}
+
+
+def pipeline_user(student_id):
+    """파이프라인 중간 결과로 만든 유저 (없는 파일이 있으면 None)"""
+    template_file = PLANNING_DIR / "user_templates" / f"{student_id}_template.json"
+    cluster_file = PLANNING_DIR / "clustering_result_test" / f"{student_id}_daily_clusters.json"
+    scores_file = PLANNING_DIR / "softmax_result_test" / f"{student_id}_recommendations_softmax.json"
+    preference_file = PLANNING_DIR / "pure_preference_only" / f"{student_id}_recommendations_preference.json"
+    if not (template_file.exists() and cluster_file.exists() and find_artifact(scores_file)):
+        return None
+    with open(template_file, "r", encoding="utf-8") as f:
+        template = json.load(f)
+    with open(cluster_file, "r", encoding="utf-8") as f:
+        cluster_data = json.load(f)
+    scores = load_scores(scores_file)
+    preference = score_ids(load_scores(preference_file)) if find_artifact(preference_file) else score_ids(scores)
+    return {"user": student_id, "region": cluster_data.get("region"), "template": template,
+            "days": int(cluster_data.get("duration_days") or len(template["itinerary"])),
+            "budget": cluster_data["budget"], "scores": scores, "preference": preference}
+
+
+def pipeline_students():
+    return sorted(p.name[:-len("_daily_clusters.json")]
+                  for p in (PLANNING_DIR / "clustering_result_test").glob("*_daily_clusters.json"))
+
+
+def build_plans(user, data):
+    """플랜 생성기별 (일정, 소요 시간 초)"""
+    template, place_data = user["template"], data["place_data"]
+    plans = {}
+
+    t = time.perf_counter()
+    days = build_popularity_schedule(template, place_data, data["sorted_data"])
+    plans["popularity"] = (days, time.perf_counter() - t)
+
+    t = time.perf_counter()
+    days = build_personalized_schedule(template, place_data, user["preference"])
+    plans["personalized"] = (days, time.perf_counter() - t)
+
+    t = time.perf_counter()
+    df = clustering.extract_all_user_places(user["scores"], data["locations"])
+    clusters = clustering.greedy_clustering_optimized(df, clustering.build_spatial_indices(df), user["days"], user["budget"])
+    acc_id, _ = clustering.select_best_accommodation(user["scores"], clusters, data["locations"], user["budget"],
+                                                     user["days"], index=data["acc_index"])
+    days = build_hybrid_schedule(template, place_data, {"clusters": clusters, "Accommodation": acc_id},
+                                 food_budget(template["budget_per_day"]))
+    plans["hybrid"] = (days, time.perf_counter() - t)
+    return plans
+
+
+def travel_km_per_day(days):
+    """하루 일정 순서대로 이동 거리 합의 일평균 (km)"""
+    totals = []
+    for places in days.values():
+        if len(places) < 2:
+            totals.append(0.0)
+            continue
+        lat = np.array([p["lat"] for p in places])
+        lng = np.array([p["lng"] for p in places])
+        totals.append(float(clustering.haversine_vectorized(lat[:-1], lng[:-1], lat[1:], lng[1:]).sum()))
+    return statistics.mean(totals) if totals else 0.0
+
+
+def plan_cost(days, n_days, data):
+    """카페/음식점 가격 합 + 숙소 1박 가격 × 박수 (가격 없는 숙소는 0)"""
+    place_data, index = data["place_data"], data["acc_index"]
+    cost, acc_id = 0.0, None
+    for places in days.values():
+        for p in places:
+            if p["category"] in ("Cafe", "Restaurant"):
+                cost += food_price(place_data[p["id"]])
+            elif p["category"] == "Accommodation":
+                acc_id = p["id"]
+    if acc_id is not None and n_days > 1:
+        rows, found = index.rows_for(np.array([acc_id], dtype=np.int64))
+        if found[0]:
+            nightly = index.prices[clustering.CONFIG["ACCOMMODATION_PRICE"]][rows[0]]
+            cost += 0.0 if np.isnan(nightly) else float(nightly) * (n_days - 1)
+    return cost
+
+
+def evaluate_user(spec):
+    """유저 1명 → {플랜 생성기: 지표} (워커 프로세스에서 실행)"""
+    kind, key, seed = spec
+    user = synthetic_user(key, seed) if kind == "synthetic" else pipeline_user(key)
+    if user is None:
+        return None
+    data = region_data(user["region"])
+    score_by_id = {}
+    for places in user["scores"].values():
+        for p in places:
+            score_by_id.setdefault(p["id"], p["final_score"])
+    slots = sum(1 for day in user["template"]["itinerary"] for s in day["place_plan"] if s["category"] != "Accommodation")
+
+    result = {"user": user["user"]}
+    for name, (days, elapsed) in build_plans(user, data).items():
+        ids = [p["id"] for places in days.values() for p in places if p["category"] != "Accommodation"]
+        unique = {p["id"] for places in days.values() for p in places}
+        result[name] = {
+            "ms": elapsed * 1000,
+            "km_per_day": travel_km_per_day(days),
+            "budget_ratio": plan_cost(days, user["days"], data) / user["budget"] if user["budget"] else None,
+            "score_sum": sum(score_by_id.get(pid, 0.0) for pid in unique),
+            "fill_rate": len(ids) / slots if slots else 1.0,
+            "ids": ids,
+        }
+    return result
+
+
+def summarize(results):
+    """플랜 생성기별 지연시간 분위수 + 품질 지표 평균"""
+    summary = {}
+    for name in PLANNERS:
+        rows = [r[name] for r in results]
+        ms = [r["ms"] for r in rows]
+        ratios = [r["budget_ratio"] for r in rows if r["budget_ratio"] is not None]
+        all_ids = [pid for r in rows for pid in r["ids"]]
+        summary[name] = {
+            "latency_ms": {"p50": round(percentile(ms, 50), 3), "p95": round(percentile(ms, 95), 3),
+                           "p99": round(percentile(ms, 99), 3), "max": round(max(ms), 3)},
+            "km_per_day": round(statistics.mean(r["km_per_day"] for r in rows), 3),
+            "budget_ratio": round(statistics.mean(ratios), 4) if ratios else None,
+            "within_budget": round(sum(1 for x in ratios if x <= 1) / len(ratios), 4) if ratios else None,
+            "score_sum": round(statistics.mean(r["score_sum"] for r in rows), 4),
+            "fill_rate": round(statistics.mean(r["fill_rate"] for r in rows), 4),
+            "coverage": round(len(set(all_ids)) / len(all_ids), 4) if all_ids else None,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="popularity / personalized / hybrid 오프라인 평가 (지연시간 + 품질)")
+    parser.add_argument("--source", choices=("synthetic", "pipeline"), default="synthetic")
+    parser.add_argument("--users", type=int, default=1000, help="synthetic: 유저 수, pipeline: 최대 유저 수 (0이면 전체)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="프로세스 수 (1이면 현재 프로세스에서)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과 리포트 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.source == "synthetic":
+        specs = [("synthetic", i, args.seed) for i in range(args.users)]
+    else:
+        students = pipeline_students()
+        specs = [("pipeline", sid, args.seed) for sid in (students[:args.users] if args.users else students)]
+
+    t = time.perf_counter()
+    if args.workers <= 1:
+        _init_worker()
+        results = [evaluate_user(spec) for spec in specs]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+            results = list(pool.map(evaluate_user, specs, chunksize=max(1, len(specs) // (args.workers * 8))))
+    wall = time.perf_counter() - t
+    results = [r for r in results if r is not None]
+    if not results:
+        # pipeline: 클러스터 결과만 있고 유저 템플릿 / 점수가 없는 학번은 건너뜀
+        sys.exit("[ERROR] 평가할 유저가 없습니다 (pipeline: clustering_result_test 에 결과 없음)")
+    summary = summarize(results)
+
+    print(f"\n[RESULT] source={args.source}, users={len(results)}, workers={args.workers}, "
+          f"wall {wall:.2f}s ({len(results) / wall:.1f} users/s)")
+    print(f"{'planner':<13}{'p50(ms)':>9}{'p95(ms)':>9}{'p99(ms)':>9}{'km/day':>8}{'budget':>8}"
+          f"{'within':>8}{'score':>8}{'fill':>7}{'coverage':>10}")
+    for name, s in summary.items():
+        lat = s["latency_ms"]
+        print(f"{name:<13}{lat['p50']:>9}{lat['p95']:>9}{lat['p99']:>9}{s['km_per_day']:>8}{str(s['budget_ratio']):>8}"
+              f"{str(s['within_budget']):>8}{s['score_sum']:>8}{s['fill_rate']:>7}{str(s['coverage']):>10}")
+    print("[RESULT] budget: 지출 / 총 예산 평균, within: 예산 안 유저 비율, score: 일정 장소 점수 합, "
+          "coverage: 서로 다른 장소 / 전체 슬롯")
+
+    if args.json:
+        report = {"source": args.source, "users": len(results), "workers": args.workers, "seed": args.seed,
+                  "wall_s": round(wall, 3), "planners": summary}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+
+
+if __name__ == "__main__":
+    main()
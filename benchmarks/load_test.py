@@ -0,0 +1,268 @@
+"""
+설문 제출 → 플랜 조회 부하 테스트 (replay)
+
+설문 payload를 설정한 속도(--rate, 초당 제출 수)와 동시성(--concurrency)으로 API에 제출하고,
+프론트엔드처럼 /survey/status/{student_id} 를 주기적으로 조회한 뒤 완료되면 /plans/by-student/{student_id} 를 받아옵니다.
+submit / status / time-to-plan(제출 시작 → 플랜 응답) 지연시간의 p50/p95/p99를 출력합니다.
+
+payload:
+- --payloads FILE : JSON Lines, 한 줄에 설문 payload 1건 ({"responses": {...}}).
+                    학번은 실행마다 고유하게 바꿔서 제출합니다 (원래 학번 + 실행 id).
+                    "responses" 가 없는 줄(예: 저장소의 requests.jsonl 백로그)은 건너뜁니다.
+- 없으면 planning/input.json 을 기반으로 한 합성 payload (bench_pipeline과 같은 변형)
+
+대상 서버:
+- --url http://localhost:8000 : 이미 떠 있는 서버
+- --spawn : 임시 디렉토리에 앱을 복사해 오프라인 대체물(ENCODER_BACKEND=fake, VECTOR_BACKEND=local,
+            TRANSLATOR=fake)로 uvicorn 실행 → 저장소의 data/ 는 건드리지 않음
+
+사용법:
+    python benchmarks/load_test.py --spawn --users 50 --rate 5 --concurrency 20 [--workers 2] [--json out.json]
+"""
+import argparse
+import json
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_pipeline import DEFAULT_INDEX_DIR, ensure_index, offline_env, synthetic_payloads  # noqa: E402
+
+APP_ITEMS = ["main.py", "routers", "services", "planning", "static", "greedy"]
+APP_IGNORE = shutil.ignore_patterns("__pycache__", "models", "vector_index", "survey_inputs")
+
+
+# ========== HTTP ==========
+def _request(method, url, body=None, timeout=30):
+    """(status, 응답 바이트, 소요 시간) 반환. 연결 오류는 status 0"""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method,
+                                 headers={"Content-Type": "application/json"} if data else {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            payload = resp.read()
+            return resp.status, payload, time.perf_counter() - start
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), time.perf_counter() - start
+    except (urllib.error.URLError, OSError):
+        return 0, b"", time.perf_counter() - start
+
+
+# ========== payload ==========
+def load_payloads(path, users, run_id, seed):
+    """payload 목록 (학번은 run_id로 고유화, 32자 제한)"""
+    payloads = []
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict) and isinstance(record.get("responses"), dict):
+                    payloads.append(record)
+        if not payloads:
+            print(f"[WARNING] {path} 에 설문 payload가 없습니다. 합성 payload를 사용합니다.")
+
+    if not payloads:
+        with tempfile.TemporaryDirectory() as tmp:
+            for _, p in synthetic_payloads(users, Path(tmp), seed):
+                with open(p, "r", encoding="utf-8") as f:
+                    payloads.append(json.load(f))
+
+    result = []
+    for i in range(users):
+        payload = json.loads(json.dumps(payloads[i % len(payloads)]))
+        payload["responses"]["studentID"] = f"lt{run_id}{i:05d}"
+        result.append(payload)
+    return result
+
+
+# ========== 서버 실행 (--spawn) ==========
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_app(workers, concurrency, index_dir):
+    """임시 디렉토리에 앱 복사 후 오프라인 대체물로 uvicorn 실행. (process, url, app_dir) 반환"""
+    app_dir = Path(tempfile.mkdtemp(prefix="hci_loadtest_"))
+    for item in APP_ITEMS:
+        src = BASE_DIR / item
+        if src.is_dir():
+            shutil.copytree(src, app_dir / item, ignore=APP_IGNORE)
+        elif src.exists():
+            shutil.copy2(src, app_dir / item)
+    (app_dir / "data").mkdir()
+
+    env = offline_env(index_dir)
+    env["PIPELINE_CONCURRENCY"] = str(concurrency)
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=str(app_dir), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        if _request("GET", f"{url}/metrics", timeout=2)[0] == 200:
+            return proc, url, app_dir
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("[ERROR] uvicorn 서버가 시작되지 않았습니다.")
+
+
+# ========== 유저 1명 시나리오 ==========
+def run_user(url, payload, poll_interval, deadline_s):
+    """제출 → 상태 폴링 → 플랜 조회"""
+    sid = payload["responses"]["studentID"]
+    result = {"student_id": sid, "status_latencies": [], "outcome": None}
+    start = time.perf_counter()
+
+    code, _, elapsed = _request("POST", f"{url}/survey/submit", payload)
+    result["submit_s"] = elapsed
+    result["submit_status"] = code
+    if code != 200:
+        result["outcome"] = f"submit_{code}"
+        return result
+
+    while time.perf_counter() - start < deadline_s:
+        time.sleep(poll_interval)
+        code, body, elapsed = _request("GET", f"{url}/survey/status/{sid}")
+        result["status_latencies"].append(elapsed)
+        if code != 200:
+            continue
+        status = json.loads(body).get("status")
+        if status == "failed":
+            result["outcome"] = "failed"
+            return result
+        if status == "completed":
+            code, _, elapsed = _request("GET", f"{url}/plans/by-student/{sid}")
+            result["plan_s"] = elapsed
+            if code == 200:
+                result["outcome"] = "completed"
+                result["time_to_plan_s"] = time.perf_counter() - start
+            else:
+                result["outcome"] = f"plan_{code}"
+            return result
+
+    result["outcome"] = "deadline"
+    return result
+
+
+# ========== 집계 ==========
+def percentiles(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] * 1000, 1)
+
+    return {"n": len(values), "p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99),
+            "mean_ms": round(statistics.mean(values) * 1000, 1)}
+
+
+def summarize(results, wall_s):
+    outcomes = {}
+    for r in results:
+        outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+    completed = [r for r in results if r["outcome"] == "completed"]
+    return {
+        "users": len(results),
+        "wall_s": round(wall_s, 2),
+        "outcomes": outcomes,
+        "throughput_plans_per_min": round(len(completed) / wall_s * 60, 2) if wall_s else None,
+        "submit": percentiles([r["submit_s"] for r in results]),
+        "status": percentiles([x for r in results for x in r["status_latencies"]]),
+        "plan_fetch": percentiles([r["plan_s"] for r in completed]),
+        "time_to_plan": percentiles([r["time_to_plan_s"] for r in completed])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="설문 제출/상태 조회/플랜 조회 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="대상 서버 (--spawn 이면 무시)")
+    parser.add_argument("--spawn", action="store_true", help="오프라인 대체물로 임시 서버 실행")
+    parser.add_argument("--workers", type=int, default=1, help="--spawn 시 uvicorn 워커 수")
+    parser.add_argument("--pipeline-concurrency", type=int, default=4, help="--spawn 시 PIPELINE_CONCURRENCY")
+    parser.add_argument("--index-dir", default=str(DEFAULT_INDEX_DIR))
+    parser.add_argument("--payloads", help="설문 payload JSON Lines 파일")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=2.0, help="초당 제출 수")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시에 진행 중인 유저 시나리오 상한")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="상태 조회 간격 (초)")
+    parser.add_argument("--deadline", type=float, default=600, help="유저별 최대 대기 시간 (초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:6]
+    payloads = load_payloads(args.payloads, args.users, run_id, args.seed)
+
+    proc = app_dir = None
+    url = args.url.rstrip("/")
+    if args.spawn:
+        index_dir = Path(args.index_dir)
+        ensure_index(index_dir)
+        proc, url, app_dir = spawn_app(args.workers, args.pipeline_concurrency, index_dir)
+        print(f"[SPAWN] {url} (workers={args.workers}, app={app_dir})")
+
+    results = []
+    lock = threading.Lock()
+
+    def task(payload):
+        r = run_user(url, payload, args.poll_interval, args.deadline)
+        with lock:
+            results.append(r)
+            print(f"[{len(results)}/{len(payloads)}] {r['student_id']}: {r['outcome']}"
+                  + (f" ({r['time_to_plan_s']:.1f}s)" if "time_to_plan_s" in r else ""))
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            # 열린 루프 도착: rate에 맞춰 제출 시작 (동시성 상한에 걸리면 큐에서 대기)
+            for i, payload in enumerate(payloads):
+                target = start + i / args.rate
+                delay = target - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(task, payload)
+        wall = time.perf_counter() - start
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+            shutil.rmtree(app_dir, ignore_errors=True)
+
+    summary = summarize(results, wall)
+    print(f"\n[RESULT] users={summary['users']} wall={summary['wall_s']}s outcomes={summary['outcomes']} "
+          f"throughput={summary['throughput_plans_per_min']} plans/min")
+    print(f"{'metric':<14}{'n':>6}{'p50(ms)':>11}{'p95(ms)':>11}{'p99(ms)':>11}")
+    for key in ("submit", "status", "plan_fetch", "time_to_plan"):
+        p = summary[key]
+        if p:
+            print(f"{key:<14}{p['n']:>6}{p['p50_ms']:>11}{p['p95_ms']:>11}{p['p99_ms']:>11}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "summary": summary, "runs": results}, f, ensure_ascii=False, indent=2)
+        print(f"[SAVE] {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,18 @@
 import json
+import os
 import pandas as pd
 from pathlib import Path
 import time
 
 # -----------------------------
-# 경로 설정
+# 경로 설정 (평가 데이터 위치는 EVAL_DIR 환경 변수, 기본 <repo>/evaluation)
 # -----------------------------
-BASE_DIR = Path(r"C:\Users\changjin\workspace\lab\pln")
+BASE_DIR = Path(__file__).resolve().parents[1]
+EVAL_DIR = Path(os.getenv("EVAL_DIR", BASE_DIR / "evaluation"))
 
-TEMPLATE_DIR = BASE_DIR / "evaluation" / "100_plan_template"
-PREF_DIR = BASE_DIR / "evaluation" / "100_place_preference"
-OUTPUT_PATH = BASE_DIR / "evaluation" / "100_generated_plan" / "preference_summary.json"
+TEMPLATE_DIR = EVAL_DIR / "100_plan_template"
+PREF_DIR = EVAL_DIR / "100_place_preference"
+OUTPUT_PATH = EVAL_DIR / "100_generated_plan" / "preference_summary.json"
 
 # -----------------------------
 # 선호도 데이터 로드
@@ -1,20 +1,22 @@
 import json
+import os
 import pandas as pd
 from pathlib import Path
 import time
 
 # -----------------------------
-# 경로 설정
+# 경로 설정 (평가 데이터 위치는 EVAL_DIR 환경 변수, 기본 <repo>/evaluation)
 # -----------------------------
-BASE_DIR = Path(r"C:\Users\changjin\workspace\lab\pln")
-TEMPLATE_DIR = BASE_DIR / "evaluation" / "100_plan_template"
+BASE_DIR = Path(__file__).resolve().parents[1]
+EVAL_DIR = Path(os.getenv("EVAL_DIR", BASE_DIR / "evaluation"))
+TEMPLATE_DIR = EVAL_DIR / "100_plan_template"
 
 ACCOM_PATH = BASE_DIR / "greedy" / "sorting_review_dataset" / "accommodations_fixed_sorted.csv"
 ATTR_PATH = BASE_DIR / "greedy" / "sorting_review_dataset" / "attractions_fixed_sorted.csv"
 CAFE_PATH = BASE_DIR / "greedy" / "sorting_review_dataset" / "cafe_fixed_sorted.csv"
 REST_PATH = BASE_DIR / "greedy" / "sorting_review_dataset" / "restaurants_fixed_sorted.csv"
 
-OUTPUT_PATH = BASE_DIR / "evaluation" / "100_generated_plan" / "review_summary.json"
+OUTPUT_PATH = EVAL_DIR / "100_generated_plan" / "review_summary.json"
 
 # -----------------------------
 # CSV 로드 및 정렬 함수
@@ -24,16 +26,22 @@ def load_sorted_csv(path):
     df = df.sort_values(by="all_review_count", ascending=False)
     return df.reset_index(drop=True)
 
+
+def ranked_ids(df):
+    """리뷰 많은 순서의 id 목록 (문자열)"""
+    return df["id"].astype(str).tolist()
+
 # -----------------------------
 # 일정 생성 함수
 # -----------------------------
-def generate_itinerary(user_id, template, accom_df, attr_df, cafe_df, rest_df):
+def generate_itinerary(user_id, template, accom_ids, attr_ids, cafe_ids, rest_ids):
     start_time = time.perf_counter()
     itinerary = []
     used_ids = set()
+    cursors = {}  # 카테고리별로 이미 지나간 위치 (앞쪽 id는 계속 사용 중이므로 이어서 찾기)
 
     # ✅ 유저의 숙소는 고정 (가장 리뷰 많은 1개)
-    accommodation_id = str(accom_df.iloc[0]["id"])
+    accommodation_id = accom_ids[0]
 
     for day_plan in template["itinerary"]:
         day_name = f"day{day_plan['day']}"
@@ -51,20 +59,23 @@ def generate_itinerary(user_id, template, accom_df, attr_df, cafe_df, rest_df):
 
             # 나머지 카테고리는 리뷰 많은 순서대로
             if cat == "Attraction":
-                df = attr_df
+                ids = attr_ids
             elif cat == "Cafe":
-                df = cafe_df
+                ids = cafe_ids
             elif cat == "Restaurant":
-                df = rest_df
+                ids = rest_ids
             else:
                 continue
 
-            for _, row in df.iterrows():
-                pid = str(row["id"])
+            i = cursors.get(cat, 0)
+            while i < len(ids):
+                pid = ids[i]
+                i += 1
                 if pid not in used_ids:
                     used_ids.add(pid)
                     places.append([pid, cat])
                     break
+            cursors[cat] = i
 
         itinerary.append([day_name, is_peak, is_weekend, places])
 
@@ -75,10 +86,10 @@ def generate_itinerary(user_id, template, accom_df, attr_df, cafe_df, rest_df):
 # 실행부
 # -----------------------------
 def main():
-    accom_df = load_sorted_csv(ACCOM_PATH)
-    attr_df = load_sorted_csv(ATTR_PATH)
-    cafe_df = load_sorted_csv(CAFE_PATH)
-    rest_df = load_sorted_csv(REST_PATH)
+    accom_ids = ranked_ids(load_sorted_csv(ACCOM_PATH))
+    attr_ids = ranked_ids(load_sorted_csv(ATTR_PATH))
+    cafe_ids = ranked_ids(load_sorted_csv(CAFE_PATH))
+    rest_ids = ranked_ids(load_sorted_csv(REST_PATH))
 
     results = []
 
@@ -87,7 +98,7 @@ def main():
         with open(file, "r", encoding="utf-8") as f:
             template = json.load(f)
 
-        result = generate_itinerary(user_id, template, accom_df, attr_df, cafe_df, rest_df)
+        result = generate_itinerary(user_id, template, accom_ids, attr_ids, cafe_ids, rest_ids)
         results.append(result)
         print(f"✅ {user_id} 일정 생성 완료 ({len(template['itinerary'])}일차)")
 
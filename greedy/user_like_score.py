@@ -12,9 +12,11 @@ from weaviate.classes import query as wq
 
 
 # ========== CONFIG ==========
+# 평가 데이터 위치는 EVAL_DIR 환경 변수 (기본 <repo>/evaluation)
+EVAL_DIR = os.getenv("EVAL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "evaluation"))
 CONFIG = {
-    "USER_FILE": r"C:\Users\changjin\workspace\lab\pln\data_set\1000_user_info.csv",
-    "OUTPUT_DIR": r"C:\Users\changjin\workspace\lab\pln\vector_embedding\pure_preference_only",
+    "USER_FILE": os.path.join(EVAL_DIR, "1000_user_info.csv"),
+    "OUTPUT_DIR": os.path.join(EVAL_DIR, "pure_preference_only"),
 }
 
 CATEGORY_FILES = {
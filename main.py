@@ -1,9 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from routers import survey, plans
+from services import metrics
 from pathlib import Path
+import time
 
 app = FastAPI(
     title="Travel Plan Generator",
@@ -20,6 +23,22 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 헤더 허용
 )
 
+# 요청 수/지연시간 메트릭 (라우트 템플릿 기준: /plans/by-student/{student_id})
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", None) or "unmatched"
+        metrics.http_requests_total.inc(request.method, route_path, str(status))
+        metrics.http_request_duration_seconds.observe(time.perf_counter() - start, request.method, route_path)
+
+
 # 디렉토리 설정
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
@@ -40,7 +59,7 @@ app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 # 1) 루트에서 바로 프론트 보여주고 싶으면:
 @app.get("/", include_in_schema=False)
-def serve_front():
+async def serve_front():
     index_file = STATIC_DIR / "index.html"
     if index_file.exists():
         return FileResponse(index_file)
@@ -48,6 +67,13 @@ def serve_front():
     return {"message": "Travel Plan API is running. Put index.html in /static to enable UI."}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    # 대기열 게이지가 data/jobs 레코드를 읽으므로 스레드풀에서 렌더링
+    body = await run_in_threadpool(metrics.registry.render)
+    return Response(content=body, media_type=metrics.CONTENT_TYPE)
+
+
 # 2) 혹시 API 루트는 JSON, 프론트는 /viewer 로 쓰고 싶으면 이거 쓰면 됨:
 # @app.get("/", tags=["Health"])
 # def read_root():
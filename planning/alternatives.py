@@ -0,0 +1,115 @@
+"""
+hybrid 대안 플랜 K개 (점수 계산 1회 결과 공유)
+
+첫 번째 hybrid 플랜을 만든 뒤, 이전 플랜들에 들어간 장소의 점수를 깎아(DIVERSITY_PENALTIES 순서로, 1.0이면 제외)
+클러스터링 → 숙소 선택 → hybrid 일정을 다시 만듭니다. 새 플랜의 장소 중 이전 플랜들에 없던 장소 비율이
+min_new_fraction 이상이면 채택하고, 가장 강한 감점으로도 안 되면 거기서 멈춥니다 (K개보다 적을 수 있음).
+
+대안끼리 공유하는 것:
+- 유저 점수 결과 (softmax 점수 파일 1개) → 클러스터링 입력 df
+- 카테고리별 BallTree / 좌표 배열 (build_spatial_indices 1회, 대안마다 점수 배열만 교체)
+- seed 반경 검색 결과 (cached_radius_rows 캐시: 같은 seed는 BallTree를 다시 부르지 않음)
+- 지역 숙소 가격 인덱스 (AccommodationIndex)
+그래서 K개 플랜 비용은 파이프라인 K번이 아니라 클러스터링 + 일정 조립 K번 정도입니다 (benchmarks/bench_alternatives.py).
+
+HYBRID_ALTERNATIVES (기본 1): 파이프라인이 플랜 파일에 함께 저장할 hybrid 플랜 수 (hybrid_2, hybrid_3, ...)
+"""
+import os
+
+import numpy as np
+
+try:
+    from .clustering import (build_spatial_indices, extract_all_user_places, greedy_clustering_optimized,
+                             select_best_accommodation)
+    from .schedule_builder import build_hybrid_schedule
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from clustering import (build_spatial_indices, extract_all_user_places, greedy_clustering_optimized,
+                            select_best_accommodation)
+    from schedule_builder import build_hybrid_schedule
+
+HYBRID_ALTERNATIVES = int(os.getenv("HYBRID_ALTERNATIVES", "1"))
+MAX_ALTERNATIVES = 5
+MIN_NEW_FRACTION = 0.5  # 새 플랜 장소 중 이전 플랜들에 없던 장소 최소 비율
+DIVERSITY_PENALTIES = (0.5, 1.0)  # 이전 플랜 장소 점수 감점 (약한 것부터, 1.0 = 제외)
+
+
+def alternative_key(i):
+    """대안 번호(1부터) → 플랜 키 (1번은 기존 hybrid)"""
+    return "hybrid" if i == 1 else f"hybrid_{i}"
+
+
+def plan_place_ids(days):
+    """일정의 장소 id (숙소 제외)"""
+    return {p["id"] for places in days.values() for p in places if p["category"] != "Accommodation"}
+
+
+def new_fraction(days, seen):
+    """일정 장소 중 seen 에 없는 장소 비율 (장소가 없으면 0)"""
+    ids = plan_place_ids(days)
+    return len(ids - seen) / len(ids) if ids else 0.0
+
+
+def penalized_inputs(df, spatial_indices, seen, penalty):
+    """
+    seen 장소 점수에 감점 적용한 (df, spatial_indices). penalty >= 1 이면 NaN (seed/후보에서 제외)
+    BallTree / 좌표 / id 배열은 그대로 공유하고 점수 배열만 새로 만듭니다.
+    """
+    factor = np.nan if penalty >= 1 else 1 - penalty
+    seen_ids = np.fromiter(seen, dtype=np.int64, count=len(seen))
+    mask = np.isin(df["id"].to_numpy(), seen_ids)
+    scores = df["final_score"].to_numpy(dtype=float)
+    penalized_df = df.assign(final_score=np.where(mask, scores * factor, scores))
+    indices = {}
+    for cat, idx in spatial_indices.items():
+        mask = np.isin(idx["ids"], seen_ids)
+        indices[cat] = dict(idx, score=np.where(mask, idx["score"] * factor, idx["score"]))
+    return penalized_df, indices
+
+
+def build_hybrid_alternatives(template, place_data, user_prefs, location_dict, budget, duration_days,
+                              food_budget_per_day, k, min_new_fraction=MIN_NEW_FRACTION,
+                              acc_index=None, first=None, excluded=None):
+    """
+    hybrid 플랜 최대 k개 → [{"days", "Accommodation", "accommodation_score", "clusters", "new_fraction"}]
+    user_prefs: softmax 점수 ({카테고리: 점수 목록}), budget: 총 예산
+    first: 이미 만든 첫 플랜 (cluster_data, days) — 있으면 그대로 1번으로 쓰고 대안만 추가
+    excluded: 대안 플랜에 넣지 않을 장소 id (유저가 삭제한 장소, 예산 재계획 시)
+    대안 플랜 클러스터의 final_score 는 감점이 반영된 값입니다.
+    """
+    k = max(1, min(int(k), MAX_ALTERNATIVES))
+    df = extract_all_user_places(user_prefs, location_dict)
+    if excluded and not df.empty:
+        df = df[~df["id"].isin(excluded)].reset_index(drop=True)
+    if df.empty:
+        return []
+    spatial_indices = build_spatial_indices(df)
+    neighbours = {}
+
+    def build(plan_df, indices):
+        clusters = greedy_clustering_optimized(plan_df, indices, duration_days, budget, neighbours=neighbours)
+        acc_id, acc_score = select_best_accommodation(user_prefs, clusters, location_dict, budget, duration_days,
+                                                      index=acc_index)
+        cluster_data = {"clusters": clusters, "Accommodation": acc_id, "accommodation_score": acc_score}
+        return cluster_data, build_hybrid_schedule(template, place_data, cluster_data, food_budget_per_day)
+
+    cluster_data, days = first if first is not None else build(df, spatial_indices)
+    results = [dict(cluster_data, days=days, new_fraction=1.0)]
+    seen = plan_place_ids(days)
+
+    while len(results) < k and seen:
+        for penalty in DIVERSITY_PENALTIES:
+            cluster_data, days = build(*penalized_inputs(df, spatial_indices, seen, penalty))
+            fraction = new_fraction(days, seen)
+            if fraction >= min_new_fraction:
+                break
+        else:
+            break  # 가장 강한 감점으로도 충분히 다른 플랜을 만들 수 없음
+        results.append(dict(cluster_data, days=days, new_fraction=round(fraction, 4)))
+        seen |= plan_place_ids(days)
+    return results
+
+
+def alternative_plans(alternatives):
+    """build_hybrid_alternatives 결과 중 2번째부터 → {플랜 키: {"label", "days"}} (플랜 파일 저장용)"""
+    return {alternative_key(i): {"label": f"인기도 + 개인화 (대안 {i})", "days": alt["days"]}
+            for i, alt in enumerate(alternatives[1:], start=2)}
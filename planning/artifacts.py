@@ -0,0 +1,227 @@
+"""
+중간 추천 결과(점수 파일) 저장 / 읽기
+
+softmax 점수(*_recommendations_softmax)와 순수 선호도 점수(*_recommendations_preference)는
+카테고리별로 최대 TOP_K개의 (id, 점수) 목록입니다. 두 가지 형식으로 저장할 수 있습니다.
+- json : 기존 형식 {"Cafe": [{"id": 1, "final_score": 0.8}, ...], ...}
+- npz  : 카테고리별 id(int64) / 점수(float64) 배열
+         {cat}__id, {cat}__score + __categories__ (카테고리 순서), __score_key__ (점수 키 이름)
+ARTIFACT_FORMAT 환경 변수로 쓰는 형식을 고릅니다 (기본 json). 읽을 때는 형식과 무관하게
+같은 이름의 .npz / .json 중 있는 파일을 찾으므로 (ARTIFACT_FORMAT 형식 우선) 중간에 형식을 바꿔도 됩니다.
+저장할 때는 다른 형식의 같은 이름 파일을 지워 오래된 결과를 읽지 않게 합니다.
+
+load_scores()는 {카테고리: CategoryScores}를 반환합니다. CategoryScores는 배열(ids, scores)을 그대로 들고 있고,
+순회하면 기존 JSON과 같은 {"id", 점수 키} dict를 내주므로 기존 코드도 그대로 동작합니다.
+
+점수 외의 카테고리별 배열(what-if용 검색 후보 등)은 save_arrays / load_arrays 로 항상 .npz 에 저장합니다.
+
+기존 JSON 결과 변환:
+    python planning/artifacts.py planning/softmax_result_test planning/pure_preference_only [--to npz|json] [--keep]
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+ARTIFACT_FORMAT = os.getenv("ARTIFACT_FORMAT", "json")  # "json" | "npz"
+FORMATS = ("json", "npz")
+
+_CATEGORIES_KEY = "__categories__"
+_SCORE_KEY = "__score_key__"
+_META_KEY = "__meta__"
+
+
+class CategoryScores:
+    """카테고리 1개의 (id, 점수) 배열. 점수 내림차순으로 저장된 순서 그대로"""
+
+    __slots__ = ("ids", "scores", "score_key")
+
+    def __init__(self, ids, scores, score_key):
+        self.ids = ids
+        self.scores = scores
+        self.score_key = score_key
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        key = self.score_key
+        for pid, score in zip(self.ids.tolist(), self.scores.tolist()):
+            yield {"id": pid, key: score}
+
+    def to_records(self):
+        return list(self)
+
+
+def score_arrays(places, score_key):
+    """카테고리 점수 목록 → (ids int64 배열, 점수 float64 배열). CategoryScores면 복사 없이 그대로"""
+    if isinstance(places, CategoryScores):
+        return places.ids, places.scores
+    ids = np.fromiter((p["id"] for p in places), dtype=np.int64, count=len(places))
+    scores = np.fromiter((p[score_key] for p in places), dtype=float, count=len(places))
+    return ids, scores
+
+
+def artifact_path(path, fmt=None):
+    """기준 경로(…json)를 주어진 형식(기본 ARTIFACT_FORMAT)의 파일 경로로"""
+    fmt = fmt or ARTIFACT_FORMAT
+    if fmt not in FORMATS:
+        raise ValueError(f"[ERROR] 지원하지 않는 결과 형식: {fmt} (지원: {', '.join(FORMATS)})")
+    return Path(path).with_suffix(f".{fmt}")
+
+
+def find_artifact(path):
+    """기준 경로와 같은 이름의 결과 파일 (ARTIFACT_FORMAT 형식 우선, 없으면 None)"""
+    for fmt in sorted(FORMATS, key=lambda f: f != ARTIFACT_FORMAT):
+        candidate = artifact_path(path, fmt)
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _detect_score_key(data):
+    for places in data.values():
+        for p in places:
+            return next(k for k in p if k != "id")
+    return None
+
+
+def _write_atomic(path, write):
+    """임시 파일에 쓴 뒤 교체"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _write_scores(out, data, score_key):
+    if out.suffix == ".npz":
+        arrays = {_CATEGORIES_KEY: np.array(list(data), dtype=str), _SCORE_KEY: np.array(score_key)}
+        for cat, places in data.items():
+            arrays[f"{cat}__id"], arrays[f"{cat}__score"] = score_arrays(places, score_key)
+        _write_atomic(out, lambda f: np.savez(f, **arrays))
+    else:
+        records = {cat: places.to_records() if isinstance(places, CategoryScores) else places
+                   for cat, places in data.items()}
+        text = json.dumps(records, ensure_ascii=False, indent=2)
+        _write_atomic(out, lambda f: f.write(text.encode("utf-8")))
+
+
+def save_scores(path, data, score_key, fmt=None):
+    """
+    {카테고리: 점수 목록(dict 리스트 또는 CategoryScores)} 저장. 저장한 파일 경로 반환
+    path: 기준 경로 (확장자는 형식에 맞게 바뀜)
+    """
+    out = artifact_path(path, fmt)
+    _write_scores(out, data, score_key)
+
+    # 다른 형식의 이전 결과 제거 (find_artifact가 오래된 파일을 고르지 않도록)
+    for other in FORMATS:
+        stale = artifact_path(path, other)
+        if stale != out and stale.exists():
+            stale.unlink()
+    return out
+
+
+def _read_scores(found):
+    if found.suffix == ".npz":
+        with np.load(found, allow_pickle=False) as npz:
+            score_key = str(npz[_SCORE_KEY])
+            return {str(cat): CategoryScores(npz[f"{cat}__id"], npz[f"{cat}__score"], score_key)
+                    for cat in npz[_CATEGORIES_KEY]}
+
+    with open(found, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    score_key = _detect_score_key(data)
+    return {cat: CategoryScores(*score_arrays(places, score_key), score_key) for cat, places in data.items()}
+
+
+def load_scores(path):
+    """
+    점수 파일 읽기 → {카테고리: CategoryScores}
+    path: 기준 경로 (.json / .npz 중 있는 파일을 읽음, 둘 다 없으면 FileNotFoundError)
+    """
+    found = find_artifact(path)
+    if found is None:
+        raise FileNotFoundError(f"[ERROR] 점수 파일 없음: {path}")
+    return _read_scores(found)
+
+
+def save_arrays(path, data, meta=None):
+    """
+    {카테고리: {이름: 배열}} → .npz ({cat}__{이름} + __categories__). 저장한 파일 경로 반환
+    meta: 함께 저장할 설정값 dict (JSON 문자열로 __meta__)
+    """
+    out = Path(path).with_suffix(".npz")
+    arrays = {_CATEGORIES_KEY: np.array(list(data), dtype=str), _META_KEY: np.array(json.dumps(meta or {}))}
+    for cat, named in data.items():
+        for name, values in named.items():
+            arrays[f"{cat}__{name}"] = np.asarray(values)
+    _write_atomic(out, lambda f: np.savez(f, **arrays))
+    return out
+
+
+def load_arrays(path):
+    """save_arrays 로 저장한 파일 → ({카테고리: {이름: 배열}}, meta) (카테고리 순서 유지)"""
+    with np.load(Path(path).with_suffix(".npz"), allow_pickle=False) as npz:
+        data = {str(cat): {} for cat in npz[_CATEGORIES_KEY]}
+        for key in npz.files:
+            if key not in (_CATEGORIES_KEY, _META_KEY):
+                cat, name = key.rsplit("__", 1)
+                data[cat][name] = npz[key]
+        meta = json.loads(str(npz[_META_KEY])) if _META_KEY in npz.files else {}
+    return data, meta
+
+
+def score_ids(scores):
+    """{카테고리: CategoryScores} → {카테고리: id 리스트} (일정 빌더용, 점수 순서 그대로)"""
+    return {cat: places.ids.tolist() for cat, places in scores.items()}
+
+
+def convert(path, fmt, keep=False):
+    """점수 파일 1개를 fmt 형식으로 변환. 새 파일 경로 반환 (keep이면 원본 유지)"""
+    scores = _read_scores(Path(path))
+    score_key = next((p.score_key for p in scores.values()), None)
+    if keep:
+        out = artifact_path(path, fmt)
+        _write_scores(out, scores, score_key)
+        return out
+    return save_scores(path, scores, score_key, fmt)
+
+
+def _iter_artifacts(paths, fmt):
+    """파일 / 디렉토리 인자 → 변환할 점수 파일 (이미 fmt 형식인 파일 제외)"""
+    for p in map(Path, paths):
+        files = sorted(p.glob("*_recommendations_*.*")) if p.is_dir() else [p]
+        for f in files:
+            if f.suffix in (".json", ".npz") and f.suffix != f".{fmt}":
+                yield f
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="추천 점수 파일 형식 변환 (json ↔ npz)")
+    parser.add_argument("paths", nargs="+", help="점수 파일 또는 디렉토리 (softmax_result_test, pure_preference_only)")
+    parser.add_argument("--to", choices=FORMATS, default="npz")
+    parser.add_argument("--keep", action="store_true", help="원본 파일 유지")
+    args = parser.parse_args()
+
+    converted = 0
+    before = after = 0
+    for src in _iter_artifacts(args.paths, args.to):
+        size = src.stat().st_size
+        out = convert(src, args.to, keep=args.keep)
+        before += size
+        after += out.stat().st_size
+        converted += 1
+        print(f"[CONVERT] {src} -> {out.name} ({size / 1024:.1f}KB -> {out.stat().st_size / 1024:.1f}KB)")
+    print(f"[OK] {converted}개 변환 ({before / 1024:.1f}KB -> {after / 1024:.1f}KB)")
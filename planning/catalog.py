@@ -0,0 +1,109 @@
+"""
+장소 카탈로그 (인메모리, 지역별)
+지역 샤드(regions.region_dir)의 CSV를 읽어 place_id → 장소 정보 dict로 보관합니다.
+지역마다 처음 쓸 때 읽고 최근 REGION_CACHE_SIZE개 지역만 유지하며, CSV 파일이 바뀌면(mtime/size) 다음 호출 때 다시 읽습니다.
+플랜 생성(STEP 4)과 API의 플랜 복원에서 같이 사용합니다.
+"""
+from pathlib import Path
+
+try:
+    from .regions import ShardCache, files_version, region_dir
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from regions import ShardCache, files_version, region_dir
+
+PLANNING_DIR = Path(__file__).resolve().parent
+
+SCHEDULE_FILES = {
+    "Cafe": "cafe_fixed.csv",
+    "Restaurant": "restaurants_fixed.csv",
+    "Attraction": "attractions_fixed.csv",
+    "Accommodation": "accommodations_fixed.csv"
+}
+REVIEW_COLUMNS = {"Accommodation": "review_count"}  # 그 외 카테고리는 all_review_count
+
+
+def catalog_version(region=None):
+    """지역 카탈로그 CSV들의 (파일명, mtime, size). 캐시 무효화 키로 사용"""
+    directory = region_dir(region)
+    return files_version([directory / filename for filename in SCHEDULE_FILES.values()])
+
+
+def load_place_catalog(region=None):
+    """지역 장소 데이터 로드 (처음 쓸 때 / CSV가 바뀌었을 때만 읽음). 반환 dict는 읽기 전용으로 사용"""
+    return _catalogs.get(region)
+
+
+def _read_catalog(region):
+    import pandas as pd  # API 프로세스에서는 첫 플랜 복원 때만 로드
+
+    directory = region_dir(region)
+    place_data = {}
+    for category, filename in SCHEDULE_FILES.items():
+        filepath = directory / filename
+        if not filepath.exists():
+            continue
+        df = pd.read_csv(filepath)
+        lat_col = "lat" if category == "Accommodation" else "latitude"
+        lng_col = "lng" if category == "Accommodation" else "longitude"
+        for row in df.to_dict("records"):
+            desc = row.get("description", "")
+            if pd.isna(desc):
+                desc = ""
+            place_id = row["id"]
+            place_data[place_id] = {
+                "id": place_id, "name": row["name"], "category": category,
+                "latitude": row[lat_col], "longitude": row[lng_col],
+                "avg_price": row.get("avg_price", 0) if category in ["Cafe", "Restaurant"] else None,
+                "description": desc
+            }
+    return place_data
+
+
+_catalogs = ShardCache("catalog", _read_catalog, catalog_version)
+
+
+def _read_review_counts(region):
+    import numpy as np
+    import pandas as pd
+
+    directory = region_dir(region)
+    tables = {}
+    for category, filename in SCHEDULE_FILES.items():
+        filepath = directory / filename
+        if not filepath.exists():
+            continue
+        review_col = REVIEW_COLUMNS.get(category, "all_review_count")
+        df = pd.read_csv(filepath, usecols=["id", review_col])
+        # 같은 id가 여러 번 있으면 마지막 행 (dict(zip(...))와 같은 규칙)
+        df = df.drop_duplicates("id", keep="last").sort_values("id")
+        tables[category] = (df["id"].to_numpy(dtype=np.int64),
+                            df[review_col].fillna(0).to_numpy(dtype=float))
+    return tables
+
+
+_review_counts = ShardCache("reviews", _read_review_counts, catalog_version)
+
+
+def load_review_counts(region=None):
+    """지역 카테고리별 (정렬된 id 배열, 리뷰 수 배열). 리뷰 수가 비어 있으면 0"""
+    return _review_counts.get(region)
+
+
+def lookup_review_counts(table, ids):
+    """ids 순서에 맞춘 리뷰 수 배열 (카탈로그에 없는 id는 0)"""
+    import numpy as np
+
+    ids = np.asarray(ids)
+    # 정수가 아닌 id(문자열 등)는 카탈로그 id와 일치할 수 없음
+    if table is None or len(table[0]) == 0 or len(ids) == 0 or ids.dtype.kind not in "iu":
+        return np.zeros(len(ids))
+    sorted_ids, counts = table
+    pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == ids, counts[pos], 0.0)
+
+
+def place_entry(place_data, pid, time, cat):
+    """일정 슬롯 1개 (플랜 JSON의 장소 항목)"""
+    info = place_data[pid]
+    return {"id": int(pid), "name": info["name"], "description": info["description"],
+            "lat": float(info["latitude"]), "lng": float(info["longitude"]), "time": time, "category": cat}
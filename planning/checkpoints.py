@@ -0,0 +1,112 @@
+"""
+파이프라인 단계별 체크포인트 (실패/타임아웃 후 재시도 시 마지막 성공 단계부터 재개)
+
+단계가 끝나면 data/checkpoints/{student_id}.json 에 그 단계의 키와 출력 파일 digest를 기록합니다
+(임시 파일 → 교체로 원자적 저장):
+    {"format": "checkpoints-v1", "student_id": ...,
+     "stages": {"scoring": {"version": 1, "key": "...", "outputs": {"path": "digest"}, "completed_at": ...}}}
+
+키 = 단계 이름 + STAGE_VERSIONS + 설정값(params) + 입력 파일들의 digest.
+다음 실행에서 키가 같고 출력 파일이 기록된 digest 그대로 남아 있으면 그 단계를 건너뜁니다.
+- 입력(설문, 앞 단계 출력)이 바뀌면 키가 바뀌어 다시 실행 → 뒤 단계도 입력 digest가 바뀌어 연쇄적으로 다시 실행
+- 출력이 중간에 끊겨 쓰였거나 다른 곳(재계획 등)에서 고쳐졌으면 digest 불일치로 다시 실행
+- 단계 로직이나 출력 형식을 바꾸면 STAGE_VERSIONS 의 해당 값을 올려 기존 체크포인트를 무효화하세요.
+
+PIPELINE_RESUME=0 이면 체크포인트를 읽지 않고 모든 단계를 실행합니다 (기록은 계속).
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from .plan_store import write_json_atomic
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from plan_store import write_json_atomic
+
+CHECKPOINT_FORMAT = "checkpoints-v1"
+DEFAULT_CHECKPOINT_DIR = Path(__file__).resolve().parents[1] / "data" / "checkpoints"
+
+STAGE_VERSIONS = {
+    "survey": 2,      # 설문 → 유저 템플릿 + user_info (키워드 번역 포함, v2: region 컬럼)
+    "scoring": 3,     # softmax 추천 점수 (v2: what-if용 검색 후보 배열, v3: 음수 dislike 유사도는 페널티 0)
+    "clustering": 2,  # 일자별 클러스터 + 숙소 (v2: region)
+    "preference": 2,  # 순수 선호도 점수 (v2: 음수 dislike 유사도는 페널티 0)
+}
+
+
+def resume_requested():
+    """PIPELINE_RESUME 환경 변수 (기본 사용)"""
+    return os.getenv("PIPELINE_RESUME", "1").lower() not in ("0", "false", "no", "off")
+
+
+def file_digest(path):
+    """파일 내용 digest (없으면 None)"""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class Checkpoints:
+    """학번 1명의 단계별 체크포인트"""
+
+    def __init__(self, student_id, directory=None, resume=None):
+        self.student_id = str(student_id)
+        self.path = Path(directory or DEFAULT_CHECKPOINT_DIR) / f"{self.student_id}.json"
+        self.resume = resume_requested() if resume is None else resume
+        self._manifest = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = None
+        if not manifest or manifest.get("format") != CHECKPOINT_FORMAT:
+            manifest = {"format": CHECKPOINT_FORMAT, "student_id": self.student_id, "stages": {}}
+        return manifest
+
+    @staticmethod
+    def key(stage, inputs, params=None):
+        """단계 키: 이름 + 버전 + 설정값 + 입력 파일 digest"""
+        payload = [stage, STAGE_VERSIONS[stage], params or {},
+                   [[str(p), file_digest(p)] for p in inputs]]
+        return hashlib.blake2b(json.dumps(payload, sort_keys=True, default=str).encode("utf-8"),
+                               digest_size=16).hexdigest()
+
+    def valid(self, stage, key):
+        """같은 키로 끝난 체크포인트가 있고 출력 파일이 그대로인지"""
+        entry = self._manifest["stages"].get(stage)
+        if not entry or entry.get("version") != STAGE_VERSIONS[stage] or entry.get("key") != key:
+            return False
+        return all(digest is not None and file_digest(p) == digest for p, digest in entry["outputs"].items())
+
+    def commit(self, stage, key, outputs):
+        """단계 완료 기록 (출력 파일 digest 포함, 원자적 저장)"""
+        self._manifest["stages"][stage] = {
+            "version": STAGE_VERSIONS[stage],
+            "key": key,
+            "outputs": {str(p): file_digest(p) for p in outputs},
+            "completed_at": datetime.utcnow().isoformat()
+        }
+        write_json_atomic(self.path, self._manifest)
+
+    def run(self, stage, inputs, outputs, fn, recorder, params=None):
+        """
+        체크포인트가 유효하면 건너뛰고(recorder.mark_reused), 아니면 recorder 단계로 fn() 실행 후 기록.
+        fn()이 False를 반환하면 기록하지 않고 False 반환
+        """
+        key = self.key(stage, inputs, params)
+        if self.resume and self.valid(stage, key):
+            print(f"[RESUME] {stage}: 체크포인트 재사용")
+            recorder.mark_reused(stage)
+            return True
+        with recorder.stage(stage):
+            ok = fn()
+        if ok is False:
+            return False
+        self.commit(stage, key, outputs)
+        return True
@@ -2,17 +2,24 @@ import os
 import json
 import pandas as pd
 import numpy as np
-from sklearn.neighbors import BallTree
 import logging
-from joblib import Parallel, delayed
-import time
+
+try:
+    from .artifacts import find_artifact, load_scores, score_arrays
+    from .regions import ShardCache, files_version, normalize_region, region_file
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from artifacts import find_artifact, load_scores, score_arrays
+    from regions import ShardCache, files_version, normalize_region, region_file
+
+PLANNING_DIR = os.path.dirname(os.path.abspath(__file__))
 
 CONFIG = {
-    "USER_INFO_FILE": r"planning\user_info\202110862_user_info.csv",
-    "USER_PREF_DIR": r"planning\softmax_result_test",
-    "PLACE_FILE": r"planning\data_set\clustering_category_combine_with_hours_and_price.csv",
-    "OUTPUT_DIR": r"planning\clustering_result_test",
-    "LOG_DIR": r"planning\clustering_result_test\log",
+    "USER_INFO_DIR": os.path.join(PLANNING_DIR, "user_info"),
+    "USER_PREF_DIR": os.path.join(PLANNING_DIR, "softmax_result_test"),
+    "PLACE_FILE": os.path.join(PLANNING_DIR, "data_set", "clustering_category_combine_with_hours_and_price.csv"),  # 기본 지역
+    "PLACE_FILENAME": "clustering_category_combine_with_hours_and_price.csv",  # 지역 샤드 안의 위치/가격 파일
+    "OUTPUT_DIR": os.path.join(PLANNING_DIR, "clustering_result_test"),
+    "LOG_DIR": os.path.join(PLANNING_DIR, "clustering_result_test", "log"),
     "PLACES_PER_CATEGORY": 10,
     "MIN_PLACES_PER_CATEGORY": 10,
     "MAX_CLUSTER_RADIUS_KM": 6,
@@ -21,9 +28,12 @@ CONFIG = {
     "USE_PARALLEL": True,
     "N_JOBS": 4,
     "PARALLEL_BACKEND": "threading",
+    "ACCOMMODATION_PRICE": os.getenv("ACCOMMODATION_PRICE", "offpeak_weekend"),  # 숙소 1박 가격 기준 (PRICE_COLUMNS)
 }
 
 CLUSTER_CATEGORIES = ["Cafe", "Restaurant", "Attraction"]
+# 숙소 가격 컬럼 (CSV: {key}_price_avg, 위치 dict: {key}_price)
+PRICE_COLUMNS = ("offpeak_weekday", "offpeak_weekend", "peak_weekday", "peak_weekend")
 logger = None
 
 
@@ -64,32 +74,106 @@ def log_print(msg):
 
 def load_place_locations(place_file):
     df = pd.read_csv(place_file)
-    for col in ["offpeak_weekday_price_avg", "offpeak_weekend_price_avg", "avg_price"]:
+    for col in [f"{key}_price_avg" for key in PRICE_COLUMNS] + ["avg_price"]:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
     loc_dict = {}
-    for _, r in df.iterrows():
-        loc_dict[r["id"]] = {
+    for r in df.to_dict("records"):  # iterrows보다 빠름 (지역 샤드가 클 때 로드 시간 대부분)
+        loc = {
             "latitude": r["latitude"],
             "longitude": r["longitude"],
             "name": r["name"],
             "category": r["category"],
-            "avg_price": r.get("avg_price", np.nan),
-            "offpeak_weekend_price": r.get("offpeak_weekend_price_avg", np.nan)
+            "avg_price": r.get("avg_price", np.nan)
         }
+        for key in PRICE_COLUMNS:
+            loc[f"{key}_price"] = r.get(f"{key}_price_avg", np.nan)
+        loc_dict[r["id"]] = loc
     log_print(f"[OK] 장소 {len(loc_dict)}개 로드 완료")
     return loc_dict
 
 
+def place_file(region=None):
+    """지역 위치/가격 CSV 경로"""
+    return region_file(region, CONFIG["PLACE_FILENAME"])
+
+
+_locations = ShardCache("locations", lambda region: load_place_locations(place_file(region)),
+                        lambda region: files_version([place_file(region)]))
+
+
+def place_locations(region=None):
+    """지역 위치 dict (처음 쓸 때 / CSV가 바뀌었을 때만 읽음, 최근 REGION_CACHE_SIZE개 지역 유지)"""
+    return _locations.get(region)
+
+
+class AccommodationIndex:
+    """
+    지역 숙소 배열 인덱스: id 오름차순 배열(id → 행) + 가격 컬럼별 1박 가격 오름차순 행 순서
+    예산 안의 숙소는 가격 배열에서 searchsorted로 앞부분만 잘라 내므로 비싼 숙소는 점수 계산에 들어가지 않습니다.
+    가격이 없는(NaN) 숙소는 avg_price로 대체하고, 그것도 없으면 가격 순서에서 빠집니다.
+    """
+
+    def __init__(self, ids, lat, lon, prices):
+        order = np.argsort(ids, kind="stable")
+        self.ids = ids[order]
+        self.lat = lat[order]
+        self.lon = lon[order]
+        self.prices = {key: p[order] for key, p in prices.items()}
+        self._by_price = {}
+        for key, p in self.prices.items():
+            finite = np.flatnonzero(~np.isnan(p))
+            rows = finite[np.argsort(p[finite], kind="stable")]
+            self._by_price[key] = (rows, p[rows])
+
+    @classmethod
+    def from_locations(cls, location_dict):
+        accs = [(pid, loc) for pid, loc in location_dict.items() if loc["category"] == "Accommodation"]
+        avg = np.array([loc.get("avg_price", np.nan) for _, loc in accs], dtype=float)
+        prices = {}
+        for key in PRICE_COLUMNS:
+            p = np.array([loc.get(f"{key}_price", np.nan) for _, loc in accs], dtype=float)
+            prices[key] = np.where(np.isnan(p), avg, p)
+        return cls(np.array([pid for pid, _ in accs], dtype=np.int64),
+                   np.array([loc["latitude"] for _, loc in accs], dtype=float),
+                   np.array([loc["longitude"] for _, loc in accs], dtype=float),
+                   prices)
+
+    def rows_for(self, ids):
+        """id 배열 → (행 배열, 인덱스에 있는지 mask)"""
+        pos = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+        return pos, self.ids[pos] == ids
+
+    def affordable(self, price_key, total_budget, nights):
+        """1박 가격 × 박수 <= 숙소 예산인 행 mask (가격 순서 앞부분만 확인)"""
+        if price_key not in self._by_price:
+            raise ValueError(f"[ERROR] 지원하지 않는 숙소 가격 기준: {price_key} (지원: {', '.join(PRICE_COLUMNS)})")
+        rows, sorted_prices = self._by_price[price_key]
+        # 나눗셈 반올림으로 경계 가격이 빠지지 않게 조금 넉넉히 자른 뒤 원래 조건으로 확인
+        k = np.searchsorted(sorted_prices, total_budget / nights * (1 + 1e-9), side="right")
+        rows = rows[:k]
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[rows[self.prices[price_key][rows] * nights <= total_budget]] = True
+        return mask
+
+
+_accommodations = ShardCache("accommodations", lambda region: AccommodationIndex.from_locations(place_locations(region)),
+                             lambda region: files_version([place_file(region)]))
+
+
+def accommodation_index(region=None):
+    """지역 숙소 가격 인덱스 (위치 dict와 같은 CSV 기준으로 캐시)"""
+    return _accommodations.get(region)
+
+
 def load_all_user_preferences(user_pref_dir, user_df):
     prefs_cache = {}
     for _, row in user_df.iterrows():
         user_id = row["user_id"]
         student_id = row["student_id"]
         pref_file = os.path.join(user_pref_dir, f"{student_id}_recommendations_softmax.json")
-        if os.path.exists(pref_file):
-            with open(pref_file, "r", encoding="utf-8") as f:
-                prefs_cache[user_id] = json.load(f)
+        if find_artifact(pref_file) is not None:  # .npz / .json
+            prefs_cache[user_id] = load_scores(pref_file)
         else:
             log_print(f"[WARNING] {pref_file} 파일 없음")
     log_print(f"[OK] {len(prefs_cache)}명 선호도 캐싱 완료")
@@ -97,14 +181,22 @@ def load_all_user_preferences(user_pref_dir, user_df):
 
 
 def build_spatial_indices(df):
+    """카테고리별 BallTree + 좌표/점수 배열 (반경 검색 후 계산은 numpy로)"""
+    from sklearn.neighbors import BallTree  # sklearn은 실제로 인덱스를 만들 때만 로드
+
     indices = {}
     for cat in CLUSTER_CATEGORIES:
-        cat_df = df[df["category"] == cat].copy()
+        cat_df = df[df["category"] == cat].reset_index(drop=True)
         if len(cat_df) > 0:
             coords = np.radians(cat_df[["latitude", "longitude"]].values)
             indices[cat] = {
                 "tree": BallTree(coords, metric="haversine"),
-                "df": cat_df.reset_index(drop=True)
+                "df": cat_df,
+                "ids": cat_df["id"].to_numpy(),
+                "names": cat_df["name"].to_numpy(),
+                "lat": cat_df["latitude"].to_numpy(dtype=float),
+                "lon": cat_df["longitude"].to_numpy(dtype=float),
+                "score": cat_df["final_score"].to_numpy(dtype=float)
             }
     return indices
 
@@ -114,8 +206,8 @@ def extract_all_user_places(user_prefs, location_dict):
     for cat, places in user_prefs.items():
         if cat not in CLUSTER_CATEGORIES:
             continue
-        for p in places:
-            pid = p["id"]
+        ids, scores = score_arrays(places, "final_score")
+        for pid, score in zip(ids.tolist(), scores.tolist()):
             if pid not in location_dict:
                 continue
             loc = location_dict[pid]
@@ -125,64 +217,123 @@ def extract_all_user_places(user_prefs, location_dict):
                 "category": cat,
                 "latitude": loc["latitude"],
                 "longitude": loc["longitude"],
-                "final_score": p["final_score"]
+                "final_score": score
             })
     return pd.DataFrame(rows)
 
 
-def find_nearest_places(seed_loc, spatial_index, n, max_radius_km, used_ids):
-    if not spatial_index:
-        return pd.DataFrame()
-    tree = spatial_index["tree"]
-    df = spatial_index["df"]
-    seed_radians = np.radians([[seed_loc[0], seed_loc[1]]])
-    indices = tree.query_radius(seed_radians, r=max_radius_km/6371)[0]
-    if len(indices) == 0:
-        return pd.DataFrame()
-
-    sub = df.iloc[indices].copy()
-    sub = sub[~sub["id"].isin(used_ids)]
-    sub["distance"] = haversine_vectorized(seed_loc[0], seed_loc[1], sub["latitude"].values, sub["longitude"].values)
-    sub["distance_score"] = 1 - (sub["distance"] / max_radius_km)
-    sub["combined_score"] = (
-        CONFIG["PREFERENCE_WEIGHT"] * sub["final_score"] +
-        CONFIG["DISTANCE_WEIGHT"] * sub["distance_score"]
-    )
-    return sub.nlargest(n, "combined_score")
-
-
-def greedy_clustering_optimized(df, spatial_indices, n_clusters, budget):
+def score_weights(weights=None):
+    """(선호도 가중치, 거리 가중치). weights dict의 preference_weight / distance_weight로 덮어쓰기 (what-if)"""
+    weights = weights or {}
+    return (weights.get("preference_weight", CONFIG["PREFERENCE_WEIGHT"]),
+            weights.get("distance_weight", CONFIG["DISTANCE_WEIGHT"]))
+
+
+def query_radius_rows(spatial_index, seed_locs, max_radius_km):
+    """여러 seed 좌표의 반경 내 행 번호 (seed마다 배열 1개, BallTree 1회 호출)"""
+    return spatial_index["tree"].query_radius(np.radians(seed_locs), r=max_radius_km / 6371)
+
+
+def cached_radius_rows(spatial_index, cat, seed_rows, seed_locs, max_radius_km, neighbours):
+    """
+    seed마다 (반경 내 행, seed와의 거리 배열 또는 None)
+    neighbours: (카테고리, df 행) → (행, 거리) 캐시 dict (None이면 캐시 없이 반경 검색만)
+    같은 df/인덱스로 클러스터링을 여러 번 돌릴 때(대안 플랜) 이미 본 seed는 BallTree 검색과 거리 계산을 다시 하지 않습니다.
+    """
+    if neighbours is None:
+        return [(rows, None) for rows in query_radius_rows(spatial_index, seed_locs, max_radius_km)]
+    missing = [k for k, row in enumerate(seed_rows) if (cat, row) not in neighbours]
+    if missing:
+        locs = np.asarray(seed_locs, dtype=float)[missing]
+        for loc, row, rows in zip(locs, [seed_rows[k] for k in missing],
+                                  query_radius_rows(spatial_index, locs, max_radius_km)):
+            distance = haversine_vectorized(loc[0], loc[1], spatial_index["lat"][rows], spatial_index["lon"][rows])
+            neighbours[(cat, row)] = (rows, distance)
+    return [neighbours[(cat, row)] for row in seed_rows]
+
+
+def nearest_rows(spatial_index, rows, seed_loc, n, max_radius_km, used, distance=None, weights=None):
+    """
+    반경 내 행(rows) 중 미사용 장소를 combined_score(선호도 + 거리) 상위 n개로 (행 번호 배열)
+    동점은 반경 검색 결과 순서를 유지합니다. used: 카테고리 행별 사용 여부 (bool 배열)
+    distance: rows 와 같은 순서의 seed 거리 (캐시된 값, 없으면 계산), weights: score_weights 덮어쓰기
+    """
+    unused = ~used[rows]
+    rows = rows[unused]
+    if distance is None:
+        distance = haversine_vectorized(seed_loc[0], seed_loc[1], spatial_index["lat"][rows], spatial_index["lon"][rows])
+    else:
+        distance = distance[unused]
+    distance_score = 1 - (distance / max_radius_km)
+    preference_weight, distance_weight = score_weights(weights)
+    combined = preference_weight * spatial_index["score"][rows] + distance_weight * distance_score
+    valid = ~np.isnan(combined)
+    rows, combined = rows[valid], combined[valid]
+    return rows[np.argsort(-combined, kind="stable")[:n]]
+
+
+def greedy_clustering_optimized(df, spatial_indices, n_clusters, budget, neighbours=None, weights=None):
+    """
+    하루 1개 클러스터: final_score 상위 20개 seed 후보 중 카테고리별 반경 내 상위 장소 점수 합이 가장 큰 seed 선택
+    seed 후보 20개의 반경 검색은 카테고리별로 한 번에 하고, 사용 여부는 id → 행 위치 bool 배열로 관리합니다.
+    (일수가 늘어도 하루당 BallTree 호출 6회 + 소규모 numpy 연산)
+    neighbours: seed 반경 검색 캐시 dict (cached_radius_rows, 같은 df로 여러 번 돌릴 때 공유)
+    weights: 선호도/거리 가중치 덮어쓰기 (score_weights)
+    """
     clusters = []
-    used_ids = set()
-    used_seed_ids = set()
-    budget_per_day = budget / n_clusters if budget else np.inf
+    n_per_cat = CONFIG["PLACES_PER_CATEGORY"]
+    radius = CONFIG["MAX_CLUSTER_RADIUS_KM"]
+
+    # id → [(카테고리, 행)] (같은 id가 여러 카테고리에 있으면 모두 사용 처리)
+    used = {cat: np.zeros(len(idx["ids"]), dtype=bool) for cat, idx in spatial_indices.items()}
+    positions = {}
+    for cat, idx in spatial_indices.items():
+        for row, pid in enumerate(idx["ids"]):
+            positions.setdefault(pid, []).append((cat, row))
+
+    def mark_used(pid):
+        for cat, row in positions.get(pid, ()):
+            used[cat][row] = True
+
+    ids = df["id"].to_numpy()
+    scores = df["final_score"].to_numpy(dtype=float)
+    seed_used = np.zeros(len(df), dtype=bool)
+    id_rows = {}
+    for row, pid in enumerate(ids):
+        id_rows.setdefault(pid, []).append(row)
+
     for i in range(n_clusters):
-        seed_candidates = df[~df["id"].isin(used_seed_ids)].copy()
-        if len(seed_candidates) == 0:
-            seed_candidates = df.copy()
-        top_candidates = seed_candidates.nlargest(min(20, len(seed_candidates)), "final_score")
+        pool = np.flatnonzero(~seed_used)
+        if len(pool) == 0:
+            pool = np.arange(len(df))
+        pool_scores = scores[pool]
+        ranked = pool[~np.isnan(pool_scores)][np.argsort(-pool_scores[~np.isnan(pool_scores)], kind="stable")]
+        top = ranked[:min(20, len(pool))]
+        seed_locs = np.column_stack([df["latitude"].to_numpy(dtype=float)[top], df["longitude"].to_numpy(dtype=float)[top]])
+
         valid_seeds = []
-        for _, s in top_candidates.iterrows():
-            seed_loc = (s["latitude"], s["longitude"])
-            total_score = 0
-            valid = True
-            for cat in CLUSTER_CATEGORIES:
-                if cat not in spatial_indices:
-                    valid = False
-                    break
-                found = find_nearest_places(seed_loc, spatial_indices[cat],
-                                            CONFIG["PLACES_PER_CATEGORY"],
-                                            CONFIG["MAX_CLUSTER_RADIUS_KM"],
-                                            used_ids)
-                if len(found) < CONFIG["MIN_PLACES_PER_CATEGORY"]:
-                    valid = False
-                    break
-                total_score += found["final_score"].sum()
-            if valid:
-                valid_seeds.append((s, total_score))
-        seed = max(valid_seeds, key=lambda x: x[1])[0] if valid_seeds else seed_candidates.iloc[0]
-        used_ids.add(seed["id"])
-        used_seed_ids.add(seed["id"])
+        if len(top) > 0 and all(cat in spatial_indices for cat in CLUSTER_CATEGORIES):
+            seed_rows = top.tolist()
+            radius_rows = {cat: cached_radius_rows(spatial_indices[cat], cat, seed_rows, seed_locs, radius, neighbours)
+                           for cat in CLUSTER_CATEGORIES}
+            for k, seed_row in enumerate(top):
+                total_score = 0
+                valid = True
+                for cat in CLUSTER_CATEGORIES:
+                    rows, distance = radius_rows[cat][k]
+                    found = nearest_rows(spatial_indices[cat], rows, seed_locs[k], n_per_cat, radius, used[cat],
+                                         distance, weights)
+                    if len(found) < CONFIG["MIN_PLACES_PER_CATEGORY"]:
+                        valid = False
+                        break
+                    total_score += spatial_indices[cat]["score"][found].sum()
+                if valid:
+                    valid_seeds.append((seed_row, total_score))
+        seed_row = max(valid_seeds, key=lambda x: x[1])[0] if valid_seeds else pool[0]
+        seed = df.iloc[seed_row]
+        mark_used(seed["id"])
+        for row in id_rows[seed["id"]]:
+            seed_used[row] = True
         seed_loc = (seed["latitude"], seed["longitude"])
         cluster = {
             "cluster_id": i,
@@ -195,45 +346,48 @@ def greedy_clustering_optimized(df, spatial_indices, n_clusters, budget):
         for cat in CLUSTER_CATEGORIES:
             if cat not in spatial_indices:
                 continue
-            found = find_nearest_places(seed_loc, spatial_indices[cat],
-                                        CONFIG["PLACES_PER_CATEGORY"],
-                                        CONFIG["MAX_CLUSTER_RADIUS_KM"],
-                                        used_ids)
+            idx = spatial_indices[cat]
+            rows, distance = cached_radius_rows(idx, cat, [int(seed_row)], [seed_loc], radius, neighbours)[0]
+            found = nearest_rows(idx, rows, seed_loc, n_per_cat, radius, used[cat], distance, weights)
             cat_places = []
-            for _, p in found.iterrows():
-                used_ids.add(p["id"])
-                cat_places.append({"id": int(p["id"]), "name": p["name"], "final_score": round(float(p["final_score"]), 4)})
+            for row in found:
+                mark_used(idx["ids"][row])
+                cat_places.append({"id": int(idx["ids"][row]), "name": idx["names"][row],
+                                   "final_score": round(float(idx["score"][row]), 4)})
             cluster["categories"][cat] = cat_places
         clusters.append(cluster)
     return clusters
 
 
-def select_best_accommodation(user_prefs, clusters, location_dict, budget, duration_days):
+def select_best_accommodation(user_prefs, clusters, location_dict, budget, duration_days,
+                              price_key=None, index=None, weights=None):
+    """
+    숙소 선택: 숙소 예산(총 예산의 50%) 안에서 선호도 × 0.7 + 클러스터 중심 근접도 × 0.3 최대 (동점이면 선호도 순서 앞쪽)
+    price_key: 1박 가격 기준 (PRICE_COLUMNS, 기본 CONFIG["ACCOMMODATION_PRICE"])
+    index: AccommodationIndex (없으면 location_dict로 만듦, 지역 캐시는 accommodation_index(region))
+    weights: preference_weight 덮어쓰기 (근접도 가중치 = 1 - preference_weight)
+    """
     if duration_days <= 1:
         return None, None
-    accs = user_prefs.get("Accommodation", [])
-    total_acc_budget = budget * 0.5
-    candidates = []
-    for acc in accs:
-        aid = acc["id"]
-        if aid not in location_dict:
-            continue
-        loc = location_dict[aid]
-        price = loc.get("offpeak_weekend_price", loc.get("avg_price", np.nan))
-        if pd.isna(price):
-            continue
-        total_cost = price * (duration_days - 1)
-        if total_cost > total_acc_budget:
-            continue
-        coords = np.array([[c["center_lat"], c["center_lng"]] for c in clusters])
-        mean = coords.mean(axis=0)
-        dist = haversine_vectorized(loc["latitude"], loc["longitude"], mean[0], mean[1])
-        score = CONFIG["PREFERENCE_WEIGHT"] * acc["final_score"] + (1 - CONFIG["PREFERENCE_WEIGHT"]) * (1 / (1 + dist))
-        candidates.append({"id": aid, "name": loc["name"], "score": score})
-    if not candidates:
+    if index is None:
+        index = AccommodationIndex.from_locations(location_dict)
+    acc_ids, acc_scores = score_arrays(user_prefs.get("Accommodation", []), "final_score")
+    if len(acc_ids) == 0 or len(index.ids) == 0:
+        return None, None
+    rows, found = index.rows_for(acc_ids)
+    affordable = index.affordable(price_key or CONFIG["ACCOMMODATION_PRICE"], budget * 0.5, duration_days - 1)
+    keep = np.flatnonzero(found & affordable[rows])
+    if len(keep) == 0:
         return None, None
-    best = max(candidates, key=lambda x: x["score"])
-    return best["id"], best["score"]
+
+    rows = rows[keep]
+    coords = np.array([[c["center_lat"], c["center_lng"]] for c in clusters])
+    mean = coords.mean(axis=0)
+    dist = haversine_vectorized(index.lat[rows], index.lon[rows], mean[0], mean[1])
+    preference_weight, _ = score_weights(weights)
+    scores = preference_weight * acc_scores[keep] + (1 - preference_weight) * (1 / (1 + dist))
+    best = int(np.argmax(scores))
+    return int(index.ids[rows[best]]), float(scores[best])
 
 
 def process_user(user_id, user_info, prefs_cache, location_dict, output_dir):
@@ -245,7 +399,8 @@ def process_user(user_id, user_info, prefs_cache, location_dict, output_dir):
     spatial_indices = build_spatial_indices(df)
     clusters = greedy_clustering_optimized(df, spatial_indices, user_info["duration_days"], user_info["budget"])
     accommodation_id, accommodation_score = select_best_accommodation(
-        user_prefs, clusters, location_dict, user_info["budget"], user_info["duration_days"]
+        user_prefs, clusters, location_dict, user_info["budget"], user_info["duration_days"],
+        index=accommodation_index(user_info["region"])
     )
     result = {
         "user_id": user_id,
@@ -255,6 +410,7 @@ def process_user(user_id, user_info, prefs_cache, location_dict, output_dir):
         "travel_style": user_info["travel_style"],
         "budget": user_info["budget"],
         "duration_days": user_info["duration_days"],
+        "region": user_info["region"],
         "like_keywords": eval(user_info["like_keywords"]),
         "dislike_keywords": eval(user_info["dislike_keywords"]),
         "Accommodation": accommodation_id,
@@ -273,10 +429,9 @@ def process_single_user(target_student_id):
     """특정 student_id만 처리"""
     log_file = setup_logging(CONFIG["LOG_DIR"])
     log_print(f"[LOG] 로그 파일: {log_file}")
-    location_dict = load_place_locations(CONFIG["PLACE_FILE"])
     
     # 특정 student_id의 CSV 파일만 처리
-    user_info_dir = r"planning\user_info"
+    user_info_dir = CONFIG["USER_INFO_DIR"]
     csv_file = f"{target_student_id}_user_info.csv"
     csv_path = os.path.join(user_info_dir, csv_file)
     
@@ -298,9 +453,11 @@ def process_single_user(target_student_id):
             "travel_style": row["travel_style"],
             "budget": row["budget"],
             "duration_days": int(row["duration_days"]),
+            "region": normalize_region(row.get("region")),
             "like_keywords": row["like_keywords"],
             "dislike_keywords": row["dislike_keywords"]
         }
+        location_dict = place_locations(user_info["region"])  # 설문에서 고른 지역 샤드만
         process_user(user_id, user_info, prefs_cache, location_dict, CONFIG["OUTPUT_DIR"])
     
     return True
@@ -310,9 +467,8 @@ def process_all_users():
     """모든 user_info CSV 파일 처리 (하위호환)"""
     log_file = setup_logging(CONFIG["LOG_DIR"])
     log_print(f"[LOG] 로그 파일: {log_file}")
-    location_dict = load_place_locations(CONFIG["PLACE_FILE"])
     
-    user_info_dir = r"planning\user_info"
+    user_info_dir = CONFIG["USER_INFO_DIR"]
     csv_files = [f for f in os.listdir(user_info_dir) if f.endswith("_user_info.csv")]
     
     if not csv_files:
@@ -335,9 +491,11 @@ def process_all_users():
                 "travel_style": row["travel_style"],
                 "budget": row["budget"],
                 "duration_days": int(row["duration_days"]),
+                "region": normalize_region(row.get("region")),
                 "like_keywords": row["like_keywords"],
                 "dislike_keywords": row["dislike_keywords"]
             }
+            location_dict = place_locations(user_info["region"])
             process_user(user_id, user_info, prefs_cache, location_dict, CONFIG["OUTPUT_DIR"])
 
 
@@ -0,0 +1,174 @@
+"""
+문장 임베딩 인코더 백엔드
+
+- "torch"     : sentence-transformers (PyTorch, FP32) — 기본값
+- "onnx-int8" : 같은 모델을 ONNX로 export 후 int8 동적 양자화, onnxruntime CPU 실행
+- "fake"      : 토큰 해시 기반 결정적 임베딩 (모델 다운로드 없음, 벤치마크/오프라인 테스트용)
+
+두 백엔드 모두 SentenceTransformer와 같은 encode(text, convert_to_numpy=True) 인터페이스를 제공합니다.
+all-mpnet-base-v2 파이프라인(Transformer → mean pooling → L2 정규화)을 ONNX 쪽에서 그대로 재현합니다.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+PLANNING_DIR = Path(__file__).resolve().parent
+ONNX_CACHE_DIR = PLANNING_DIR / "models" / "onnx"
+
+ENCODER_BACKENDS = ("torch", "onnx-int8", "fake")
+MAX_SEQ_LENGTH = 384  # all-mpnet-base-v2 기본값
+FAKE_DIM = 768  # all-mpnet-base-v2와 같은 차원
+
+
+def _cache_dir_for(model_name):
+    return ONNX_CACHE_DIR / model_name.replace("/", "__")
+
+
+def export_onnx_int8(model_name, out_dir=None):
+    """
+    HuggingFace 모델을 ONNX로 export하고 int8 동적 양자화.
+    export에만 torch/transformers가 필요하고, 실행은 onnxruntime + tokenizers만 사용합니다.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    out_dir = Path(out_dir) if out_dir else _cache_dir_for(model_name)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = out_dir / "model_fp32.onnx"
+    int8_path = out_dir / "model_int8.onnx"
+
+    print(f"[ONNX] {model_name} export 중... -> {out_dir}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    dummy = tokenizer(["export dummy text"], return_tensors="pt")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "seq"},
+                "attention_mask": {0: "batch", 1: "seq"},
+                "last_hidden_state": {0: "batch", 1: "seq"},
+            },
+            opset_version=14,
+        )
+
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    fp32_path.unlink()
+
+    tokenizer.save_pretrained(str(out_dir))
+    with open(out_dir / "encoder_config.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": model_name,
+            "pad_token": tokenizer.pad_token,
+            "pad_token_id": tokenizer.pad_token_id,
+            "max_seq_length": MAX_SEQ_LENGTH,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"[ONNX] int8 모델 저장 완료: {int8_path}")
+    return out_dir
+
+
+class OnnxInt8Encoder:
+    """onnxruntime CPU 인코더 (int8 동적 양자화 모델)"""
+
+    def __init__(self, model_name, model_dir=None, num_threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir) if model_dir else _cache_dir_for(model_name)
+        if not (model_dir / "model_int8.onnx").exists():
+            export_onnx_int8(model_name, model_dir)
+
+        with open(model_dir / "encoder_config.json", "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=cfg["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=cfg["pad_token_id"], pad_token=cfg["pad_token"])
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(model_dir / "model_int8.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+
+    def encode(self, sentences, convert_to_numpy=True, batch_size=32):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        outputs = []
+        for i in range(0, len(sentences), batch_size):
+            batch = self.tokenizer.encode_batch(sentences[i:i + batch_size])
+            input_ids = np.array([e.ids for e in batch], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in batch], dtype=np.int64)
+            hidden = self.session.run(
+                ["last_hidden_state"], {"input_ids": input_ids, "attention_mask": attention_mask}
+            )[0]
+            # mean pooling (패딩 제외) + L2 정규화
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            outputs.append(pooled.astype(np.float32))
+
+        embeddings = np.vstack(outputs) if outputs else np.zeros((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+
+class FakeEncoder:
+    """
+    결정적 가짜 인코더: 단어별 해시 시드로 만든 랜덤 벡터의 합 + L2 정규화.
+    같은 텍스트 → 같은 벡터, 단어가 겹치는 텍스트끼리 유사도가 높습니다.
+    """
+
+    def __init__(self, dim=FAKE_DIM):
+        self.dim = dim
+        self._token_cache = {}
+
+    def _token_vec(self, token):
+        vec = self._token_cache.get(token)
+        if vec is None:
+            seed = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            vec = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            self._token_cache[token] = vec
+        return vec
+
+    def encode(self, sentences, convert_to_numpy=True, batch_size=32):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        out = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for i, text in enumerate(sentences):
+            for token in str(text).lower().replace(",", " ").split():
+                out[i] += self._token_vec(token)
+        out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out[0] if single else out
+
+
+def load_encoder(backend, model_name):
+    """백엔드 이름으로 인코더 생성"""
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    if backend == "onnx-int8":
+        threads = os.getenv("ONNX_NUM_THREADS")
+        return OnnxInt8Encoder(model_name, num_threads=int(threads) if threads else None)
+    if backend == "fake":
+        return FakeEncoder()
+    raise ValueError(f"[ERROR] 알 수 없는 인코더 백엔드: {backend} (지원: {', '.join(ENCODER_BACKENDS)})")
+
+
+if __name__ == "__main__":
+    import sys
+
+    # 사전 export: python planning/encoders.py [model_name]
+    export_onnx_int8(sys.argv[1] if len(sys.argv) > 1 else "sentence-transformers/all-mpnet-base-v2")
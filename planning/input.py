@@ -1,27 +1,25 @@
 import os
+import sys
 import json
 import csv
 from dotenv import load_dotenv
-from openai import OpenAI
 
-# ----------------------------------------
-# OpenAI 설정 (.env에서 키 불러오기)
-# ----------------------------------------
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from instrumentation import stage
+from regions import validate_region
 
 # ----------------------------------------
 # 경로 설정
 # ----------------------------------------
-BASE_DIR = "planning"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
 USER_TEMPLATE_DIR = os.path.join(BASE_DIR, "user_templates")
 USER_INFO_DIR = os.path.join(BASE_DIR, "user_info")
-os.makedirs(USER_TEMPLATE_DIR, exist_ok=True)
-os.makedirs(USER_INFO_DIR, exist_ok=True)
 
-# 설문 JSON 파일 경로
-survey_file = os.path.join(BASE_DIR, "input.json")
+# 설문 JSON 파일 기본 경로
+DEFAULT_SURVEY_FILE = os.path.join(BASE_DIR, "input.json")
+
+DURATION_DAYS = 2  # 설문에 여행 일수가 없을 때 기본값 (1일 예산 = 총 예산 // 일수)
+MAX_DURATION_DAYS = 14
 
 # ----------------------------------------
 # 템플릿 매핑
@@ -41,6 +39,24 @@ STYLE_ENGLISH = {
     "액티비티": "Activity"
 }
 
+# ----------------------------------------
+# OpenAI 설정 (.env에서 키 불러오기, 첫 번역 시 초기화)
+# TRANSLATOR=fake 이면 OpenAI 호출 없이 키워드를 그대로 사용 (벤치마크/오프라인 테스트용)
+# ----------------------------------------
+TRANSLATOR = os.getenv("TRANSLATOR", "openai")  # "openai" | "fake"
+_openai_client = None
+
+
+def get_openai_client():
+    """OpenAI 클라이언트 (프로세스당 1개)"""
+    global _openai_client
+    if _openai_client is None:
+        from openai import OpenAI
+        load_dotenv()
+        _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _openai_client
+
+
 # ----------------------------------------
 # GPT 기반 키워드 번역 함수
 # ----------------------------------------
@@ -48,6 +64,8 @@ def translate_keywords_to_english(keywords):
     """GPT를 이용해 한글 키워드를 영어로 3단어 이하로 번역 (번호 없이)"""
     if not keywords:
         return []
+    if TRANSLATOR == "fake":
+        return fake_translate(keywords)
 
     prompt = (
         "다음 한글 여행 키워드들을 각각 영어로 자연스럽고 짧게 번역해 주세요. "
@@ -57,7 +75,7 @@ def translate_keywords_to_english(keywords):
     )
 
     try:
-        response = client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You translate Korean travel keywords into short English phrases without numbering."},
@@ -74,84 +92,136 @@ def translate_keywords_to_english(keywords):
         return keywords
 
 
-# ----------------------------------------
-# 1️⃣ 설문 결과 읽기
-# ----------------------------------------
-with open(survey_file, "r", encoding="utf-8") as f:
-    survey_data = json.load(f)
-
-responses = survey_data["responses"]
-name = responses["name"]
-student_id = responses["studentID"]
-budget_total = int(responses.get("budget", 0))
-budget_per_day = budget_total // 2  # ✅ 하루 예산 계산
-
-# ----------------------------------------
-# 2️⃣ 여행 스타일 결정
-# ----------------------------------------
-rank_category = responses["rank_category"]
-best_style = min(rank_category, key=lambda k: int(rank_category[k]))
-template_file = STYLE_MAP.get(best_style)
-english_style = STYLE_ENGLISH.get(best_style, "Unknown")
-
-if not template_file:
-    raise ValueError(f"[ERROR] 알 수 없는 스타일: {best_style}")
-
-template_path = os.path.join(TEMPLATE_DIR, template_file)
-
-# ----------------------------------------
-# 3️⃣ 템플릿 불러오기 + 예산 반영
-# ----------------------------------------
-with open(template_path, "r", encoding="utf-8") as f:
-    template_data = json.load(f)
-
-template_data["budget_per_day"] = budget_per_day
+def fake_translate(keywords):
+    """결정적 가짜 번역: 공백 정리 후 키워드를 그대로 반환"""
+    return [" ".join(str(kw).split()) for kw in keywords if str(kw).strip()]
 
-# ----------------------------------------
-# 4️⃣ 유저 템플릿 저장 (학번 기반)
-# ----------------------------------------
-user_template_path = os.path.join(USER_TEMPLATE_DIR, f"{student_id}_template.json")
-with open(user_template_path, "w", encoding="utf-8") as f:
-    json.dump(template_data, f, ensure_ascii=False, indent=2)
 
-print(f"[OK] {name}님의 여행 스타일: {english_style}")
-print(f"[예산] 총 예산: {budget_total:,}원 -> 1일 예산: {budget_per_day:,}원")
-print(f"[템플릿] 생성 완료: {user_template_path}")
-
-# ----------------------------------------
-# 5️⃣ CSV 저장 (user_info)
-# ----------------------------------------
-csv_file_path = os.path.join(USER_INFO_DIR, f"{student_id}_user_info.csv")
-
-# like_keywords 자동 구성 및 번역
-raw_keywords = [
-    responses.get("keyword_history", ""),
-    responses.get("keyword_nature", ""),
-    responses.get("keyword_food", ""),
-    responses.get("keyword_activity", ""),
-    responses.get("keyword_accomodation", "")
-]
-raw_keywords = [kw for kw in raw_keywords if kw]
-translated_keywords = translate_keywords_to_english(raw_keywords)
-
-# CSV 행 구성
-csv_row = {
-    "user_id": "U0001",  # 고정 또는 자동 생성 가능
-    "name": name,
-    "student_id": student_id,
-    "rotate": "['hybrid', 'popularity', 'personalized']",
-    "travel_style": english_style,
-    "budget": budget_total,  # ✅ 총 예산 저장
-    "duration_days": 2,
-    "like_keywords": str(translated_keywords),
-    "dislike_keywords": "[]"
-}
-
-# CSV 저장
-with open(csv_file_path, "w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=csv_row.keys())
-    writer.writeheader()
-    writer.writerow(csv_row)
-
-print(f"[CSV] 저장 완료 -> {csv_file_path}")
-print(f"[키워드] 번역 완료: {translated_keywords}")
+def parse_duration_days(value):
+    """설문 duration_days → 1 ~ MAX_DURATION_DAYS (없거나 잘못된 값이면 기본 2일)"""
+    try:
+        days = int(str(value).strip())
+    except (TypeError, ValueError):
+        return DURATION_DAYS
+    return max(1, min(MAX_DURATION_DAYS, days))
+
+
+def expand_itinerary(itinerary, duration_days):
+    """
+    템플릿 일정(숙박하는 날 ... 마지막 날)을 N일로 확장
+    - 마지막 날: 템플릿 마지막 날 (저녁 숙소 없음)
+    - 그 전 날들: 템플릿 앞쪽 날을 순서대로, 모자라면 마지막 숙박일 패턴 반복
+    - 1일(당일치기): 마지막 날 패턴에서 숙소 슬롯 제외
+    """
+    if duration_days <= 1:
+        last = itinerary[-1]
+        plan = [slot for slot in last["place_plan"] if slot["category"] != "Accommodation"]
+        return [dict(last, day=1, place_plan=plan)]
+
+    overnight = itinerary[:-1] or itinerary
+    days = []
+    for day in range(1, duration_days):
+        pattern = overnight[min(day, len(overnight)) - 1]
+        days.append(dict(pattern, day=day, place_plan=[dict(slot) for slot in pattern["place_plan"]]))
+    last = itinerary[-1]
+    days.append(dict(last, day=duration_days, place_plan=[dict(slot) for slot in last["place_plan"]]))
+    return days
+
+
+def process_survey(survey_file=DEFAULT_SURVEY_FILE):
+    """설문 JSON 1건 처리 → 유저 템플릿 + user_info CSV 저장. student_id 반환"""
+    os.makedirs(USER_TEMPLATE_DIR, exist_ok=True)
+    os.makedirs(USER_INFO_DIR, exist_ok=True)
+
+    # ----------------------------------------
+    # 1️⃣ 설문 결과 읽기
+    # ----------------------------------------
+    with open(survey_file, "r", encoding="utf-8") as f:
+        survey_data = json.load(f)
+
+    responses = survey_data["responses"]
+    name = responses["name"]
+    student_id = responses["studentID"]
+    budget_total = int(responses.get("budget", 0))
+    duration_days = parse_duration_days(responses.get("duration_days"))
+    region = validate_region(responses.get("region"))  # 카탈로그/벡터 인덱스 샤드 (없으면 기본 지역)
+    budget_per_day = budget_total // duration_days  # ✅ 하루 예산 계산
+
+    # ----------------------------------------
+    # 2️⃣ 여행 스타일 결정
+    # ----------------------------------------
+    rank_category = responses["rank_category"]
+    best_style = min(rank_category, key=lambda k: int(rank_category[k]))
+    template_file = STYLE_MAP.get(best_style)
+    english_style = STYLE_ENGLISH.get(best_style, "Unknown")
+
+    if not template_file:
+        raise ValueError(f"[ERROR] 알 수 없는 스타일: {best_style}")
+
+    template_path = os.path.join(TEMPLATE_DIR, template_file)
+
+    # ----------------------------------------
+    # 3️⃣ 템플릿 불러오기 + 예산 반영
+    # ----------------------------------------
+    with open(template_path, "r", encoding="utf-8") as f:
+        template_data = json.load(f)
+
+    template_data["budget_per_day"] = budget_per_day
+    template_data["itinerary"] = expand_itinerary(template_data["itinerary"], duration_days)
+
+    # ----------------------------------------
+    # 4️⃣ 유저 템플릿 저장 (학번 기반)
+    # ----------------------------------------
+    user_template_path = os.path.join(USER_TEMPLATE_DIR, f"{student_id}_template.json")
+    with open(user_template_path, "w", encoding="utf-8") as f:
+        json.dump(template_data, f, ensure_ascii=False, indent=2)
+
+    print(f"[OK] {name}님의 여행 스타일: {english_style} / 지역: {region}")
+    print(f"[예산] 총 예산: {budget_total:,}원 / {duration_days}일 -> 1일 예산: {budget_per_day:,}원")
+    print(f"[템플릿] 생성 완료: {user_template_path}")
+
+    # ----------------------------------------
+    # 5️⃣ CSV 저장 (user_info)
+    # ----------------------------------------
+    csv_file_path = os.path.join(USER_INFO_DIR, f"{student_id}_user_info.csv")
+
+    # like_keywords 자동 구성 및 번역
+    raw_keywords = [
+        responses.get("keyword_history", ""),
+        responses.get("keyword_nature", ""),
+        responses.get("keyword_food", ""),
+        responses.get("keyword_activity", ""),
+        responses.get("keyword_accomodation", "")
+    ]
+    raw_keywords = [kw for kw in raw_keywords if kw]
+    with stage("translation"):
+        translated_keywords = translate_keywords_to_english(raw_keywords)
+
+    # CSV 행 구성
+    csv_row = {
+        "user_id": "U0001",  # 고정 또는 자동 생성 가능
+        "name": name,
+        "student_id": student_id,
+        "rotate": "['hybrid', 'popularity', 'personalized']",
+        "travel_style": english_style,
+        "budget": budget_total,  # ✅ 총 예산 저장
+        "duration_days": duration_days,
+        "region": region,
+        "like_keywords": str(translated_keywords),
+        "dislike_keywords": "[]"
+    }
+
+    # CSV 저장
+    with open(csv_file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=csv_row.keys())
+        writer.writeheader()
+        writer.writerow(csv_row)
+
+    print(f"[CSV] 저장 완료 -> {csv_file_path}")
+    print(f"[키워드] 번역 완료: {translated_keywords}")
+    return student_id
+
+
+if __name__ == "__main__":
+    # 인자로 학번별 입력 파일을 받을 수 있음
+    process_survey(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SURVEY_FILE)
@@ -0,0 +1,261 @@
+"""
+파이프라인 단계별 계측 (wall time / CPU time / peak RSS)
+
+사용:
+    recorder = StageRecorder()
+    with recorder.stage("survey"):
+        ...
+    recorder.report()  # {"stages": [...], "total": {...}}
+
+하위 모듈(input, softmax 등)은 recorder를 직접 받지 않고 모듈 함수 stage(name)를 씁니다.
+activate(recorder)로 등록된 recorder가 없으면 아무것도 기록하지 않습니다.
+
+CPU 프로파일링 (opt-in, PLANNER_PROFILE=1 또는 --profile):
+    StageRecorder(profile_dir=..., profile_prefix="{job_id}_{student_id}") 이면
+    최상위 단계마다 cProfile 결과를 {profile_dir}/{prefix}_{stage}.prof 로 저장합니다.
+    꺼져 있으면 cProfile을 import 하지도 않습니다.
+
+프로파일 요약:
+    python planning/instrumentation.py summarize data/profiles [--job JOB_ID] [--top 20]
+
+메모리 계측:
+    모든 단계에 현재 RSS / peak RSS / peak RSS 증가분(peak_rss_delta_mb)을 기록합니다.
+    PLANNER_MEMORY_TRACE=1 (또는 StageRecorder(trace_memory=True)) 이면 최상위 단계마다
+    tracemalloc으로 Python 할당 peak(py_peak_mb)와 단계 동안 늘어난 상위 할당 위치(top_allocations)도 기록합니다.
+    (tracemalloc은 실행을 느리게 하므로 opt-in)
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_PROFILE_DIR = Path(__file__).resolve().parents[1] / "data" / "profiles"
+
+
+def peak_rss_mb():
+    """프로세스 최대 RSS (MB). 측정 불가하면 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb():
+    """현재 RSS (MB). /proc 이 없으면 None"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def memory_trace_requested():
+    """PLANNER_MEMORY_TRACE 환경 변수로 tracemalloc 계측 요청 여부 확인"""
+    return os.getenv("PLANNER_MEMORY_TRACE", "").lower() in ("1", "true", "yes", "on")
+
+
+def _round_mb(value):
+    return round(value, 1) if value is not None else None
+
+
+def profiling_requested():
+    """PLANNER_PROFILE 환경 변수로 프로파일링 요청 여부 확인"""
+    return os.getenv("PLANNER_PROFILE", "").lower() in ("1", "true", "yes", "on")
+
+
+def profile_dir_from_env():
+    return Path(os.getenv("PLANNER_PROFILE_DIR", DEFAULT_PROFILE_DIR))
+
+
+class StageRecorder:
+    """
+    단계별 측정값 기록
+    profile_dir 지정 시 최상위 단계별 cProfile 저장,
+    trace_memory=True(기본: PLANNER_MEMORY_TRACE) 이면 최상위 단계별 tracemalloc 상위 할당 위치 기록
+    """
+
+    TOP_ALLOCATIONS = 10
+
+    def __init__(self, profile_dir=None, profile_prefix="run", trace_memory=None):
+        self.stages = []
+        self.reused = []  # 체크포인트로 건너뛴 단계 (시간 측정 대상 아님)
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.profile_prefix = profile_prefix
+        self.trace_memory = memory_trace_requested() if trace_memory is None else trace_memory
+        self._depth = 0
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    def _start_profiler(self):
+        # cProfile은 동시에 하나만 활성화할 수 있으므로 최상위 단계에서만 측정
+        if self.profile_dir is None or self._depth > 0:
+            return None
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _save_profile(self, profiler, name, record):
+        profiler.disable()
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f"{self.profile_prefix}_{name}.prof"
+        profiler.dump_stats(str(path))
+        record["profile"] = str(path)
+
+    def _start_memory_trace(self):
+        # tracemalloc peak은 전역이라 중첩 단계에서 reset 하면 바깥 단계 값이 깨짐 → 최상위만
+        if not self.trace_memory or self._depth > 0:
+            return None
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        return tracemalloc.take_snapshot()
+
+    def _finish_memory_trace(self, before, record):
+        import tracemalloc
+        after = tracemalloc.take_snapshot()
+        record["py_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        # 계측 코드 자체의 할당은 제외
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        record["top_allocations"] = [
+            {
+                "site": f"{st.traceback[0].filename}:{st.traceback[0].lineno}",
+                "size_diff_kb": round(st.size_diff / 1024, 1),
+                "size_kb": round(st.size / 1024, 1),
+                "count_diff": st.count_diff
+            }
+            for st in diff[:self.TOP_ALLOCATIONS] if st.size_diff > 0
+        ]
+
+    @contextmanager
+    def stage(self, name):
+        profiler = self._start_profiler()
+        snapshot = self._start_memory_trace()
+        wall, cpu = time.perf_counter(), time.process_time()
+        rss_before = peak_rss_mb()
+        record = {"stage": name}
+        self._depth += 1
+        try:
+            yield record
+        finally:
+            self._depth -= 1
+            rss_after = peak_rss_mb()
+            record.update({
+                "wall_s": round(time.perf_counter() - wall, 4),
+                "cpu_s": round(time.process_time() - cpu, 4),
+                "rss_mb": _round_mb(current_rss_mb()),
+                "peak_rss_mb": _round_mb(rss_after),
+                "peak_rss_delta_mb": round(rss_after - rss_before, 1) if rss_after is not None else None
+            })
+            if snapshot is not None:
+                self._finish_memory_trace(snapshot, record)
+            if profiler is not None:
+                self._save_profile(profiler, name, record)
+            self.stages.append(record)
+
+    def mark_reused(self, name):
+        """체크포인트 재사용으로 실행하지 않은 단계 기록"""
+        self.reused.append(name)
+
+    def report(self):
+        peak = peak_rss_mb()
+        return {
+            "stages": self.stages,
+            "reused": self.reused,
+            "total": {
+                "wall_s": round(time.perf_counter() - self._start_wall, 4),
+                "cpu_s": round(time.process_time() - self._start_cpu, 4),
+                "peak_rss_mb": round(peak, 1) if peak is not None else None
+            }
+        }
+
+    def print_summary(self):
+        print(f"\n{'stage':<16}{'wall(s)':>10}{'cpu(s)':>10}{'peakRSS(MB)':>13}{'+peak(MB)':>11}")
+        for s in self.stages:
+            print(f"{s['stage']:<16}{s['wall_s']:>10}{s['cpu_s']:>10}"
+                  f"{str(s['peak_rss_mb']):>13}{str(s['peak_rss_delta_mb']):>11}")
+        if self.reused:
+            print(f"[RESUME] 체크포인트 재사용: {', '.join(self.reused)}")
+        for s in self.stages:
+            if s.get("top_allocations"):
+                print(f"\n[MEMORY] {s['stage']}: python peak {s['py_peak_mb']}MB")
+                for a in s["top_allocations"][:5]:
+                    print(f"   +{a['size_diff_kb']:>10}KB  {a['site']}")
+
+
+# ========== 현재 실행 중인 recorder (프로세스당 1개) ==========
+_active = None
+
+
+def activate(recorder):
+    """하위 모듈의 stage() 호출을 recorder에 기록 (None이면 해제)"""
+    global _active
+    _active = recorder
+
+
+def stage(name):
+    """활성 recorder가 있으면 단계 측정, 없으면 no-op"""
+    return _active.stage(name) if _active is not None else nullcontext()
+
+
+def write_report(recorder, path, **extra):
+    """단계 리포트 JSON 저장 (API 작업 관리자가 읽어 메트릭/작업 레코드에 반영)"""
+    report = recorder.report()
+    report.update(extra)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return report
+
+
+# ========== 프로파일 요약 ==========
+def summarize_profiles(paths, top=20):
+    """프로파일 파일별 누적 시간(cumulative) 상위 함수 출력"""
+    import pstats
+
+    for path in paths:
+        print(f"\n===== {path} =====")
+        stats = pstats.Stats(str(path))
+        print(f"total: {stats.total_tt:.3f}s")
+        stats.sort_stats("cumulative").print_stats(top)
+
+
+def _collect_profiles(targets, job_id=None):
+    paths = []
+    for target in targets:
+        target = Path(target)
+        paths.extend(sorted(target.glob("*.prof")) if target.is_dir() else [target])
+    if job_id:
+        paths = [p for p in paths if p.name.startswith(f"{job_id}_")]
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="단계별 cProfile 결과 요약")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summarize = sub.add_parser("summarize", help="누적 시간 상위 함수 출력")
+    summarize.add_argument("targets", nargs="*", default=[str(DEFAULT_PROFILE_DIR)],
+                           help="프로파일 디렉토리 또는 .prof 파일 (기본 data/profiles)")
+    summarize.add_argument("--job", help="job_id로 필터")
+    summarize.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = _collect_profiles(args.targets, args.job)
+    if not paths:
+        print("[INFO] 프로파일 파일이 없습니다.")
+        sys.exit(1)
+    summarize_profiles(paths, args.top)
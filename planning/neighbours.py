@@ -0,0 +1,263 @@
+"""
+슬롯 대체 장소 추천 ("이 장소 말고 다른 곳")
+
+플랜의 한 슬롯(day, 순서)을 같은 카테고리의 다른 장소로 바꿀 후보를 전체 플랜 재생성 없이 찾습니다.
+- 임베딩 kNN : 장소별 같은 카테고리 like 임베딩 코사인 유사도 상위 K개 (미리 계산해 둔 이웃 목록)
+- 공간 kNN   : 앞뒤 일정 장소 사이 지점에서 가까운 같은 카테고리 장소 (카테고리별 BallTree)
+두 후보를 합쳐 유사도 × SIMILARITY_WEIGHT + 근접도 × DISTANCE_WEIGHT 로 정렬합니다.
+근접도 = 1 - 우회 거리 / MAX_DETOUR_KM (앞뒤 장소를 거쳐 가는 거리가 원래 장소 대비 늘어나는 만큼, 0 이상)
+예산: 카페/음식점은 그날 음식 예산에서 다른 카페/음식점 가격을 뺀 나머지 이하, 숙소는 1박 가격 × 박수 <= 총 예산의 50%.
+이미 플랜에 있는 장소는 제외합니다.
+
+이웃 목록 파일 (지역별, artifacts.save_arrays 형식):
+    NEIGHBOUR_INDEX_DIR/{region}.npz  카테고리별 id(오름차순) / vector(정규화) / lat / lng /
+                                      neighbours(행 번호, 유사도 내림차순) / similarity
+빌드 (벡터 인덱스를 바꿨으면 다시 빌드):
+    python planning/neighbours.py build [--source local|weaviate|catalog] [--region REGION] [--k 50]
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from .artifacts import load_arrays, save_arrays
+    from .catalog import load_place_catalog, place_entry
+    from .clustering import CONFIG as CLUSTERING_CONFIG, accommodation_index, haversine_vectorized
+    from .regions import ShardCache, files_version, normalize_region
+    from .schedule_builder import food_budget, food_price
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from artifacts import load_arrays, save_arrays
+    from catalog import load_place_catalog, place_entry
+    from clustering import CONFIG as CLUSTERING_CONFIG, accommodation_index, haversine_vectorized
+    from regions import ShardCache, files_version, normalize_region
+    from schedule_builder import food_budget, food_price
+
+PLANNING_DIR = Path(__file__).resolve().parent
+NEIGHBOUR_INDEX_DIR = Path(os.getenv("NEIGHBOUR_INDEX_DIR", PLANNING_DIR / "neighbour_index"))
+
+NEIGHBOURS_K = 50          # 장소별 임베딩 이웃 수 (빌드 시)
+GEO_CANDIDATES = 20        # 앞뒤 장소 근처에서 추가로 볼 후보 수
+SIMILARITY_WEIGHT = 0.7
+DISTANCE_WEIGHT = 0.3
+MAX_DETOUR_KM = CLUSTERING_CONFIG["MAX_CLUSTER_RADIUS_KM"]
+MAX_ALTERNATIVES = 20
+
+
+class SlotNotFound(ValueError):
+    """플랜에 없는 day / 슬롯"""
+
+
+def neighbour_index_path(region=None):
+    return NEIGHBOUR_INDEX_DIR / f"{normalize_region(region)}.npz"
+
+
+# ========== 빌드 ==========
+def top_k_neighbours(vectors, k, block=1024):
+    """정규화된 벡터끼리 코사인 유사도 상위 k개 (자기 자신 제외) → (행 번호 int32, 유사도 float32)"""
+    n = len(vectors)
+    k = min(k, n - 1)
+    neighbours = np.zeros((n, max(k, 0)), dtype=np.int32)
+    similarity = np.zeros((n, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return neighbours, similarity
+    for start in range(0, n, block):
+        sims = vectors[start:start + block] @ vectors.T
+        rows = np.arange(start, min(start + block, n))
+        sims[rows - start, rows] = -np.inf  # 자기 자신 제외
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind="stable")
+        neighbours[rows] = np.take_along_axis(top, order, axis=1)
+        similarity[rows] = np.take_along_axis(top_sims, order, axis=1)
+    return neighbours, similarity
+
+
+def build_neighbour_index(place_ids, vectors, region=None, k=NEIGHBOURS_K, out=None):
+    """
+    장소 like 임베딩 → 카테고리별 이웃 목록 파일. 카테고리 / 좌표는 지역 카탈로그 기준 (카탈로그에 없는 장소 제외)
+    반환: 저장한 파일 경로
+    """
+    place_data = load_place_catalog(region)
+    place_ids = np.asarray(place_ids, dtype=np.int64)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+    by_cat = {}
+    for row, pid in enumerate(place_ids.tolist()):
+        info = place_data.get(pid)
+        if info is not None:
+            by_cat.setdefault(info["category"], {})[pid] = row  # 같은 id가 여러 번이면 마지막 벡터
+
+    data = {}
+    for cat, rows_by_id in sorted(by_cat.items()):
+        ids = np.array(sorted(rows_by_id), dtype=np.int64)
+        cat_vectors = vectors[[rows_by_id[pid] for pid in ids.tolist()]]
+        neighbours, similarity = top_k_neighbours(cat_vectors, k)
+        data[cat] = {
+            "id": ids, "vector": cat_vectors,
+            "lat": np.array([place_data[pid]["latitude"] for pid in ids.tolist()], dtype=float),
+            "lng": np.array([place_data[pid]["longitude"] for pid in ids.tolist()], dtype=float),
+            "neighbours": neighbours, "similarity": similarity,
+        }
+        print(f"[NEIGHBOURS] {cat}: {len(ids)}개 장소 × 이웃 {neighbours.shape[1]}개")
+    return save_arrays(out or neighbour_index_path(region), data,
+                       meta={"region": normalize_region(region), "k": k})
+
+
+# ========== 조회 ==========
+def _load_index(region):
+    from sklearn.neighbors import BallTree
+
+    data, meta = load_arrays(neighbour_index_path(region))
+    for arrays in data.values():
+        arrays["tree"] = BallTree(np.radians(np.column_stack([arrays["lat"], arrays["lng"]])), metric="haversine")
+    return data
+
+
+_indices = ShardCache("neighbours", _load_index, lambda region: files_version([neighbour_index_path(region)]))
+
+
+def neighbour_index(region=None):
+    """지역 이웃 목록 + 카테고리별 BallTree (파일이 없으면 FileNotFoundError)"""
+    return _indices.get(region)
+
+
+def place_coords(place):
+    """펼쳐진 플랜 장소의 (lat, lng) (좌표가 없으면 None)"""
+    if place.get("lat") is None or place.get("lng") is None:
+        return None
+    return float(place["lat"]), float(place["lng"])
+
+
+def remaining_budget(days, day_key, slot, budget_per_day, place_data):
+    """
+    슬롯 장소를 바꿀 때 쓸 수 있는 예산 (없으면 None)
+    카페/음식점: 그날 음식 예산 - 다른 카페/음식점 가격, 숙소: 총 예산의 50% / 박수 (1박 가격 상한)
+    """
+    if budget_per_day is None:
+        return None
+    cat = days[day_key][slot]["category"]
+    if cat in ("Cafe", "Restaurant"):
+        spent = sum(food_price(place_data[p["id"]]) for i, p in enumerate(days[day_key])
+                    if i != slot and p["category"] in ("Cafe", "Restaurant") and p["id"] in place_data)
+        return food_budget(budget_per_day) - spent
+    n_days = len(days)
+    if cat == "Accommodation" and n_days > 1:
+        return budget_per_day * n_days * 0.5 / (n_days - 1)
+    return None
+
+
+def slot_alternatives(days, day_key, slot, region=None, budget_per_day=None, limit=5):
+    """
+    plan days({"day1": [장소, ...]})의 day_key 일정 slot번째 장소를 대신할 같은 카테고리 장소 상위 limit개
+    budget_per_day: 1일 예산 (None이면 예산 확인 안 함)
+    반환: [장소 항목 + {"similarity", "detour_km", "price", "score"}] (score 내림차순)
+    """
+    if day_key not in days or not 0 <= slot < len(days[day_key]):
+        raise SlotNotFound(f"플랜에 없는 슬롯입니다: {day_key} / {slot}")
+    day = days[day_key]
+    place = day[slot]
+    cat = place["category"]
+    index = neighbour_index(region).get(cat)
+    place_data = load_place_catalog(region)
+    if index is None:
+        return []
+
+    ids = index["id"]
+    row = int(np.searchsorted(ids, place["id"]))
+    known = row < len(ids) and ids[row] == place["id"]
+    origin = place_coords(place)
+    stops = [c for c in (place_coords(day[slot - 1]) if slot > 0 else None,
+                         place_coords(day[slot + 1]) if slot + 1 < len(day) else None) if c is not None]
+    anchor = np.mean(stops, axis=0) if stops else origin
+    if anchor is None:
+        return []
+
+    # 후보: 임베딩 이웃 + 앞뒤 장소 근처
+    candidates = [index["neighbours"][row]] if known else []
+    n_geo = min(GEO_CANDIDATES, len(ids))
+    _, geo = index["tree"].query(np.radians([anchor]), k=n_geo)
+    candidates.append(geo[0])
+    rows = np.unique(np.concatenate(candidates).astype(np.int64))
+
+    used = {p["id"] for places in days.values() for p in places}
+    rows = np.array([r for r, pid in zip(rows.tolist(), ids[rows].tolist()) if pid not in used and pid in place_data],
+                    dtype=np.int64)
+    if len(rows) == 0:
+        return []
+
+    # 유사도: 원래 장소 임베딩과 코사인 (인덱스에 없는 장소면 0)
+    similarity = index["vector"][rows] @ index["vector"][row] if known else np.zeros(len(rows))
+
+    # 우회 거리: 앞뒤 장소를 거쳐 가는 거리 - 원래 장소를 거쳐 가는 거리
+    lat, lng = index["lat"][rows], index["lng"][rows]
+    via = sum(haversine_vectorized(s[0], s[1], lat, lng) for s in stops) if stops else \
+        haversine_vectorized(anchor[0], anchor[1], lat, lng)
+    base = sum(float(haversine_vectorized(s[0], s[1], origin[0], origin[1])) for s in stops) \
+        if stops and origin is not None else 0.0
+    detour = np.maximum(0.0, via - base)
+
+    # 예산
+    budget = remaining_budget(days, day_key, slot, budget_per_day, place_data)
+    if cat in ("Cafe", "Restaurant"):
+        prices = np.array([food_price(place_data[pid]) for pid in ids[rows].tolist()], dtype=float)
+    elif cat == "Accommodation":
+        acc = accommodation_index(region)
+        acc_rows, found = acc.rows_for(ids[rows])
+        prices = np.where(found, acc.prices[CLUSTERING_CONFIG["ACCOMMODATION_PRICE"]][acc_rows], np.nan)
+    else:
+        prices = np.full(len(rows), np.nan)
+    if budget is not None:
+        # 가격을 모르는 숙소는 예산 안이라고 볼 수 없으므로 제외 (카페/음식점은 기본 가격이 있음)
+        keep = prices <= budget if cat != "Attraction" else np.ones(len(rows), dtype=bool)
+        rows, similarity, detour, prices = rows[keep], similarity[keep], detour[keep], prices[keep]
+
+    scores = SIMILARITY_WEIGHT * similarity + DISTANCE_WEIGHT * np.maximum(0.0, 1 - detour / MAX_DETOUR_KM)
+    order = np.argsort(-scores, kind="stable")[:max(1, min(int(limit), MAX_ALTERNATIVES))]
+    results = []
+    for i in order.tolist():
+        pid = int(ids[rows[i]])
+        entry = place_entry(place_data, pid, place["time"], cat)
+        entry.update({
+            "similarity": round(float(similarity[i]), 4),
+            "detour_km": round(float(detour[i]), 3),
+            "price": None if np.isnan(prices[i]) else float(prices[i]),
+            "score": round(float(scores[i]), 4),
+        })
+        results.append(entry)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    sys.path.insert(0, str(PLANNING_DIR))
+
+    parser = argparse.ArgumentParser(description="슬롯 대체 장소용 임베딩 이웃 목록 빌드")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--source", choices=["local", "weaviate", "catalog"], default="local",
+                       help="local: 로컬 벡터 인덱스(LOCAL_INDEX_DIR), weaviate: Place 컬렉션, catalog: 카탈로그 CSV 임베딩")
+    build.add_argument("--region", default=None, help="지역 샤드 (기본 gangneung)")
+    build.add_argument("--k", type=int, default=NEIGHBOURS_K, help="장소별 이웃 수")
+    build.add_argument("--out", default=None, help="저장 경로 (기본 NEIGHBOUR_INDEX_DIR/{region}.npz)")
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    if args.source == "local":
+        from vector_store import LocalPlaceStore, local_index_dir
+        store = LocalPlaceStore(local_index_dir(args.region))
+        place_ids, vectors = np.asarray(store.place_ids), np.asarray(store.vectors)
+    elif args.source == "weaviate":
+        from vector_store import close_client, export_from_weaviate
+        place_ids, _, vectors, _ = export_from_weaviate(args.region)
+        close_client()
+    else:
+        from softmax import get_model
+        from vector_store import export_from_catalog
+        place_ids, _, vectors, _ = export_from_catalog(get_model(), args.region)
+    out = build_neighbour_index(place_ids, vectors, args.region, k=args.k, out=args.out)
+    print(f"[OK] 이웃 목록 저장 -> {out} ({time.perf_counter() - t:.2f}s)")
@@ -0,0 +1,391 @@
+"""
+플랜 직접 편집 (고정 / 삭제 / 교체) + 편집한 day만 다시 계산
+
+저장된 플랜의 한 슬롯(그날 일정에서 0부터 센 순서)을 편집하고, 번역 / 임베딩 / 점수 계산 / 클러스터링
+(process_single_student) 없이 그 day만 다시 계산해 플랜 파일에 저장합니다.
+- pin    : 슬롯 장소 고정 (이후 재계산에서 바뀌거나 옮겨지지 않음)
+- unpin  : 고정 해제
+- remove : 슬롯 장소 삭제 → 이 플랜에서는 다시 추천하지 않고, 빈 슬롯은 채움 후보로 다시 채움
+- swap   : 슬롯 장소를 place_id 로 교체 (같은 카테고리, 교체한 장소는 고정 / 원래 장소는 remove 처럼 제외)
+
+다시 계산하는 것 (편집한 day만, 다른 day는 그대로):
+- 예산      : 고정한 카페/음식점 가격을 먼저 빼고, 나머지 카페/음식점은 슬롯 순서대로 남은 음식 예산 안에서 유지
+              (넘으면 채움 후보로 교체, hybrid 계열 플랜만)
+- 채움 후보 : 그 day 클러스터 후보 순서 (hybrid) → 저장된 점수 순서 중 그 day 중심에서 FILL_RADIUS_KM 안
+              (숙소 슬롯은 자동으로 채우지 않음)
+- 동선      : 고정하지 않은 같은 카테고리 장소끼리 슬롯을 바꿔 하루 이동 거리가 줄면 교환 (시간 / 카테고리 순서 유지)
+빈 슬롯은 유저 템플릿 기준이라 예산이 모자라 비었던 슬롯도 예산이 남으면 다시 채웁니다.
+
+플랜별 편집 상태는 plans[key] 에 저장합니다: "pinned" ({day: [id, ...]}), "removed" ([id, ...]).
+편집마다 version 이 1 오르고 edits 이력에 남습니다 (plan_store.record_edit).
+expected_version 을 주면 저장된 버전과 다를 때 PlanVersionConflict.
+"""
+import time
+
+import numpy as np
+
+try:
+    from .artifacts import find_artifact, load_scores
+    from .catalog import load_place_catalog, place_entry
+    from .clustering import CONFIG as CLUSTERING_CONFIG, haversine_vectorized
+    from .neighbours import SlotNotFound, place_coords
+    from .plan_store import (PlanVersionConflict, compact_day, load_plan, plan_lock, plan_version,
+                             record_edit, save_plan)
+    from .replan import PLANNING_DIR, _load_json, artifact_paths
+    from .schedule_builder import food_budget, food_price
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from artifacts import find_artifact, load_scores
+    from catalog import load_place_catalog, place_entry
+    from clustering import CONFIG as CLUSTERING_CONFIG, haversine_vectorized
+    from neighbours import SlotNotFound, place_coords
+    from plan_store import (PlanVersionConflict, compact_day, load_plan, plan_lock, plan_version,
+                            record_edit, save_plan)
+    from replan import PLANNING_DIR, _load_json, artifact_paths
+    from schedule_builder import food_budget, food_price
+
+EDIT_OPS = ("pin", "unpin", "remove", "swap")
+FOOD_CATEGORIES = ("Cafe", "Restaurant")
+FILL_RADIUS_KM = CLUSTERING_CONFIG["MAX_CLUSTER_RADIUS_KM"]
+
+
+# ========== 동선 ==========
+def route_km(day):
+    """하루 일정 순서대로 이동 거리 합 (좌표 없는 장소는 건너뜀)"""
+    coords = np.array([c for c in map(place_coords, day) if c is not None], dtype=float).reshape(-1, 2)
+    if len(coords) < 2:
+        return 0.0
+    return float(haversine_vectorized(coords[:-1, 0], coords[:-1, 1], coords[1:, 0], coords[1:, 1]).sum())
+
+
+def optimize_route(day, pinned_ids):
+    """
+    고정하지 않은 같은 카테고리 장소끼리 슬롯을 바꿔 하루 이동 거리를 줄임 (교환으로 더 줄지 않을 때까지)
+    슬롯의 시간 / 카테고리 순서와 숙소 / 고정 장소 / 좌표 없는 장소는 그대로 둡니다.
+    """
+    coords = [place_coords(p) for p in day]
+    movable = [i for i, p in enumerate(day)
+               if p["category"] != "Accommodation" and p["id"] not in pinned_ids and coords[i] is not None]
+    if len(movable) < 2:
+        return day
+    lat = np.array([c[0] if c else np.nan for c in coords])
+    lng = np.array([c[1] if c else np.nan for c in coords])
+    dist = np.nan_to_num(haversine_vectorized(lat[:, None], lng[:, None], lat[None, :], lng[None, :]))
+
+    def length(order):
+        return sum(dist[a, b] for a, b in zip(order, order[1:]))
+
+    order = list(range(len(day)))
+    best = length(order)
+    pairs = [(i, j) for k, i in enumerate(movable) for j in movable[k + 1:] if day[i]["category"] == day[j]["category"]]
+    improved = True
+    while improved:
+        improved = False
+        for i, j in pairs:
+            order[i], order[j] = order[j], order[i]
+            total = length(order)
+            if total < best - 1e-9:
+                best, improved = total, True
+            else:
+                order[i], order[j] = order[j], order[i]
+    return [dict(day[src], time=day[pos]["time"]) for pos, src in enumerate(order)]
+
+
+# ========== day 다시 계산 ==========
+def day_slots(template, day_key, day):
+    """
+    유저 템플릿 슬롯에 현재 장소 배치 → [[time, category, 장소 또는 None], ...] (시간 순)
+    템플릿에 없는 장소(시간 / 카테고리가 다른 장소)도 자기 슬롯으로 유지, 템플릿이 없으면 현재 장소만
+    """
+    plan_slots = {f"day{d['day']}": d["place_plan"] for d in (template or {}).get("itinerary", [])}.get(day_key, [])
+    remaining = list(day)
+    slots = []
+    for s in plan_slots:
+        match = next((p for p in remaining if p["time"] == s["time"] and p["category"] == s["category"]), None)
+        if match is not None:
+            remaining.remove(match)
+        slots.append([s["time"], s["category"], match])
+    slots.extend([p["time"], p["category"], p] for p in remaining)
+    slots.sort(key=lambda s: s[0])
+    return slots
+
+
+def fill_candidates(cat, cluster, get_scores, center, place_data):
+    """빈 슬롯 채움 후보 id 순서: 그 day 클러스터 후보 → 저장된 점수 순서 중 center 에서 FILL_RADIUS_KM 안"""
+    for cand in (cluster or {}).get("categories", {}).get(cat, []):
+        yield cand.get("id") if isinstance(cand, dict) else cand
+    scores = get_scores()
+    if center is None or not scores or cat not in scores:
+        return
+    ids = [pid for pid in scores[cat].ids.tolist() if pid in place_data]
+    if not ids:
+        return
+    lat = np.array([place_data[pid]["latitude"] for pid in ids], dtype=float)
+    lng = np.array([place_data[pid]["longitude"] for pid in ids], dtype=float)
+    near = haversine_vectorized(center[0], center[1], lat, lng) <= FILL_RADIUS_KM
+    for pid, ok in zip(ids, near.tolist()):
+        if ok:
+            yield pid
+
+
+def rebuild_day(slots, place_data, pinned_ids, excluded, used_elsewhere, candidates, day_food_budget=None):
+    """
+    slots(day_slots) 를 다시 채움: 고정 장소 / 숙소는 그대로, 나머지는 유효하면 유지하고 아니면 채움 후보로 교체
+    유효: 카탈로그에 있음, excluded / 다른 슬롯과 중복 아님, 카페/음식점이면 남은 음식 예산 안 (슬롯 순서대로)
+    기존 장소를 먼저 확정한 뒤 빈 슬롯을 채우므로, 채움 때문에 그대로 둘 수 있는 장소가 밀려나지 않습니다.
+    candidates(cat) → 채움 후보 id iterable, day_food_budget None이면 예산 확인 안 함
+    반환: (새 일정, 채운 장소 id 목록, 음식 지출)
+    """
+    pinned = [s[2] for s in slots if s[2] is not None and s[2]["id"] in pinned_ids]
+    used = set(used_elsewhere) | {p["id"] for p in pinned}
+    spent = sum(food_price(place_data[p["id"]]) for p in pinned
+                if p["category"] in FOOD_CATEGORIES and p["id"] in place_data)
+
+    def affordable(pid, cat):
+        return (cat not in FOOD_CATEGORIES or day_food_budget is None
+                or spent + food_price(place_data[pid]) <= day_food_budget)
+
+    # 1) 기존 장소 유지 여부, 숙소는 자동으로 채우지 않음 (hybrid 숙소는 클러스터링 때 선택)
+    empty = []
+    for s in slots:
+        _, cat, place = s
+        if cat == "Accommodation" or (place is not None and place["id"] in pinned_ids):
+            continue
+        pid = place["id"] if place is not None else None
+        if pid is None or pid in excluded or pid in used or pid not in place_data or not affordable(pid, cat):
+            s[2] = None
+            empty.append(s)
+            continue
+        used.add(pid)
+        if cat in FOOD_CATEGORIES:
+            spent += food_price(place_data[pid])
+
+    # 2) 빈 슬롯 채우기 (슬롯 순서대로)
+    filled = []
+    for s in empty:
+        t, cat, _ = s
+        for pid in candidates(cat):
+            if pid in used or pid in excluded or pid not in place_data or not affordable(pid, cat):
+                continue
+            s[2] = place_entry(place_data, pid, t, cat)
+            used.add(pid)
+            filled.append(pid)
+            if cat in FOOD_CATEGORIES:
+                spent += food_price(place_data[pid])
+            break
+    return [s[2] for s in slots if s[2] is not None], filled, spent
+
+
+def day_cluster(cluster_data, day_key):
+    """클러스터 결과에서 day_key 의 클러스터 (build_hybrid_schedule 과 같은 선택, 없으면 None)"""
+    clusters = (cluster_data or {}).get("clusters") or []
+    if not clusters:
+        return None
+    day_num = int(day_key[3:]) if day_key[3:].isdigit() else 1
+    return clusters[min(day_num - 1, len(clusters) - 1)]
+
+
+def day_center(cluster, day):
+    """채움 후보 반경의 중심: 클러스터 중심, 없으면 그날 장소 좌표 평균"""
+    if cluster is not None:
+        return cluster["center_lat"], cluster["center_lng"]
+    kept = [c for c in map(place_coords, day) if c is not None]
+    return tuple(np.mean(kept, axis=0)) if kept else None
+
+
+def has_edits(plan):
+    """플랜에 고정 / 삭제 편집 상태가 있는지"""
+    return bool(plan.get("removed")) or any(plan.get("pinned", {}).values())
+
+
+def reapply_edits(plan, days, template, place_data, cluster_data=None, get_scores=None, day_food_budget=None):
+    """
+    새로 만든 일정(days)에 플랜의 편집 상태를 다시 적용하고 plan["days"] / plan["pinned"] 갱신 (증분 재계획용)
+    고정 장소는 이전 일정(plan["days"])의 같은 day / 시간 / 카테고리 슬롯으로 되돌리고,
+    삭제한 장소 / 다른 day 고정 장소와의 중복 / 예산 초과는 rebuild_day 로 cluster_data 후보에서 교체합니다.
+    편집 상태가 없거나 건드릴 것이 없는 day는 새 일정 그대로입니다.
+    """
+    if not has_edits(plan):
+        plan["days"] = days
+        return days
+    removed = set(plan.get("removed", []))
+    old_days = plan.get("days", {})
+    pins = {day_key: [p for p in old_days.get(day_key, []) if p["id"] in ids]
+            for day_key, ids in plan.get("pinned", {}).items()}
+    pinned_all = {p["id"] for places in pins.values() for p in places if p["category"] != "Accommodation"}
+    get_scores = get_scores or (lambda: None)
+
+    result = dict(days)
+    for day_key, day in days.items():
+        day_pins = pins.get(day_key, [])
+        pinned_ids = {p["id"] for p in day_pins}
+        if not day_pins and not any(p["id"] in removed or p["id"] in pinned_all for p in day):
+            continue
+        # 새 일정의 같은 장소는 비우고 (숙소는 아침/저녁 같은 id), 고정 장소를 원래 슬롯에
+        slots = day_slots(template, day_key, [p for p in day
+                                              if p["id"] not in pinned_ids or p["category"] == "Accommodation"])
+        for pin in day_pins:
+            entry = place_entry(place_data, pin["id"], pin["time"], pin["category"]) if pin["id"] in place_data else pin
+            slot = next((s for s in slots if s[0] == pin["time"] and s[1] == pin["category"]), None)
+            if slot is None:
+                slots.append([pin["time"], pin["category"], entry])
+            else:
+                slot[2] = entry
+        slots.sort(key=lambda s: s[0])
+
+        cluster = day_cluster(cluster_data, day_key)
+        center = day_center(cluster, day)
+        used_elsewhere = (pinned_all - pinned_ids) | {p["id"] for key, places in result.items() if key != day_key
+                                                      for p in places if p["category"] != "Accommodation"}
+        new_day, _, _ = rebuild_day(
+            slots, place_data, pinned_ids, removed, used_elsewhere,
+            lambda cat: fill_candidates(cat, cluster, get_scores, center, place_data), day_food_budget
+        )
+        result[day_key] = optimize_route(new_day, pinned_ids)
+
+    plan["days"] = result
+    for day_key, day_pins in pins.items():
+        present = {p["id"] for p in result.get(day_key, [])}
+        plan["pinned"][day_key] = sorted({p["id"] for p in day_pins} & present)
+    return result
+
+
+# ========== 편집 ==========
+def _validate(op, days, day_key, slot, place_id, place_data):
+    if op not in EDIT_OPS:
+        raise ValueError(f"지원하지 않는 편집입니다: {op} ({', '.join(EDIT_OPS)})")
+    if day_key not in days or not 0 <= slot < len(days[day_key]):
+        raise SlotNotFound(f"플랜에 없는 슬롯입니다: {day_key} / {slot}")
+    if op != "swap":
+        return
+    if place_id is None:
+        raise ValueError("swap 에는 place_id 가 필요합니다.")
+    cat = days[day_key][slot]["category"]
+    if place_id not in place_data:
+        raise ValueError(f"카탈로그에 없는 장소입니다: {place_id}")
+    if place_data[place_id]["category"] != cat:
+        raise ValueError(f"같은 카테고리({cat}) 장소로만 바꿀 수 있습니다: {place_id}")
+    if cat != "Accommodation" and any(p["id"] == place_id for places in days.values() for p in places):
+        raise ValueError(f"이미 플랜에 있는 장소입니다: {place_id}")
+
+
+def edit_plan(student_id, plan_path, plan_key, day_key, slot, op, place_id=None, expected_version=None):
+    """
+    플랜 파일의 plan_key 플랜 day_key 일정 slot번째 장소 편집 → 그 day만 다시 계산해 저장
+    학번별 유저 템플릿 / 클러스터 / 점수 파일은 있으면 사용 (없으면 예산 / 빈 슬롯 / 채움 후보 없이)
+    잘못된 편집은 ValueError (슬롯이 없으면 SlotNotFound), 버전이 다르면 PlanVersionConflict,
+    플랜 파일이 없으면 FileNotFoundError, 플랜이 없으면 KeyError.
+    반환: {"version", "day", "places", "pinned", "filled", "budget", "distance_km", "elapsed_ms"}
+    """
+    t = time.perf_counter()
+    slot = int(slot)
+    place_id = int(place_id) if place_id is not None else None
+    paths = artifact_paths(student_id)
+    template = _load_json(paths["template"]) if paths["template"].exists() else None
+    cluster_data = _load_json(paths["clusters"]) if paths["clusters"].exists() else None
+
+    with plan_lock(plan_path):
+        full_schedule = load_plan(plan_path)
+        if plan_key not in full_schedule.get("plans", {}):
+            raise KeyError(plan_key)
+        region = full_schedule.get("region")
+        place_data = load_place_catalog(region)
+        plan = full_schedule["plans"][plan_key]
+        days = plan["days"]
+        _validate(op, days, day_key, slot, place_id, place_data)
+        version = plan_version(full_schedule)
+        if expected_version is not None and int(expected_version) != version:
+            raise PlanVersionConflict(f"플랜 버전이 다릅니다 (요청 {expected_version}, 저장 {version})")
+
+        day = days[day_key]
+        before = compact_day(day)
+        target = day[slot]
+        pinned_by_day = plan.setdefault("pinned", {})
+        pinned_ids = set(pinned_by_day.get(day_key, []))
+        removed = set(plan.get("removed", []))
+
+        if op == "pin":
+            pinned_ids.add(target["id"])
+        elif op == "unpin":
+            pinned_ids.discard(target["id"])
+        elif op == "remove":
+            pinned_ids.discard(target["id"])
+            if target["category"] == "Accommodation":
+                day = day[:slot] + day[slot + 1:]  # 숙소는 다시 채우지 않음
+            else:
+                removed.add(target["id"])  # 슬롯은 남겨 두고 rebuild_day 에서 채움 후보로 교체
+        else:  # swap
+            pinned_ids.discard(target["id"])
+            if target["category"] != "Accommodation":
+                removed.add(target["id"])
+            pinned_ids.add(place_id)
+            removed.discard(place_id)
+            day = day[:slot] + [place_entry(place_data, place_id, target["time"], target["category"])] + day[slot + 1:]
+
+        # 편집한 day만 다시 계산 (예산 / 채움 후보 / 동선)
+        cluster = day_cluster(cluster_data, day_key) if plan_key == "hybrid" else None
+        center = day_center(cluster, day)
+        scores = {}
+
+        def get_scores():
+            # 클러스터 후보가 모자랄 때만 점수 파일을 읽음
+            if "data" not in scores:
+                found = find_artifact(paths["scores"])
+                scores["data"] = load_scores(paths["scores"]) if found else None
+            return scores["data"]
+
+        budget_per_day = (template or {}).get("budget_per_day")
+        day_food_budget = food_budget(budget_per_day) if budget_per_day and plan_key.startswith("hybrid") else None
+        used_elsewhere = {p["id"] for key, places in days.items() if key != day_key
+                          for p in places if p["category"] != "Accommodation"}
+        new_day, filled, spent = rebuild_day(
+            day_slots(template, day_key, day), place_data, pinned_ids, removed, used_elsewhere,
+            lambda cat: fill_candidates(cat, cluster, get_scores, center, place_data), day_food_budget
+        )
+        new_day = optimize_route(new_day, pinned_ids)
+
+        days[day_key] = new_day
+        present = {p["id"] for p in new_day}
+        pinned_by_day[day_key] = sorted(pid for pid in pinned_ids if pid in present)
+        plan["removed"] = sorted(removed)
+        edit = {"op": op, "plan": plan_key, "day": day_key, "slot": slot, "place_id": target["id"], "before": before}
+        if op == "swap":
+            edit["new_place_id"] = place_id
+        version = record_edit(full_schedule, edit)
+        save_plan(plan_path, full_schedule)
+
+    return {
+        "version": version,
+        "day": day_key,
+        "places": new_day,
+        "pinned": pinned_by_day[day_key],
+        "filled": filled,
+        "budget": {
+            "food_budget": day_food_budget,
+            "food_spent": spent,
+            "food_remaining": None if day_food_budget is None else day_food_budget - spent,
+        },
+        "distance_km": round(route_km(new_day), 3),
+        "elapsed_ms": round((time.perf_counter() - t) * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="저장된 플랜 한 슬롯 편집 (그 day만 다시 계산)")
+    parser.add_argument("student_id")
+    parser.add_argument("op", choices=EDIT_OPS)
+    parser.add_argument("day", help="day1, day2, ...")
+    parser.add_argument("slot", type=int, help="그날 일정에서 0부터 센 순서")
+    parser.add_argument("--place-id", type=int, help="swap 할 장소 id")
+    parser.add_argument("--plan-key", default="hybrid")
+    parser.add_argument("--plan", help="플랜 파일 (기본 data/plans/{student_id}_plan.json)")
+    args = parser.parse_args()
+
+    plan = args.plan or PLANNING_DIR.parent / "data" / "plans" / f"{args.student_id}_plan.json"
+    result = edit_plan(args.student_id, plan, args.plan_key, args.day, args.slot, args.op, args.place_id)
+    for i, p in enumerate(result["places"]):
+        mark = "*" if p["id"] in result["pinned"] else " "
+        print(f"[{args.day}] {mark} {i}. {p['time']} {p['category']:<13} {p['name']}")
+    print(f"[OK] version {result['version']}, 채움 {result['filled']}, 음식 {result['budget']}, "
+          f"이동 {result['distance_km']}km ({result['elapsed_ms']}ms)")
@@ -0,0 +1,142 @@
+"""
+최종 플랜 저장소 (data/plans/*.json)
+
+저장은 참조 기반 compact 포맷으로 합니다:
+    {"format": "compact-v1", "studentId": ..., "plan_order": [...],
+     "plans": {"hybrid": {"label": ..., "days": {"day1": [[id, time, category], ...]}}}}
+장소 이름/설명/좌표는 저장하지 않고, 읽을 때 카탈로그에서 채워 기존 플랜 JSON과 같은 구조로 복원합니다.
+"region" 키가 있으면 그 지역 카탈로그로 복원합니다 (없으면 기본 지역).
+format 키가 없는 기존(전체 펼침) 파일도 그대로 읽을 수 있습니다.
+
+플랜을 편집(plan_edit.py) / 증분 재계획할 때마다 "version" 이 1씩 오르고, "edits" 에 최근 이력이 남습니다
+(편집 전 그 day의 compact 슬롯 포함). 파이프라인이 새로 만든 플랜은 version 0 입니다.
+"""
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from .catalog import load_place_catalog, place_entry
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from catalog import load_place_catalog, place_entry
+
+PLAN_FORMAT = "compact-v1"
+MAX_EDIT_HISTORY = 50  # 플랜 파일에 남길 편집 이력 수
+
+
+class PlanVersionConflict(Exception):
+    """요청한 플랜 버전이 저장된 버전과 다름 (그 사이 다른 편집 / 재계획이 저장됨)"""
+
+
+def compact_day(places):
+    """펼쳐진 하루 일정 → [[id, time, category], ...]"""
+    return [[int(p["id"]), p["time"], p["category"]] for p in places]
+
+
+def compact_plan(full_schedule):
+    """펼쳐진 플랜 → compact 플랜"""
+    plans = {}
+    for key, plan in full_schedule["plans"].items():
+        days = {}
+        for day_key, places in plan.get("days", {}).items():
+            days[day_key] = compact_day(places)
+        compact = {k: v for k, v in plan.items() if k != "days"}
+        compact["days"] = days
+        plans[key] = compact
+    stored = {k: v for k, v in full_schedule.items() if k != "plans"}
+    stored["format"] = PLAN_FORMAT
+    stored["plans"] = plans
+    return stored
+
+
+def expand_plan(stored, place_data=None):
+    """compact 플랜 → 펼쳐진 플랜 (기존 포맷이면 그대로 반환)"""
+    if stored.get("format") != PLAN_FORMAT:
+        return stored
+    if place_data is None:
+        place_data = load_place_catalog(stored.get("region"))
+    plans = {}
+    for key, plan in stored.get("plans", {}).items():
+        days = {}
+        for day_key, slots in plan.get("days", {}).items():
+            day = []
+            for pid, time, cat in slots:
+                if pid in place_data:
+                    day.append(place_entry(place_data, pid, time, cat))
+                else:
+                    # 카탈로그에서 빠진 장소: 참조 정보만 유지
+                    day.append({"id": pid, "name": "", "description": "", "lat": None, "lng": None,
+                                "time": time, "category": cat})
+            days[day_key] = day
+        expanded = {k: v for k, v in plan.items() if k != "days"}
+        expanded["days"] = days
+        plans[key] = expanded
+    full = {k: v for k, v in stored.items() if k not in ("format", "plans")}
+    full["plans"] = plans
+    return full
+
+
+def write_json_atomic(path, data):
+    """임시 파일에 쓴 뒤 교체 (읽는 쪽이 절반만 쓰인 파일을 보지 않도록)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def save_plan(path, full_schedule):
+    """펼쳐진 플랜을 compact 포맷으로 저장"""
+    write_json_atomic(path, compact_plan(full_schedule))
+
+
+def load_stored_plan(path):
+    """저장된 그대로 읽기 (compact 또는 기존 포맷)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_plan(path, place_data=None):
+    """저장된 플랜을 읽어 펼쳐진 구조로 반환"""
+    return expand_plan(load_stored_plan(path), place_data)
+
+
+# ========== 버전 / 편집 이력 ==========
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def plan_lock(path):
+    """플랜 파일별 잠금 (같은 프로세스 안에서 읽기 → 수정 → 저장이 겹치지 않도록)"""
+    key = str(Path(path).resolve())
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def plan_version(plan):
+    """플랜 버전 (편집 / 재계획할 때마다 1 증가, 파이프라인이 새로 만든 플랜은 0)"""
+    return int(plan.get("version", 0))
+
+
+def record_edit(full_schedule, edit, expected_version=None):
+    """
+    버전 확인 후 version + 1, edits 이력에 edit 추가 (최근 MAX_EDIT_HISTORY개만 유지). 새 버전 반환
+    expected_version 이 저장된 버전과 다르면 PlanVersionConflict
+    """
+    version = plan_version(full_schedule)
+    if expected_version is not None and int(expected_version) != version:
+        raise PlanVersionConflict(f"플랜 버전이 다릅니다 (요청 {expected_version}, 저장 {version})")
+    version += 1
+    full_schedule["version"] = version
+    history = full_schedule.get("edits", []) + [dict(edit, version=version, at=datetime.now().isoformat(timespec="seconds"))]
+    full_schedule["edits"] = history[-MAX_EDIT_HISTORY:]
+    return version
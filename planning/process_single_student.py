@@ -1,11 +1,13 @@
 """
 단일 학번 처리를 위한 파이프라인
 API에서 호출되어 특정 학번 하나만 처리합니다.
+모든 단계를 한 프로세스에서 실행해 임베딩 모델과 Weaviate 연결을 STEP 2/4가 공유합니다.
+survey / scoring / clustering / preference 는 단계별 체크포인트(checkpoints.py)를 남겨
+재시도 시 입력이 그대로인 단계는 건너뜁니다 (PIPELINE_RESUME=0 또는 --no-resume 이면 전체 실행).
 """
 import os
 import sys
 import json
-import subprocess
 import time
 from pathlib import Path
 
@@ -14,51 +16,77 @@ PLANNING_DIR = BASE_DIR / "planning"
 DATA_DIR = BASE_DIR / "data"
 PLANS_DIR = DATA_DIR / "plans"
 
+sys.path.insert(0, str(PLANNING_DIR))
+
+
+def main(student_id, input_path=None, recorder=None, resume=None):
+    """
+    특정 학번에 대한 전체 파이프라인 실행 (input_path: 학번별 설문 입력 파일)
+    recorder: instrumentation.StageRecorder (없으면 새로 만들어 단계별 시간만 출력)
+    resume: 체크포인트 재사용 여부 (None이면 PIPELINE_RESUME 환경 변수)
+    """
+    from instrumentation import StageRecorder, activate
+    from checkpoints import Checkpoints
+    from artifacts import ARTIFACT_FORMAT, artifact_path, load_scores, score_ids
 
-def main(student_id):
-    """특정 학번에 대한 전체 파이프라인 실행"""
     print(f"\n[START] Processing student: {student_id}")
     start_time = time.time()
+    recorder = recorder or StageRecorder()
+    activate(recorder)  # input/softmax 내부 단계(translation, encoding, vector_query)도 기록
+    checkpoints = Checkpoints(student_id, resume=resume)
+    
+    # 단계별 입력/출력 파일 (체크포인트 키 = 입력 파일 digest + 설정값)
+    template_file = PLANNING_DIR / "user_templates" / f"{student_id}_template.json"
+    user_info_file = PLANNING_DIR / "user_info" / f"{student_id}_user_info.csv"
+    # 점수 파일은 ARTIFACT_FORMAT 형식 (.json / .npz)
+    scores_file = artifact_path(PLANNING_DIR / "softmax_result_test" / f"{student_id}_recommendations_softmax.json")
+    candidates_file = PLANNING_DIR / "softmax_result_test" / f"{student_id}_candidates.npz"  # 가중치 what-if용 후보 배열
+    cluster_file = PLANNING_DIR / "clustering_result_test" / f"{student_id}_daily_clusters.json"
+    preference_file = artifact_path(PLANNING_DIR / "pure_preference_only" / f"{student_id}_recommendations_preference.json")
     
     try:
-        # STEP 1: input.py 실행 (이미 input.json이 생성된 상태)
+        # STEP 1: 설문 처리 (이미 input.json이 생성된 상태)
         print(f"\n[STEP 1/4] Processing user info...")
-        result = subprocess.run(
-            [sys.executable, str(PLANNING_DIR / "input.py")],
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace'
-        )
-        if result.returncode != 0:
-            print(f"[ERROR] Step 1 failed")
-            print(result.stderr[:500])
-            return False
+        from input import process_survey, DEFAULT_SURVEY_FILE, TRANSLATOR
+        survey_file = str(input_path) if input_path else DEFAULT_SURVEY_FILE
+        checkpoints.run("survey", [survey_file], [template_file, user_info_file],
+                        lambda: process_survey(survey_file), recorder,
+                        params={"translator": TRANSLATOR})
         print(f"[OK] Step 1 completed")
         
-        # STEP 2: softmax.py 실행 (student_id 전달)
+        # STEP 2: 추천 점수 생성 (student_id 전달)
         print(f"\n[STEP 2/4] Generating recommendations...")
-        result = subprocess.run(
-            [sys.executable, str(PLANNING_DIR / "softmax.py"), student_id],
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            timeout=120
-        )
-        if result.returncode != 0:
+        from softmax import process_student, CONFIG as SCORING_CONFIG, CATEGORY_FILES
+        from regions import normalize_region, region_dir
+        import pandas as pd
+        # 설문에서 고른 지역 샤드 (카탈로그 / 벡터 인덱스 / 위치 파일)
+        region = normalize_region(pd.read_csv(user_info_file).iloc[0].to_dict().get("region"))
+        scoring_params = {
+            "model": SCORING_CONFIG["MODEL_NAME"],
+            "encoder": SCORING_CONFIG["ENCODER_BACKEND"],
+            "vector_backend": os.getenv("VECTOR_BACKEND", "weaviate"),
+            "local_index": os.getenv("LOCAL_INDEX_DIR"),
+            "top_k": SCORING_CONFIG["TOP_K"],
+            "artifact_format": ARTIFACT_FORMAT
+        }
+        catalog_files = [region_dir(region) / f for f in CATEGORY_FILES.values()]
+        ok = checkpoints.run("scoring", [user_info_file] + catalog_files, [scores_file, candidates_file],
+                             lambda: process_student(student_id), recorder,
+                             params=dict(scoring_params, gamma=SCORING_CONFIG["GAMMA"], beta=SCORING_CONFIG["BETA"],
+                                         dislike_threshold=SCORING_CONFIG["DISLIKE_THRESHOLD"]))
+        if not ok:
             print(f"[ERROR] Step 2 failed")
-            print(result.stderr[:500])
             return False
         print(f"[OK] Step 2 completed")
         
         # STEP 3: clustering (student_id 전달)
         print(f"\n[STEP 3/4] Clustering places...")
-        sys.path.insert(0, str(PLANNING_DIR))
-        from clustering import process_single_user
-        process_single_user(student_id)
+        from clustering import process_single_user, place_file
+        ok = checkpoints.run("clustering", [user_info_file, scores_file, place_file(region)], [cluster_file],
+                             lambda: process_single_user(student_id), recorder)
+        if not ok:
+            print(f"[ERROR] Step 3 failed")
+            return False
         print(f"[OK] Step 3 completed")
         
         # STEP 4: 최종 플랜 생성
@@ -69,40 +97,54 @@ def main(student_id):
             build_popularity_schedule,
             generate_preference_scores,
             build_personalized_schedule,
-            build_hybrid_schedule
+            build_hybrid_schedule,
+            food_budget
         )
-        import pandas as pd
+        from plan_store import save_plan
         import csv
         
         # 파일 로드
-        template_file = PLANNING_DIR / "user_templates" / f"{student_id}_template.json"
-        cluster_file = PLANNING_DIR / "clustering_result_test" / f"{student_id}_daily_clusters.json"
-        user_info_file = PLANNING_DIR / "user_info" / f"{student_id}_user_info.csv"
-        
-        with open(template_file, "r", encoding="utf-8") as f:
-            template = json.load(f)
-        with open(cluster_file, "r", encoding="utf-8") as f:
-            cluster_data = json.load(f)
+        with recorder.stage("load_inputs"):
+            with open(template_file, "r", encoding="utf-8") as f:
+                template = json.load(f)
+            with open(cluster_file, "r", encoding="utf-8") as f:
+                cluster_data = json.load(f)
+            
+            user_info = pd.read_csv(user_info_file).iloc[0].to_dict()
+            
+            budget_per_day = template["budget_per_day"]
+            food_budget_per_day = food_budget(budget_per_day)
+            
+            place_data = load_place_data_for_schedule(region)
         
-        user_info = pd.read_csv(user_info_file).iloc[0].to_dict()
-        
-        budget_per_day = template["budget_per_day"]
-        food_budget_per_day = budget_per_day * 0.5
+        # 3가지 플랜 생성
+        with recorder.stage("popularity"):
+            sorted_data = load_sorted_by_review(region)
+            popularity_days = build_popularity_schedule(template, place_data, sorted_data)
         
-        place_data = load_place_data_for_schedule()
+        # 선호도 점수 (임베딩 + 벡터 검색) → 체크포인트가 있으면 저장된 결과 사용
+        preference = {}
         
-        # 3가지 플랜 생성
-        sorted_data = load_sorted_by_review()
-        popularity_days = build_popularity_schedule(template, place_data, sorted_data)
+        def run_preference():
+            preference["data"] = generate_preference_scores(student_id, user_info)
         
-        preference_data = generate_preference_scores(student_id, user_info)
-        personalized_days = build_personalized_schedule(template, place_data, preference_data)
+        checkpoints.run("preference", [user_info_file, *catalog_files], [preference_file],
+                        run_preference, recorder, params=scoring_params)
+        if "data" in preference:
+            preference_data = preference["data"]
+        else:
+            # 저장된 점수 배열에서 id 순서만 사용
+            preference_data = score_ids(load_scores(preference_file))
+        with recorder.stage("personalized"):
+            personalized_days = build_personalized_schedule(template, place_data, preference_data)
         
-        hybrid_days = build_hybrid_schedule(template, place_data, cluster_data, food_budget_per_day)
+        with recorder.stage("hybrid"):
+            hybrid_days = build_hybrid_schedule(template, place_data, cluster_data, food_budget_per_day)
         
         # 최종 JSON 구성
         full_schedule = {
             "studentId": str(student_id),
+            "region": region,
             "plan_order": ["hybrid", "popularity", "personalized"],
             "plans": {
                 "popularity": {"label": "인기도", "days": popularity_days},
@@ -111,25 +153,40 @@ def main(student_id):
             }
         }
         
-        # users.csv에서 user_id 찾기
-        users_csv = DATA_DIR / "users.csv"
-        user_id = None
-        if users_csv.exists():
-            with open(users_csv, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get("student_id") == str(student_id):
-                        user_id = row.get("user_id")
-                        break
-        
-        # 저장
-        output_file = PLANS_DIR / (f"{user_id}.json" if user_id else f"{student_id}_plan.json")
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(full_schedule, f, ensure_ascii=False, indent=2)
+        # hybrid 대안 플랜 (HYBRID_ALTERNATIVES > 1): 같은 점수/공간 인덱스로 클러스터링만 다시
+        from alternatives import HYBRID_ALTERNATIVES, alternative_plans, build_hybrid_alternatives
+        if HYBRID_ALTERNATIVES > 1:
+            with recorder.stage("alternatives"):
+                from clustering import accommodation_index, place_locations
+                alternatives = build_hybrid_alternatives(
+                    template, place_data, load_scores(scores_file), place_locations(region),
+                    cluster_data["budget"], cluster_data["duration_days"], food_budget_per_day,
+                    HYBRID_ALTERNATIVES, acc_index=accommodation_index(region), first=(cluster_data, hybrid_days)
+                )
+                extra_plans = alternative_plans(alternatives)
+                full_schedule["plans"].update(extra_plans)
+                full_schedule["hybrid_alternatives"] = list(extra_plans)
+        
+        with recorder.stage("save"):
+            # users.csv에서 user_id 찾기
+            users_csv = DATA_DIR / "users.csv"
+            user_id = None
+            if users_csv.exists():
+                with open(users_csv, "r", encoding="utf-8") as f:
+                    reader = csv.DictReader(f)
+                    for row in reader:
+                        if row.get("student_id") == str(student_id):
+                            user_id = row.get("user_id")
+                            break
+            
+            # 저장
+            output_file = PLANS_DIR / (f"{user_id}.json" if user_id else f"{student_id}_plan.json")
+            save_plan(output_file, full_schedule)
         
         elapsed = time.time() - start_time
         print(f"\n[SUCCESS] Plan generated: {output_file}")
         print(f"[TIME] {elapsed:.2f} seconds")
+        recorder.print_summary()
         return True
         
     except Exception as e:
@@ -137,14 +194,39 @@ def main(student_id):
         import traceback
         traceback.print_exc()
         return False
+    
+    finally:
+        activate(None)
+        from softmax import close_client
+        close_client()
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python process_single_student.py <student_id>")
-        sys.exit(1)
-    
-    student_id = sys.argv[1]
-    success = main(student_id)
-    sys.exit(0 if success else 1)
+    import argparse
+    from instrumentation import StageRecorder, write_report, profiling_requested, profile_dir_from_env
+
+    parser = argparse.ArgumentParser(description="단일 학번 플랜 생성")
+    parser.add_argument("student_id")
+    parser.add_argument("input_json", nargs="?", default=None, help="학번별 설문 입력 파일")
+    parser.add_argument("--profile", action="store_true",
+                        help="단계별 cProfile 저장 (PLANNER_PROFILE=1 과 동일, 기본 data/profiles)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="체크포인트를 무시하고 모든 단계 실행 (PIPELINE_RESUME=0 과 동일)")
+    args = parser.parse_args()
+
+    student_id = args.student_id
+    input_path = args.input_json
 
+    # API 작업 관리자가 PIPELINE_JOB_ID를 넘겨줌 (직접 실행 시 시각 기반 id)
+    job_id = os.getenv("PIPELINE_JOB_ID") or time.strftime("local%Y%m%d%H%M%S")
+    profile_dir = profile_dir_from_env() if (args.profile or profiling_requested()) else None
+    recorder = StageRecorder(profile_dir=profile_dir, profile_prefix=f"{job_id}_{student_id}")
+    success = False
+    try:
+        success = main(student_id, input_path, recorder=recorder, resume=False if args.no_resume else None)
+    finally:
+        # API 작업 관리자가 지정한 경로에 단계 리포트 저장 (메트릭/작업 레코드용)
+        report_path = os.getenv("PIPELINE_REPORT_PATH")
+        if report_path:
+            write_report(recorder, report_path, ok=bool(success))
+    sys.exit(0 if success else 1)
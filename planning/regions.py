@@ -0,0 +1,143 @@
+"""
+지역(도시)별 데이터 샤드
+
+지역마다 카탈로그 CSV 4종 + 클러스터링 위치 CSV를 data_set/regions/{region}/ 에 같은 파일명으로 둡니다.
+기본 지역(gangneung)은 기존 data_set/ 바로 아래 파일을 그대로 씁니다 (regions/gangneung/ 이 있으면 그쪽 우선).
+    data_set/regions/sokcho/cafe_fixed.csv, restaurants_fixed.csv, attractions_fixed.csv,
+                            accommodations_fixed.csv, clustering_category_combine_with_hours_and_price.csv
+                            (+ 인기도 플랜용 *_fixed_sorted.csv)
+
+설문에서 고른 지역(user_info의 region)의 샤드만 읽으므로 플랜 1건의 비용은 전체 카탈로그가 아니라 그 지역 크기에 비례합니다.
+카탈로그 / 위치 dict / 벡터 인덱스는 ShardCache로 처음 쓸 때 읽고, 지역 수가 REGION_CACHE_SIZE를 넘으면
+가장 오래 안 쓴 지역부터 내립니다 (파일이 바뀌면 다음 호출 때 다시 읽음).
+
+REGION_DATA_DIR 로 regions 디렉토리를 바꿀 수 있습니다 (벤치마크용).
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+PLANNING_DIR = Path(__file__).resolve().parent
+DATA_SET_DIR = PLANNING_DIR / "data_set"
+REGIONS_DIR = Path(os.getenv("REGION_DATA_DIR", DATA_SET_DIR / "regions"))
+
+DEFAULT_REGION = "gangneung"
+REGION_CACHE_SIZE = int(os.getenv("REGION_CACHE_SIZE", "4"))  # 프로세스당 동시에 올려 둘 지역 수 (샤드 종류별)
+
+_REGION_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")  # 디렉토리 / Weaviate 컬렉션 이름에 그대로 사용
+
+
+class UnknownRegion(ValueError):
+    """등록되지 않은 지역"""
+
+
+def normalize_region(region):
+    """설문/CSV 값 → 지역 id (없으면 기본 지역). 형식이 잘못되면 UnknownRegion"""
+    if not isinstance(region, str) or not region.strip():
+        return DEFAULT_REGION
+    region = region.strip().lower()
+    if not _REGION_PATTERN.match(region):
+        raise UnknownRegion(f"[ERROR] 잘못된 지역 이름: {region}")
+    return region
+
+
+def region_dir(region=None):
+    """지역 샤드 디렉토리"""
+    region = normalize_region(region)
+    shard = REGIONS_DIR / region
+    if region == DEFAULT_REGION and not shard.is_dir():
+        return DATA_SET_DIR
+    return shard
+
+
+def region_file(region, filename):
+    return region_dir(region) / filename
+
+
+def available_regions():
+    """기본 지역 + regions/ 아래 디렉토리"""
+    regions = {DEFAULT_REGION}
+    if REGIONS_DIR.is_dir():
+        regions.update(p.name for p in REGIONS_DIR.iterdir() if p.is_dir() and _REGION_PATTERN.match(p.name))
+    return sorted(regions)
+
+
+def validate_region(region):
+    """등록된 지역인지 확인 후 지역 id 반환 (없으면 UnknownRegion)"""
+    region = normalize_region(region)
+    if region != DEFAULT_REGION and not region_dir(region).is_dir():
+        raise UnknownRegion(f"[ERROR] 등록되지 않은 지역: {region} (지원: {', '.join(available_regions())})")
+    return region
+
+
+def files_version(paths):
+    """파일들의 (이름, mtime, size). 샤드 캐시 무효화 키로 사용"""
+    stamp = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stamp.append((Path(path).name, st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+class ShardCache:
+    """
+    지역 → 데이터 LRU (지역당 1개, 최대 maxsize개)
+    loader(region): 샤드 읽기, version_fn(region): 파일 stamp (바뀌면 다시 로드)
+    """
+
+    def __init__(self, name, loader, version_fn, maxsize=None):
+        self.name = name
+        self.loader = loader
+        self.version_fn = version_fn
+        self.maxsize = maxsize or REGION_CACHE_SIZE
+        self._entries = OrderedDict()  # region → (version, data)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, region=None):
+        region = normalize_region(region)
+        version = self.version_fn(region)
+        entry = self._lookup(region, version)
+        if entry is not None:
+            return entry
+        # 지역별 로드 잠금: 같은 지역은 한 번만 읽고, 다른 지역 조회는 막지 않음
+        with self._lock:
+            load_lock = self._load_locks.setdefault(region, threading.Lock())
+        with load_lock:
+            entry = self._lookup(region, version)
+            if entry is not None:
+                return entry
+            data = self.loader(region)
+            with self._lock:
+                self.loads += 1
+                self._entries[region] = (version, data)
+                self._entries.move_to_end(region)
+                while len(self._entries) > self.maxsize:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self.evictions += 1
+                    print(f"[REGION] {self.name}: {evicted} 샤드 해제 (최대 {self.maxsize}개)")
+            return data
+
+    def _lookup(self, region, version):
+        with self._lock:
+            entry = self._entries.get(region)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(region)
+                return entry[1]
+        return None
+
+    def loaded(self):
+        """현재 올라와 있는 지역 (오래된 순)"""
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
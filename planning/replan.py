@@ -0,0 +1,194 @@
+"""
+증분 재계획 (설문 항목 일부만 바뀐 경우)
+
+바뀐 항목에 영향을 받는 단계만 다시 실행하고, 나머지는 학번별로 저장된 중간 결과를 그대로 씁니다.
+- budget : 유저 템플릿/user_info 예산 → 숙소 선택(select_best_accommodation) → hybrid 일정 (+ 대안 플랜) → 플랜 저장
+           번역 / 임베딩 / 벡터 검색 / 점수 계산 / 클러스터링은 예산과 무관하므로 재사용하고,
+           popularity / personalized 플랜도 예산 무관이라 저장된 그대로 둡니다.
+그 외 항목(키워드, 여행 스타일 순위 등)은 전체 파이프라인이 필요합니다 (needs_full_run).
+
+API 프로세스에서 바로 실행하므로 sys.path를 건드리지 않고 패키지/스크립트 양쪽 import를 지원합니다.
+"""
+import csv
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    from .alternatives import alternative_plans, build_hybrid_alternatives
+    from .artifacts import find_artifact, load_scores
+    from .catalog import load_place_catalog
+    from .clustering import accommodation_index, place_locations, select_best_accommodation
+    from .instrumentation import StageRecorder
+    from .plan_store import load_plan, plan_lock, record_edit, save_plan, write_json_atomic
+    from .schedule_builder import build_hybrid_schedule, food_budget
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from alternatives import alternative_plans, build_hybrid_alternatives
+    from artifacts import find_artifact, load_scores
+    from catalog import load_place_catalog
+    from clustering import accommodation_index, place_locations, select_best_accommodation
+    from instrumentation import StageRecorder
+    from plan_store import load_plan, plan_lock, record_edit, save_plan, write_json_atomic
+    from schedule_builder import build_hybrid_schedule, food_budget
+
+PLANNING_DIR = Path(__file__).resolve().parent
+
+# 전체 파이프라인 없이 반영할 수 있는 설문 항목
+INCREMENTAL_FIELDS = {"budget"}
+
+
+class ReplanUnavailable(Exception):
+    """저장된 중간 결과가 없어 증분 재계획을 할 수 없음 (전체 파이프라인 필요)"""
+
+
+def needs_full_run(changes):
+    """바뀐 항목 중 증분 재계획으로 처리할 수 없는 것이 있으면 True"""
+    return bool(set(changes) - INCREMENTAL_FIELDS)
+
+
+def artifact_paths(student_id):
+    """파이프라인이 학번별로 남기는 중간 결과 경로"""
+    return {
+        "template": PLANNING_DIR / "user_templates" / f"{student_id}_template.json",
+        "user_info": PLANNING_DIR / "user_info" / f"{student_id}_user_info.csv",
+        "scores": PLANNING_DIR / "softmax_result_test" / f"{student_id}_recommendations_softmax.json",  # .npz 가능
+        "clusters": PLANNING_DIR / "clustering_result_test" / f"{student_id}_daily_clusters.json",
+    }
+
+
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _update_user_info_budget(path, budget_total):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+    for row in rows:
+        row["budget"] = budget_total
+    # 임시 파일에 쓴 뒤 교체 (잠금 없이 읽는 쪽이 절반만 쓰인 파일을 보지 않도록)
+    fd, tmp = tempfile.mkstemp(dir=Path(path).parent, prefix=f".{Path(path).name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def replan_budget(student_id, budget_total, plan_path, recorder=None):
+    """
+    예산만 바뀐 경우 숙소 선택 + hybrid 일정만 다시 계산해 플랜 파일 갱신.
+    hybrid 계열 플랜의 편집(고정 / 삭제)은 새 일정에 다시 적용합니다.
+    중간 결과나 플랜 파일이 없으면 ReplanUnavailable.
+    반환: 단계 리포트 ({"stages": [...], "total": {...}})
+    """
+    paths = artifact_paths(student_id)
+    missing = [name for name, p in paths.items()
+               if not (find_artifact(p) if name == "scores" else p.exists())]
+    if not Path(plan_path).exists():
+        missing.append("plan")
+    if missing:
+        raise ReplanUnavailable(f"{student_id}: 중간 결과 없음 ({', '.join(missing)})")
+
+    recorder = recorder or StageRecorder()
+    budget_total = int(budget_total)
+
+    with recorder.stage("template"):
+        template = _load_json(paths["template"])
+        cluster_data = _load_json(paths["clusters"])
+        region = cluster_data.get("region")  # 클러스터링 때 고른 지역 샤드
+        duration_days = int(cluster_data.get("duration_days") or len(template["itinerary"]))
+        template["budget_per_day"] = budget_total // duration_days
+        write_json_atomic(paths["template"], template)
+        _update_user_info_budget(paths["user_info"], budget_total)
+
+    with recorder.stage("accommodation"):
+        # 클러스터(장소 묶음)는 예산과 무관 → 숙소만 새 예산으로 다시 선택
+        scores = load_scores(paths["scores"])
+        accommodation_id, accommodation_score = select_best_accommodation(
+            scores, cluster_data["clusters"], place_locations(region),
+            budget_total, duration_days, index=accommodation_index(region)
+        )
+        cluster_data.update({
+            "budget": budget_total,
+            "Accommodation": accommodation_id,
+            "accommodation_score": accommodation_score
+        })
+        write_json_atomic(paths["clusters"], cluster_data)
+
+    try:  # plan_edit 이 replan 을 import 하므로 여기서
+        from .plan_edit import reapply_edits
+    except ImportError:
+        from plan_edit import reapply_edits
+
+    day_food_budget = food_budget(template["budget_per_day"])
+    with recorder.stage("hybrid"):
+        place_data = load_place_catalog(region)
+        hybrid_days = build_hybrid_schedule(template, place_data, cluster_data, day_food_budget)
+
+    # 플랜 읽기 → 저장 사이에 편집(plan_edit.py)이 끼어들지 않도록 잠금
+    with plan_lock(plan_path):
+        with recorder.stage("load_plan"):
+            full_schedule = load_plan(plan_path, place_data)
+            plans = full_schedule["plans"]
+            previous = full_schedule.pop("hybrid_alternatives", None)
+            old_alternatives = {key: plans.pop(key) for key in previous or [] if key in plans}
+
+        with recorder.stage("edits"):
+            # 유저 편집(고정 / 삭제)은 새 일정에도 그대로 (편집한 day만 다시 채움)
+            hybrid_days = reapply_edits(plans["hybrid"], hybrid_days, template, place_data,
+                                        cluster_data, lambda: scores, day_food_budget)
+
+        if previous:
+            with recorder.stage("alternatives"):
+                # hybrid 대안 플랜도 새 예산으로 다시 (대안 수는 기존과 같게, 삭제한 장소는 후보에서 제외)
+                excluded = set(plans["hybrid"].get("removed", []))
+                for plan in old_alternatives.values():
+                    excluded.update(plan.get("removed", []))
+                alternatives = build_hybrid_alternatives(
+                    template, place_data, scores, place_locations(region), budget_total, duration_days,
+                    day_food_budget, len(previous) + 1, acc_index=accommodation_index(region),
+                    first=(cluster_data, hybrid_days), excluded=excluded
+                )
+                extra_plans = alternative_plans(alternatives)
+                for alternative, (key, plan) in zip(alternatives[1:], extra_plans.items()):
+                    old = old_alternatives.get(key)
+                    if old is not None:
+                        plan.update({name: old[name] for name in ("days", "pinned", "removed") if name in old})
+                        reapply_edits(plan, alternative["days"], template, place_data,
+                                      alternative, lambda: scores, day_food_budget)
+                plans.update(extra_plans)
+                full_schedule["hybrid_alternatives"] = list(extra_plans)
+
+        with recorder.stage("save"):
+            # hybrid 일정이 바뀌었으므로 버전을 올림 (예전 버전 기준 편집은 충돌)
+            record_edit(full_schedule, {"op": "replan_budget", "plan": "hybrid", "budget": budget_total})
+            save_plan(plan_path, full_schedule)
+
+    return recorder.report()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="예산만 바뀐 학번의 플랜 증분 재계획")
+    parser.add_argument("student_id")
+    parser.add_argument("--budget", type=int, required=True, help="새 총 예산 (원)")
+    parser.add_argument("--plan", help="플랜 파일 (기본 data/plans/{student_id}_plan.json)")
+    args = parser.parse_args()
+
+    plan = args.plan or PLANNING_DIR.parent / "data" / "plans" / f"{args.student_id}_plan.json"
+    t = time.perf_counter()
+    report = replan_budget(args.student_id, args.budget, plan)
+    for s in report["stages"]:
+        print(f"[STAGE] {s['stage']:<14} {s['wall_s']:.3f}s")
+    print(f"[OK] {args.student_id} 재계획 완료: {plan} ({time.perf_counter() - t:.3f}s)")
@@ -8,7 +8,7 @@
 4. schedule_builder.py - 템플릿 기반 최종 일정 생성 (예산 반영)
 
 사용법:
-    python planning/run_pipeline.py
+    python planning/run_pipeline.py [--profile]
 """
 
 import os
@@ -17,14 +17,7 @@ import time
 import json
 import csv
 import pandas as pd
-import numpy as np
 from pathlib import Path
-from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import weaviate
-from weaviate.auth import AuthApiKey
-from weaviate.classes import query as wq
 
 # 현재 스크립트의 디렉토리 경로
 PLANNING_DIR = Path(__file__).parent
@@ -34,6 +27,17 @@ BASE_DIR = PLANNING_DIR.parent
 # planning 디렉토리를 Python 경로에 추가
 sys.path.insert(0, str(PLANNING_DIR))
 
+from artifacts import save_scores
+from catalog import SCHEDULE_FILES, load_place_catalog
+from plan_store import save_plan
+from regions import DEFAULT_REGION, normalize_region, region_dir
+from schedule_builder import (
+    build_popularity_schedule,
+    build_personalized_schedule,
+    build_hybrid_schedule,
+    food_budget
+)
+
 # 카테고리 매핑
 CATEGORY_TRANSLATE = {
     "Accommodation": "Accommodation",
@@ -79,8 +83,10 @@ def run_step_1_input():
     print_step(1, "사용자 정보 처리", "설문 데이터를 처리하고 여행 스타일 템플릿을 생성합니다.")
     
     try:
-        # input.py 모듈 import 및 실행
-        import input as input_module
+        # input.py 설문 처리 함수 실행
+        from input import process_survey
+        
+        process_survey(str(PLANNING_DIR / "input.json"))
         
         print("\n[OK] STEP 1 완료: 사용자 정보 처리 성공")
         return True
@@ -97,8 +103,13 @@ def run_step_2_softmax():
     print_step(2, "장소 추천 생성", "Weaviate를 사용하여 사용자 맞춤 장소를 추천합니다.")
     
     try:
-        # softmax.py 모듈 import 및 실행
-        import softmax as softmax_module
+        # softmax.py 추천 함수 실행 (input.json의 학번)
+        from softmax import process_student
+        
+        with open(PLANNING_DIR / "input.json", "r", encoding="utf-8") as f:
+            student_id = json.load(f)["responses"]["studentID"]
+        if not process_student(student_id):
+            return False
         
         print("\n[OK] STEP 2 완료: 장소 추천 생성 성공")
         return True
@@ -132,179 +143,69 @@ def run_step_3_clustering():
 
 # ==================== 일정 생성 헬퍼 함수들 ====================
 
-def load_place_data_for_schedule():
-    """장소 데이터 로드"""
-    place_data = {}
-    csv_files = {"Cafe": "cafe_fixed.csv", "Restaurant": "restaurants_fixed.csv",
-                 "Attraction": "attractions_fixed.csv", "Accommodation": "accommodations_fixed.csv"}
-    
-    for category, filename in csv_files.items():
-        filepath = PLANNING_DIR / "data_set" / filename
-        if not filepath.exists():
-            continue
-        df = pd.read_csv(filepath)
-        for _, row in df.iterrows():
-            place_id = row["id"]
-            lat = row["lat"] if category == "Accommodation" else row["latitude"]
-            lng = row["lng"] if category == "Accommodation" else row["longitude"]
-            desc = row.get("description", "")
-            if pd.isna(desc):
-                desc = ""
-            place_data[place_id] = {
-                "id": place_id, "name": row["name"], "category": category,
-                "latitude": lat, "longitude": lng,
-                "avg_price": row.get("avg_price", 0) if category in ["Cafe", "Restaurant"] else None,
-                "description": desc
-            }
-    return place_data
+def load_place_data_for_schedule(region=None):
+    """지역 장소 데이터 로드 (카탈로그 캐시 사용)"""
+    return load_place_catalog(region)
 
 
-def load_sorted_by_review():
-    """리뷰 수로 정렬된 CSV 로드"""
+def load_sorted_by_review(region=None):
+    """
+    리뷰 수로 정렬된 CSV 로드 (기본 지역은 greedy/sorting_review_dataset, 그 외는 지역 샤드 디렉토리)
+    지역 샤드에 *_sorted.csv 가 없으면 지역 카탈로그 CSV를 리뷰 수 내림차순으로 정렬해 사용
+    """
     sorted_data = {}
     files = {"Cafe": "cafe_fixed_sorted.csv", "Restaurant": "restaurants_fixed_sorted.csv",
              "Attraction": "attractions_fixed_sorted.csv", "Accommodation": "accommodations_fixed_sorted.csv"}
+    region = normalize_region(region)
+    sorted_dir = GREEDY_DIR / "sorting_review_dataset" if region == DEFAULT_REGION else region_dir(region)
     for category, filename in files.items():
-        filepath = GREEDY_DIR / "sorting_review_dataset" / filename
+        filepath = sorted_dir / filename
         if filepath.exists():
             sorted_data[category] = pd.read_csv(filepath).to_dict('records')
+        elif region != DEFAULT_REGION and (region_dir(region) / SCHEDULE_FILES[category]).exists():
+            df = pd.read_csv(region_dir(region) / SCHEDULE_FILES[category])
+            review_col = "review_count" if category == "Accommodation" else "all_review_count"
+            if review_col in df.columns:
+                df = df.sort_values(review_col, ascending=False, kind="stable")
+            sorted_data[category] = df[["id"]].to_dict('records')
     return sorted_data
 
 
-def build_popularity_schedule(template, place_data, sorted_data):
-    """인기도 기반 일정 (예산 무관)"""
-    days, used_ids = {}, set()
-    accommodation_id = sorted_data.get("Accommodation", [{}])[0].get("id") if sorted_data.get("Accommodation") else None
-    for day_info in template["itinerary"]:
-        day_schedule = []
-        for slot in day_info["place_plan"]:
-            cat, time = slot["category"], slot["time"]
-            if cat == "Accommodation":
-                if accommodation_id and accommodation_id in place_data:
-                    info = place_data[accommodation_id]
-                    day_schedule.append({"id": int(accommodation_id), "name": info["name"], "description": info["description"],
-                                       "lat": float(info["latitude"]), "lng": float(info["longitude"]), "time": time, "category": cat})
-                continue
-            for cand in sorted_data.get(cat, []):
-                pid = cand.get("id") if isinstance(cand, dict) else cand
-                if pid in used_ids or pid not in place_data:
-                    continue
-                used_ids.add(pid)
-                info = place_data[pid]
-                day_schedule.append({"id": int(pid), "name": info["name"], "description": info["description"],
-                                   "lat": float(info["latitude"]), "lng": float(info["longitude"]), "time": time, "category": cat})
-                break
-        days[f"day{day_info['day']}"] = day_schedule
-    return days
-
-
 def generate_preference_scores(student_id, user_info):
-    """선호도 점수 생성"""
+    """선호도 점수 생성 (softmax.py와 같은 장소 저장소/모델/검색 결과 공유)"""
+    from softmax import CONFIG, get_model, max_dislike_similarity, candidate_limit, top_k_candidates
+    from vector_store import query_categories
+
     print(f"\n[PREFERENCE] {student_id} 선호도 점수 계산 중...")
-    load_dotenv()
-    client = weaviate.connect_to_weaviate_cloud(
-        cluster_url=os.getenv("WEAVIATE_CLUSTER_URL"),
-        auth_credentials=AuthApiKey(os.getenv("WEAVIATE_API_KEY"))
-    )
-    collection = client.collections.get("Place")
-    model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
+    region = normalize_region(user_info.get("region"))
+    model = get_model()
     like_keywords = eval(user_info["like_keywords"])
     dislike_keywords = eval(user_info["dislike_keywords"])
     user_like_vec = model.encode(" ".join(like_keywords), convert_to_numpy=True)
     user_dislike_vecs = [model.encode(kw, convert_to_numpy=True) for kw in dislike_keywords]
+
+    def score(hit, like_sim):
+        # 페널티는 0 이상 (점수 <= like_sim 이어야 top_k_candidates 조기 종료가 정확)
+        return like_sim - 0.5 * max(0.0, max_dislike_similarity(user_dislike_vecs, hit.dislike_embedding))
+
     results_by_cat = {}
-    for korean_cat in ["Accommodation", "카페", "음식점", "관광지"]:
-        results = collection.query.near_vector(near_vector=user_like_vec.tolist(), limit=4000, return_metadata=["distance"],
-                                              include_vector=True, filters=wq.Filter.by_property("category").equal(korean_cat))
-        scored, seen_ids = [], set()
-        for obj in results.objects:
-            pid = obj.properties.get("place_id")
-            if pid in seen_ids:
-                continue
-            seen_ids.add(pid)
-            like_sim = 1 - obj.metadata.distance
-            place_dislike_vec = obj.properties.get("dislike_embedding", [])
-            max_dislike_sim = 0
-            if place_dislike_vec and user_dislike_vecs:
-                sims = [cosine_similarity([ud], [place_dislike_vec])[0][0] for ud in user_dislike_vecs if len(ud) > 0]
-                max_dislike_sim = max(sims) if sims else 0
-            scored.append({"id": pid, "preference_score": float(like_sim - 0.5 * max_dislike_sim)})
-        scored.sort(key=lambda x: x["preference_score"], reverse=True)
-        results_by_cat[CATEGORY_TRANSLATE[korean_cat]] = scored
-    client.close()
+    # softmax 점수 계산과 같은 like 벡터/후보 수 → 같은 프로세스면 검색 결과 재사용, 아니면 4개 카테고리 동시 검색
+    top_k = CONFIG["TOP_K"]
+    hits_by_cat = query_categories(user_like_vec, ["Accommodation", "카페", "음식점", "관광지"],
+                                   limit=candidate_limit(top_k), region=region)
+    for korean_cat, hits in hits_by_cat.items():
+        ranked = top_k_candidates(user_like_vec, korean_cat, top_k, score, hits, region)
+        results_by_cat[CATEGORY_TRANSLATE[korean_cat]] = [
+            {"id": hit.place_id, "preference_score": float(s)} for hit, s in ranked
+        ]
     pref_dir = PLANNING_DIR / "pure_preference_only"
     os.makedirs(pref_dir, exist_ok=True)
-    pref_file = pref_dir / f"{student_id}_recommendations_preference.json"
-    with open(pref_file, "w", encoding="utf-8") as f:
-        json.dump(results_by_cat, f, ensure_ascii=False, indent=2)
+    pref_file = save_scores(pref_dir / f"{student_id}_recommendations_preference.json",
+                            results_by_cat, "preference_score")
     print(f"[OK] 선호도 점수 저장: {pref_file}")
     return results_by_cat
 
 
-def build_personalized_schedule(template, place_data, preference_data):
-    """선호도 기반 일정 (예산 무관)"""
-    days, used_ids = {}, set()
-    accommodation_id = preference_data.get("Accommodation", [{}])[0].get("id") if preference_data.get("Accommodation") else None
-    for day_info in template["itinerary"]:
-        day_schedule = []
-        for slot in day_info["place_plan"]:
-            cat, time = slot["category"], slot["time"]
-            if cat == "Accommodation":
-                if accommodation_id and accommodation_id in place_data:
-                    info = place_data[accommodation_id]
-                    day_schedule.append({"id": int(accommodation_id), "name": info["name"], "description": info["description"],
-                                       "lat": float(info["latitude"]), "lng": float(info["longitude"]), "time": time, "category": cat})
-                continue
-            for cand in preference_data.get(cat, []):
-                pid = cand.get("id") if isinstance(cand, dict) else cand
-                if pid in used_ids or pid not in place_data:
-                    continue
-                used_ids.add(pid)
-                info = place_data[pid]
-                day_schedule.append({"id": int(pid), "name": info["name"], "description": info["description"],
-                                   "lat": float(info["latitude"]), "lng": float(info["longitude"]), "time": time, "category": cat})
-                break
-        days[f"day{day_info['day']}"] = day_schedule
-    return days
-
-
-def build_hybrid_schedule(template, place_data, cluster_data, budget_per_day):
-    """Hybrid 일정 (예산 고려)"""
-    days, used_ids = {}, set()
-    accommodation_id = cluster_data.get("Accommodation")
-    clusters = cluster_data["clusters"]
-    for day_info in template["itinerary"]:
-        day_num = day_info["day"]
-        cluster = clusters[min(day_num - 1, len(clusters) - 1)]
-        day_schedule, day_budget = [], budget_per_day
-        for slot in day_info["place_plan"]:
-            cat, time = slot["category"], slot["time"]
-            if cat == "Accommodation":
-                if accommodation_id and accommodation_id in place_data:
-                    info = place_data[accommodation_id]
-                    day_schedule.append({"id": int(accommodation_id), "name": info["name"], "description": info["description"],
-                                       "lat": float(info["latitude"]), "lng": float(info["longitude"]), "time": time, "category": cat})
-                continue
-            for cand in cluster["categories"].get(cat, []):
-                pid = cand.get("id") if isinstance(cand, dict) else cand
-                if pid in used_ids or pid not in place_data:
-                    continue
-                info = place_data[pid]
-                if cat in ["Cafe", "Restaurant"]:
-                    price = info.get("avg_price", 0)
-                    if pd.isna(price) or price == 0:
-                        price = 5000
-                    if price > day_budget:
-                        continue
-                    day_budget -= price
-                used_ids.add(pid)
-                day_schedule.append({"id": int(pid), "name": info["name"], "description": info["description"],
-                                   "lat": float(info["latitude"]), "lng": float(info["longitude"]), "time": time, "category": cat})
-                break
-        days[f"day{day_num}"] = day_schedule
-    return days
-
-
 def run_step_4_schedule():
     """STEP 4: 3가지 여행 플랜 생성"""
     print_step(4, "최종 일정 생성", "3가지 여행 플랜(Popularity + Personalized + Hybrid)을 생성합니다.")
@@ -324,17 +225,18 @@ def run_step_4_schedule():
         with open(cluster_file, "r", encoding="utf-8") as f:
             cluster_data = json.load(f)
         user_info = pd.read_csv(user_info_file).iloc[0].to_dict()
+        region = normalize_region(user_info.get("region"))
         
         budget_per_day = template["budget_per_day"]
         # 숙소는 별도 예산(50%)으로 이미 처리됨
         # 음식/카페 예산 = 일일 예산의 50%
-        food_budget_per_day = budget_per_day * 0.5
+        food_budget_per_day = food_budget(budget_per_day)
         
-        place_data = load_place_data_for_schedule()
+        place_data = load_place_data_for_schedule(region)
         
         # 3가지 플랜 생성
         print(f"\n[1/3] Popularity 플랜 생성 중...")
-        sorted_data = load_sorted_by_review()
+        sorted_data = load_sorted_by_review(region)
         popularity_days = build_popularity_schedule(template, place_data, sorted_data)
         
         print(f"\n[2/3] Personalized 플랜 생성 중...")
@@ -348,6 +250,7 @@ def run_step_4_schedule():
         # 최종 JSON 구성
         full_schedule = {
             "studentId": str(student_id),
+            "region": region,
             "plan_order": ["hybrid", "popularity", "personalized"],
             "plans": {
                 "popularity": {"label": "인기도", "days": popularity_days},
@@ -371,8 +274,7 @@ def run_step_4_schedule():
         os.makedirs(output_dir, exist_ok=True)
         output_file = output_dir / (f"{user_id}.json" if user_id else f"{student_id}_plan.json")
         
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(full_schedule, f, ensure_ascii=False, indent=2)
+        save_plan(output_file, full_schedule)
         
         print(f"\n[SAVE] 전체 플랜 저장 완료: {output_file}")
         print("\n[OK] STEP 4 완료: 3가지 플랜 생성 성공")
@@ -411,7 +313,7 @@ def print_results():
     # softmax_result_test
     softmax_dir = PLANNING_DIR / "softmax_result_test"
     if softmax_dir.exists():
-        softmax_results = list(softmax_dir.glob("*_recommendations_softmax.json"))
+        softmax_results = list(softmax_dir.glob("*_recommendations_softmax.*"))
         for s in softmax_results:
             print(f"   + {s.relative_to(BASE_DIR)}")
     
@@ -425,7 +327,7 @@ def print_results():
     # pure_preference_only
     pref_dir = PLANNING_DIR / "pure_preference_only"
     if pref_dir.exists():
-        pref_results = list(pref_dir.glob("*_recommendations_preference.json"))
+        pref_results = list(pref_dir.glob("*_recommendations_preference.*"))
         for p in pref_results:
             print(f"   + {p.relative_to(BASE_DIR)}")
     
@@ -440,8 +342,10 @@ def print_results():
     print("\n" + "="*70)
 
 
-def main():
-    """메인 실행 함수"""
+def main(profile=False):
+    """메인 실행 함수 (profile: 단계별 cProfile 저장, PLANNER_PROFILE=1 과 동일)"""
+    from instrumentation import StageRecorder, activate, profiling_requested, profile_dir_from_env
+
     start_time = time.time()
     
     print("\n" + "="*70)
@@ -452,34 +356,56 @@ def main():
     if not check_input_file():
         sys.exit(1)
     
+    with open(PLANNING_DIR / "input.json", "r", encoding="utf-8") as f:
+        student_id = json.load(f)["responses"]["studentID"]
+    profile_dir = profile_dir_from_env() if (profile or profiling_requested()) else None
+    recorder = StageRecorder(profile_dir=profile_dir,
+                             profile_prefix=f"{time.strftime('local%Y%m%d%H%M%S')}_{student_id}")
+    activate(recorder)
+    
     # STEP 1: 사용자 정보 처리
-    if not run_step_1_input():
+    with recorder.stage("step1_input"):
+        ok = run_step_1_input()
+    if not ok:
         print("\n[STOP] 파이프라인 중단: STEP 1에서 오류 발생")
         sys.exit(1)
     
     time.sleep(1)  # 파일 I/O 안정화
     
     # STEP 2: 장소 추천
-    if not run_step_2_softmax():
+    with recorder.stage("step2_softmax"):
+        ok = run_step_2_softmax()
+    if not ok:
         print("\n[STOP] 파이프라인 중단: STEP 2에서 오류 발생")
         sys.exit(1)
     
     time.sleep(1)  # 파일 I/O 안정화
     
     # STEP 3: 클러스터링
-    if not run_step_3_clustering():
+    with recorder.stage("step3_clustering"):
+        ok = run_step_3_clustering()
+    if not ok:
         print("\n[STOP] 파이프라인 중단: STEP 3에서 오류 발생")
         sys.exit(1)
     
     time.sleep(1)  # 파일 I/O 안정화
     
     # STEP 4: 최종 일정 생성
-    if not run_step_4_schedule():
+    with recorder.stage("step4_schedule"):
+        ok = run_step_4_schedule()
+    if not ok:
         print("\n[STOP] 파이프라인 중단: STEP 4에서 오류 발생")
         sys.exit(1)
     
+    activate(None)
+    
     # 결과 출력
     print_results()
+    recorder.print_summary()
+    
+    # Weaviate 연결 종료 (STEP 2, 4에서 공유)
+    from softmax import close_client
+    close_client()
     
     # 총 실행 시간
     elapsed_time = time.time() - start_time
@@ -489,7 +415,7 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        main(profile="--profile" in sys.argv[1:])
     except KeyboardInterrupt:
         print("\n\n[WARNING] 사용자에 의해 실행이 중단되었습니다.")
         sys.exit(1)
@@ -498,4 +424,3 @@ if __name__ == "__main__":
         import traceback
         traceback.print_exc()
         sys.exit(1)
-
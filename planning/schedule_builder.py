@@ -0,0 +1,122 @@
+"""
+템플릿 기반 최종 일정 생성 (STEP 4)
+
+유저 템플릿의 슬롯(day / time / category)을 후보 목록으로 채워 3가지 플랜의 days를 만듭니다.
+- popularity   : 리뷰 수 정렬 (예산 무관)
+- personalized : 선호도 점수 (예산 무관)
+- hybrid       : 클러스터 결과 + 하루 음식/카페 예산
+
+pandas / 카탈로그 외에는 의존성이 없어서 API 프로세스(증분 재계획)에서도 그대로 import 합니다.
+"""
+import pandas as pd
+
+try:
+    from .catalog import place_entry
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from catalog import place_entry
+
+FOOD_BUDGET_RATIO = 0.5  # 하루 예산 중 음식/카페 비율
+DEFAULT_FOOD_PRICE = 5000  # 가격 정보가 없는 카페/음식점 1회 비용
+
+
+def food_budget(budget_per_day):
+    """hybrid 일정의 하루 음식/카페 예산"""
+    return budget_per_day * FOOD_BUDGET_RATIO
+
+
+def food_price(info):
+    """카페/음식점 1회 비용 (avg_price, 없거나 0이면 DEFAULT_FOOD_PRICE)"""
+    price = info.get("avg_price", 0)
+    if pd.isna(price) or price == 0:
+        return DEFAULT_FOOD_PRICE
+    return price
+
+
+def next_unused(cat, candidates, cursors, used_ids, place_data):
+    """
+    카테고리 후보 목록에서 아직 안 쓴 다음 장소 id (없으면 None)
+    앞에서 건너뛴 후보는 이후에도 계속 건너뛰므로 카테고리별 커서부터 이어서 찾습니다 (N일 일정에서도 후보 1회 순회)
+    """
+    i = cursors.get(cat, 0)
+    while i < len(candidates):
+        cand = candidates[i]
+        pid = cand.get("id") if isinstance(cand, dict) else cand
+        i += 1
+        if pid not in used_ids and pid in place_data:
+            cursors[cat] = i
+            return pid
+    cursors[cat] = i
+    return None
+
+
+def build_popularity_schedule(template, place_data, sorted_data):
+    """인기도 기반 일정 (예산 무관)"""
+    days, used_ids, cursors = {}, set(), {}
+    accommodation_id = sorted_data.get("Accommodation", [{}])[0].get("id") if sorted_data.get("Accommodation") else None
+    for day_info in template["itinerary"]:
+        day_schedule = []
+        for slot in day_info["place_plan"]:
+            cat, time = slot["category"], slot["time"]
+            if cat == "Accommodation":
+                if accommodation_id and accommodation_id in place_data:
+                    day_schedule.append(place_entry(place_data, accommodation_id, time, cat))
+                continue
+            pid = next_unused(cat, sorted_data.get(cat, []), cursors, used_ids, place_data)
+            if pid is not None:
+                used_ids.add(pid)
+                day_schedule.append(place_entry(place_data, pid, time, cat))
+        days[f"day{day_info['day']}"] = day_schedule
+    return days
+
+
+def build_personalized_schedule(template, place_data, preference_data):
+    """선호도 기반 일정 (예산 무관)"""
+    days, used_ids, cursors = {}, set(), {}
+    accs = preference_data.get("Accommodation")
+    accommodation_id = (accs[0].get("id") if isinstance(accs[0], dict) else accs[0]) if accs else None
+    for day_info in template["itinerary"]:
+        day_schedule = []
+        for slot in day_info["place_plan"]:
+            cat, time = slot["category"], slot["time"]
+            if cat == "Accommodation":
+                if accommodation_id and accommodation_id in place_data:
+                    day_schedule.append(place_entry(place_data, accommodation_id, time, cat))
+                continue
+            pid = next_unused(cat, preference_data.get(cat, []), cursors, used_ids, place_data)
+            if pid is not None:
+                used_ids.add(pid)
+                day_schedule.append(place_entry(place_data, pid, time, cat))
+        days[f"day{day_info['day']}"] = day_schedule
+    return days
+
+
+def build_hybrid_schedule(template, place_data, cluster_data, budget_per_day):
+    """Hybrid 일정 (예산 고려)"""
+    days, used_ids = {}, set()
+    accommodation_id = cluster_data.get("Accommodation")
+    clusters = cluster_data["clusters"]
+    for day_info in template["itinerary"]:
+        day_num = day_info["day"]
+        cluster = clusters[min(day_num - 1, len(clusters) - 1)]
+        day_schedule, day_budget = [], budget_per_day
+        for slot in day_info["place_plan"]:
+            cat, time = slot["category"], slot["time"]
+            if cat == "Accommodation":
+                if accommodation_id and accommodation_id in place_data:
+                    day_schedule.append(place_entry(place_data, accommodation_id, time, cat))
+                continue
+            for cand in cluster["categories"].get(cat, []):
+                pid = cand.get("id") if isinstance(cand, dict) else cand
+                if pid in used_ids or pid not in place_data:
+                    continue
+                info = place_data[pid]
+                if cat in ["Cafe", "Restaurant"]:
+                    price = food_price(info)
+                    if price > day_budget:
+                        continue
+                    day_budget -= price
+                used_ids.add(pid)
+                day_schedule.append(place_entry(place_data, pid, time, cat))
+                break
+        days[f"day{day_num}"] = day_schedule
+    return days
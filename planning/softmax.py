@@ -1,23 +1,31 @@
 import os
-import json
+import heapq
 import numpy as np
 import pandas as pd
-from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 
-import weaviate
-from weaviate.auth import AuthApiKey
-from weaviate.classes import query as wq
+from instrumentation import stage
 
+# Weaviate 클라이언트/장소 검색은 vector_store로 이동 (VECTOR_BACKEND로 로컬 인덱스 선택 가능)
+from vector_store import close_client, near_vector, query_categories
+from regions import normalize_region
+from catalog import load_review_counts, lookup_review_counts
+from artifacts import save_arrays, save_scores
+
+PLANNING_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # ========== CONFIG ==========
 CONFIG = {
-    "USER_INFO_DIR": r"planning\user_info",  # ✅ 디렉토리로 변경
-    "DATA_DIR": r"planning\data_set",
-    "OUTPUT_DIR": r"planning\softmax_result_test",
+    "USER_INFO_DIR": os.path.join(PLANNING_DIR, "user_info"),  # ✅ 디렉토리로 변경
+    "DATA_DIR": os.path.join(PLANNING_DIR, "data_set"),  # 기본 지역 (유저별로는 region_dir(region))
+    "OUTPUT_DIR": os.path.join(PLANNING_DIR, "softmax_result_test"),
+    "MODEL_NAME": "sentence-transformers/all-mpnet-base-v2",
+    "ENCODER_BACKEND": os.getenv("ENCODER_BACKEND", "torch"),  # "torch" | "onnx-int8"
     "TOP_K": 300,
-    "GAMMA": 0.3   # 리뷰수 가중치
+    "CANDIDATE_FACTOR": 2,    # 첫 검색 후보 수 = TOP_K × 2 (dislike 필터로 빠질 몫)
+    "MAX_CANDIDATES": 4000,   # 후보 확장 상한 (기존 limit)
+    "GAMMA": 0.3,  # 리뷰수 가중치
+    "BETA": 0.5,   # dislike 유사도 페널티
+    "DISLIKE_THRESHOLD": 0.75  # dislike 유사도가 이보다 크면 후보 제외
 }
 
 CATEGORY_FILES = {
@@ -34,111 +42,138 @@ CATEGORY_TRANSLATE = {
     "관광지": "Attraction"
 }
 
-
-# ========== 1. 환경 변수 및 클라이언트 연결 ==========
-print("[환경 변수] 로딩 중...")
-load_dotenv()
-
-api_key = os.getenv("WEAVIATE_API_KEY")
-cluster_url = os.getenv("WEAVIATE_CLUSTER_URL")
-
-client = weaviate.connect_to_weaviate_cloud(
-    cluster_url=cluster_url,
-    auth_credentials=AuthApiKey(api_key)
-)
-print("[OK] Weaviate 연결 완료\n")
-
-collection = client.collections.get("Place")
+# 무거운 의존성(weaviate, sentence-transformers)은 import 시점이 아니라
+# 팩토리 함수를 처음 호출할 때 초기화합니다.
+_model = None
 
 
 # ========== 2. 모델 로드 ==========
-model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
+def get_model():
+    """문장 임베딩 모델 (프로세스당 1회 로드, 백엔드는 CONFIG["ENCODER_BACKEND"])"""
+    global _model
+    if _model is None:
+        from encoders import load_encoder
+        _model = load_encoder(CONFIG["ENCODER_BACKEND"], CONFIG["MODEL_NAME"])
+    return _model
+
+
+def max_dislike_similarity(user_dislike_vecs, place_dislike_vec):
+    """유저 dislike 벡터들과 장소 dislike 임베딩의 최대 코사인 유사도 (없으면 0)"""
+    vecs = [ud for ud in user_dislike_vecs if len(ud) > 0]
+    if not vecs or len(place_dislike_vec) == 0:
+        return 0
+    user_mat = np.asarray(vecs, dtype=float)
+    place_vec = np.asarray(place_dislike_vec, dtype=float)
+    denom = np.linalg.norm(user_mat, axis=1) * np.linalg.norm(place_vec)
+    sims = np.divide(user_mat @ place_vec, denom, out=np.zeros(len(vecs)), where=denom > 0)
+    return float(sims.max())
 
 
 # ========== 3. 추천 함수 ==========
-def rerank_with_penalty(user_like_vec, user_dislike_vecs, category_name,
-                        top_k=30, alpha=1.0, beta=0.5, dislike_threshold=0.75):
-    results = collection.query.near_vector(
-        near_vector=user_like_vec.tolist(),
-        limit=4000,
-        return_metadata=["distance"],
-        include_vector=True,
-        filters=wq.Filter.by_property("category").equal(category_name)
-    )
-
-    scored = []
-    seen_place_ids = set()
-
-    for obj in results.objects:
-        pid = obj.properties.get("place_id")
-        if pid in seen_place_ids:
-            continue
-        seen_place_ids.add(pid)
-
-        like_sim = 1 - obj.metadata.distance
-        place_dislike_vec = obj.properties.get("dislike_embedding", [])
-        max_dislike_sim = 0
+def candidate_limit(top_k):
+    """top_k개를 뽑기 위한 첫 검색 후보 수"""
+    return min(CONFIG["MAX_CANDIDATES"], top_k * CONFIG["CANDIDATE_FACTOR"])
+
+
+def top_k_candidates(user_like_vec, category_name, top_k, score_fn, hits=None, region=None):
+    """
+    검색 결과를 순서대로(스트림) 점수화해 상위 top_k개 (hit, score) 반환.
+    score_fn(hit, like_sim) -> 점수 (제외하면 None), 점수는 like_sim 이하여야 합니다
+    (dislike 페널티는 음수 유사도를 0으로 잘라 빼야 함, 음수면 점수가 like_sim 을 넘어 조기 종료가 후보를 놓침).
+    가져온 후보 중 top_k번째 점수 >= 마지막 후보의 like_sim 이면 더 먼 후보는 순위에 들 수 없으므로 종료,
+    아니면 limit을 두 배로 늘려 다시 검색합니다 (MAX_CANDIDATES까지).
+    hits: 이미 candidate_limit(top_k)로 검색한 결과 (query_categories), region: 검색할 지역 샤드
+    """
+    limit = candidate_limit(top_k)
+    while True:
+        if hits is None:
+            hits = near_vector(user_like_vec, category_name, limit, region)
+
+        heap = []  # (score, -순서, hit) 최소 힙, 크기 top_k
+        seen_place_ids = set()
+        last_like_sim = None
+        for i, hit in enumerate(hits):
+            if hit.place_id in seen_place_ids:
+                continue
+            seen_place_ids.add(hit.place_id)
+            last_like_sim = 1 - hit.distance
+            score = score_fn(hit, last_like_sim)
+            if score is None:
+                continue
+            item = (score, -i, hit)
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        exhausted = len(hits) < limit or limit >= CONFIG["MAX_CANDIDATES"]
+        enough = len(heap) >= top_k and heap[0][0] >= last_like_sim
+        if exhausted or enough:
+            break
+        limit = min(CONFIG["MAX_CANDIDATES"], limit * 2)
+        hits = None
+
+    # 점수 내림차순, 동점은 검색 순서
+    return [(hit, score) for score, _, hit in sorted(heap, reverse=True)]
 
-        if place_dislike_vec:
-            sims = [
-                cosine_similarity([ud], [place_dislike_vec])[0][0]
-                for ud in user_dislike_vecs if len(ud) > 0
-            ]
-            max_dislike_sim = max(sims) if sims else 0
 
+def rerank_with_penalty(user_like_vec, user_dislike_vecs, category_name,
+                        top_k=30, alpha=1.0, beta=0.5, dislike_threshold=0.75, hits=None, region=None,
+                        candidates=None):
+    """
+    like 유사도 - dislike 페널티 상위 top_k. hits: 이미 검색한 결과 (query_categories)
+    candidates: dict를 주면 점수화한 후보마다 place_id → (like_sim, max_dislike_sim) 기록 (검색 순서, what-if용)
+    """
+    def score(hit, like_sim):
+        max_dislike_sim = max_dislike_similarity(user_dislike_vecs, hit.dislike_embedding)
+        if candidates is not None:
+            candidates.setdefault(hit.place_id, (like_sim, max_dislike_sim))
         if max_dislike_sim > dislike_threshold:
-            continue
+            return None
+        return max(0, alpha * like_sim - beta * max(0.0, max_dislike_sim))
 
-        sim_score = alpha * like_sim - beta * max_dislike_sim
-        sim_score = max(0, sim_score)
-        scored.append((obj, sim_score))
-
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return scored
+    return top_k_candidates(user_like_vec, category_name, top_k, score, hits, region)
 
 
 # ========== 4. 리뷰수 기반 정규화 + 최종 스코어 ==========
-def attach_review_scores_and_final(results_by_cat, data_dir, gamma=0.3):
+def attach_review_scores_and_final(results_by_cat, region=None, gamma=0.3):
+    """
+    카테고리별 (hit, sim_score) 목록 → [{"id", "final_score"}] (final_score 내림차순, 동점은 입력 순서)
+    리뷰 수는 지역 카탈로그에서 미리 정렬해 둔 id/리뷰 수 배열로 찾고,
+    log1p → softmax 정규화와 gamma 가중합을 배열 연산으로 계산합니다.
+    """
+    review_tables = load_review_counts(region)
     final_scores = {}
 
     for cat, scored_list in results_by_cat.items():
         if not scored_list:
             continue
 
-        df = pd.read_csv(os.path.join(data_dir, CATEGORY_FILES[cat]))
-        review_col = "review_count" if cat == "Accommodation" else "all_review_count"
-        review_dict = dict(zip(df["id"], df[review_col]))
-
-        enriched = []
-        for obj, sim_score in scored_list:
-            pid = obj.properties.get("place_id")
-            rc = review_dict.get(pid, 0)
-            if pd.isna(rc):
-                rc = 0
-            enriched.append((pid, sim_score, rc))
+        pids = [hit.place_id for hit, _ in scored_list]
+        sims = np.array([sim_score for _, sim_score in scored_list], dtype=float)
+        counts = lookup_review_counts(review_tables.get(CATEGORY_TRANSLATE[cat]), pids)
 
-        counts = np.array([rc for _, _, rc in enriched], dtype=float)
         if counts.sum() > 0:
             counts = np.log1p(counts)
             exp_counts = np.exp(counts - counts.max())
             review_norms = exp_counts / exp_counts.sum()
         else:
-            review_norms = np.ones(len(enriched)) / len(enriched)
+            review_norms = np.ones(len(pids)) / len(pids)
 
-        cat_list = []
-        for (pid, sim_score, _), rn in zip(enriched, review_norms):
-            final_score = (1 - gamma) * sim_score + gamma * rn
-            cat_list.append({
-                "id": pid,
-                "final_score": float(final_score)
-            })
-
-        cat_list = sorted(cat_list, key=lambda x: x["final_score"], reverse=True)
-        final_scores[CATEGORY_TRANSLATE[cat]] = cat_list
+        final = (1 - gamma) * sims + gamma * review_norms
+        order = np.argsort(-final, kind="stable")
+        final_scores[CATEGORY_TRANSLATE[cat]] = [
+            {"id": pids[i], "final_score": float(final[i])} for i in order
+        ]
 
     return final_scores
 
 
+def candidates_path(student_id):
+    """학번별 검색 후보 배열 파일 (id / like 유사도 / dislike 유사도, 카테고리별)"""
+    return os.path.join(CONFIG["OUTPUT_DIR"], f"{student_id}_candidates.npz")
+
+
 # ========== 5. 특정 유저 처리 ==========
 def process_student(target_student_id):
     """특정 student_id만 처리"""
@@ -157,28 +192,49 @@ def process_student(target_student_id):
     for idx, user in user_df.iterrows():
         user_id = user["user_id"]
         student_id = user["student_id"]
+        region = normalize_region(user.get("region"))  # 설문에서 고른 지역 샤드만 검색
         like_keywords = eval(user["like_keywords"])
         dislike_keywords = eval(user["dislike_keywords"])
 
-        print(f"\n[USER] Processing User -> {student_id}")
+        print(f"\n[USER] Processing User -> {student_id} ({region})")
         print("   [LIKE]", like_keywords)
         print("   [DISLIKE]", dislike_keywords)
 
-        user_like_vec = model.encode(" ".join(like_keywords), convert_to_numpy=True)
-        user_dislike_vecs = [model.encode(kw, convert_to_numpy=True) for kw in dislike_keywords]
+        with stage("encoding"):
+            model = get_model()
+            user_like_vec = model.encode(" ".join(like_keywords), convert_to_numpy=True)
+            user_dislike_vecs = [model.encode(kw, convert_to_numpy=True) for kw in dislike_keywords]
 
-        results_by_cat = {}
+        # 4개 카테고리 동시 검색 (지연시간 ≈ 가장 느린 카테고리 1개)
+        with stage("vector_query"):
+            hits_by_cat = query_categories(user_like_vec, CATEGORY_FILES.keys(),
+                                           limit=candidate_limit(CONFIG["TOP_K"]), region=region)
+        results_by_cat, candidates_by_cat = {}, {}
         for cat in CATEGORY_FILES.keys():
+            candidates_by_cat[cat] = {}
             results_by_cat[cat] = rerank_with_penalty(user_like_vec, user_dislike_vecs,
-                                                      cat, top_k=CONFIG["TOP_K"])
+                                                      cat, top_k=CONFIG["TOP_K"], beta=CONFIG["BETA"],
+                                                      dislike_threshold=CONFIG["DISLIKE_THRESHOLD"],
+                                                      hits=hits_by_cat[cat], region=region,
+                                                      candidates=candidates_by_cat[cat])
 
-        review_scores_by_cat = attach_review_scores_and_final(results_by_cat,
-                                                              CONFIG["DATA_DIR"],
+        review_scores_by_cat = attach_review_scores_and_final(results_by_cat, region,
                                                               gamma=CONFIG["GAMMA"])
 
-        out_path = os.path.join(CONFIG["OUTPUT_DIR"], f"{student_id}_recommendations_softmax.json")
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(review_scores_by_cat, f, ensure_ascii=False, indent=2)
+        # ARTIFACT_FORMAT=npz 이면 .npz (카테고리별 id/점수 배열)로 저장
+        out_path = save_scores(os.path.join(CONFIG["OUTPUT_DIR"], f"{student_id}_recommendations_softmax.json"),
+                               review_scores_by_cat, "final_score")
+
+        # 가중치 what-if(whatif.py)가 검색/임베딩 없이 점수를 다시 계산할 수 있도록 후보 배열도 저장
+        save_arrays(candidates_path(student_id), {
+            CATEGORY_TRANSLATE[cat]: {
+                "id": np.fromiter(cands.keys(), dtype=np.int64, count=len(cands)),
+                "like": np.array([like for like, _ in cands.values()], dtype=float),
+                "dislike": np.array([dislike for _, dislike in cands.values()], dtype=float)
+            }
+            for cat, cands in candidates_by_cat.items()
+        }, meta={"region": region, "top_k": CONFIG["TOP_K"], "gamma": CONFIG["GAMMA"], "beta": CONFIG["BETA"],
+                 "dislike_threshold": CONFIG["DISLIKE_THRESHOLD"]})
 
         print(f"[OK] {student_id} 결과 저장 완료 -> {out_path}")
     
@@ -204,7 +260,7 @@ if __name__ == "__main__":
                 success = False
     
     # 연결 종료
-    client.close()
+    close_client()
     print("\n[CLOSE] 처리 완료 & 연결 종료")
     
     sys.exit(0 if success else 1)
@@ -0,0 +1,422 @@
+"""
+장소 벡터 저장소 (Place 컬렉션)
+
+rerank_with_penalty / generate_preference_scores 가 사용하는 공통 인터페이스:
+    store.near_vector(vector, category, limit) -> [PlaceHit(place_id, distance, dislike_embedding), ...]
+distance는 Weaviate와 같은 코사인 거리(1 - cos), 가까운 순으로 정렬됩니다.
+
+query_categories(vector, categories, limit) 는 카테고리별 검색을 작은 스레드 풀에서 동시에 실행하고
+(지연시간 ≈ 가장 느린 카테고리 1개), 같은 벡터/카테고리/limit 결과를 최근 몇 건 재사용합니다
+(softmax 점수 계산과 run_pipeline 선호도 점수가 같은 like 벡터로 같은 검색을 하므로 두 번째는 네트워크 왕복 없음).
+
+백엔드 (환경 변수 VECTOR_BACKEND):
+- "weaviate" : Weaviate Cloud Place 컬렉션 (기본값)
+- "local"    : 로컬 IVF 인덱스 (LOCAL_INDEX_DIR, 기본 planning/vector_index)
+               Weaviate export 또는 카탈로그 CSV에서 빌드, .npy 파일을 mmap으로 읽음
+
+지역별 샤드 (regions.py): 저장소는 지역마다 따로 두고 처음 검색할 때 열며, 최근 REGION_CACHE_SIZE개 지역만 유지합니다.
+- weaviate : 기본 지역은 Place, 그 외는 Place_{region} 컬렉션
+- local    : LOCAL_INDEX_DIR/{region}/ (기본 지역은 하위 디렉토리가 없으면 LOCAL_INDEX_DIR 자체)
+
+로컬 인덱스 빌드:
+    python planning/vector_store.py build --source catalog  [--out DIR] [--region REGION]
+    python planning/vector_store.py build --source weaviate [--out DIR] [--region REGION]
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+try:
+    from .regions import DEFAULT_REGION, ShardCache, files_version, normalize_region, region_dir
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from regions import DEFAULT_REGION, ShardCache, files_version, normalize_region, region_dir
+
+PLANNING_DIR = Path(__file__).resolve().parent
+DEFAULT_INDEX_DIR = PLANNING_DIR / "vector_index"
+
+INDEX_FORMAT = "ivf-flat-v1"
+DEFAULT_N_PROBE = 8
+
+QUERY_WORKERS = int(os.getenv("VECTOR_QUERY_WORKERS", "4"))  # 카테고리 동시 검색 수
+HEALTH_CHECK_INTERVAL = 30  # 초, 이 간격보다 오래 쉬었으면 재사용 전에 is_ready() 확인
+RETURN_PROPERTIES = ["place_id", "dislike_embedding"]
+HIT_CACHE_SIZE = 16  # (지역, 카테고리, limit, 벡터) 최근 검색 결과 재사용 개수
+
+PlaceHit = namedtuple("PlaceHit", ["place_id", "distance", "dislike_embedding"])
+
+_client = None
+_client_checked_at = 0.0
+_client_lock = threading.Lock()
+_pool = None
+_hit_cache = OrderedDict()
+_hit_cache_lock = threading.Lock()
+
+
+# ========== Weaviate ==========
+def _connect():
+    import weaviate
+    from weaviate.auth import AuthApiKey
+
+    print("[환경 변수] 로딩 중...")
+    load_dotenv()
+    client = weaviate.connect_to_weaviate_cloud(
+        cluster_url=os.getenv("WEAVIATE_CLUSTER_URL"),
+        auth_credentials=AuthApiKey(os.getenv("WEAVIATE_API_KEY"))
+    )
+    print("[OK] Weaviate 연결 완료\n")
+    return client
+
+
+def _is_healthy(client):
+    try:
+        return client.is_ready()
+    except Exception:
+        return False
+
+
+def get_client(force_reconnect=False):
+    """
+    Weaviate 클라이언트 (프로세스당 1개를 계속 재사용, 스레드 간 공유).
+    HEALTH_CHECK_INTERVAL 이상 지나면 is_ready()로 확인하고 끊겼으면 다시 연결합니다.
+    """
+    global _client, _client_checked_at
+    with _client_lock:
+        now = time.monotonic()
+        if _client is not None and (force_reconnect or (
+                now - _client_checked_at > HEALTH_CHECK_INTERVAL and not _is_healthy(_client))):
+            print("[WARNING] Weaviate 연결 재설정")
+            try:
+                _client.close()
+            except Exception:
+                pass
+            _client = None
+        if _client is None:
+            _client = _connect()
+        _client_checked_at = now
+        return _client
+
+
+def collection_name(region=None):
+    """지역별 Place 컬렉션 이름 (기본 지역은 Place)"""
+    region = normalize_region(region)
+    return "Place" if region == DEFAULT_REGION else f"Place_{region}"
+
+
+def get_collection(region=None):
+    """지역 Place 컬렉션"""
+    return get_client().collections.get(collection_name(region))
+
+
+def close_client():
+    """연결 종료 + 검색 스레드 풀 정리 (연결한 적 없으면 아무것도 하지 않음)"""
+    global _client, _pool
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+        _pool = None
+    with _hit_cache_lock:
+        _hit_cache.clear()
+
+
+class WeaviatePlaceStore:
+    """Weaviate 지역 Place 컬렉션 검색 (연결 오류 시 1회 재연결 후 재시도)"""
+
+    def __init__(self, region=None):
+        self.collection = collection_name(region)
+
+    def near_vector(self, vector, category, limit):
+        try:
+            return self._query(get_client().collections.get(self.collection), vector, category, limit)
+        except Exception as e:
+            print(f"[WARNING] Weaviate 검색 실패 ({category}), 재연결 후 재시도: {e}")
+            return self._query(get_client(force_reconnect=True).collections.get(self.collection), vector, category, limit)
+
+    def _query(self, collection, vector, category, limit):
+        from weaviate.classes import query as wq
+
+        # 필요한 속성만 (장소 like 벡터와 나머지 속성은 클라이언트에서 쓰지 않음)
+        results = collection.query.near_vector(
+            near_vector=[float(x) for x in vector],
+            limit=limit,
+            return_metadata=["distance"],
+            return_properties=RETURN_PROPERTIES,
+            include_vector=False,
+            filters=wq.Filter.by_property("category").equal(category)
+        )
+        return [
+            PlaceHit(obj.properties.get("place_id"), obj.metadata.distance,
+                     obj.properties.get("dislike_embedding") or [])
+            for obj in results.objects
+        ]
+
+
+# ========== 로컬 IVF 인덱스 ==========
+def _normalize(mat):
+    mat = np.asarray(mat, dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=-1, keepdims=True)
+    return mat / np.clip(norms, 1e-12, None)
+
+
+def _spherical_kmeans(vecs, n_lists, n_iter=20, seed=0):
+    """정규화된 벡터의 k-means (코사인). 반환: (centroids, 각 벡터의 list 번호)"""
+    rng = np.random.default_rng(seed)
+    centroids = vecs[rng.choice(len(vecs), n_lists, replace=False)].copy()
+    assign = np.zeros(len(vecs), dtype=np.int64)
+    for _ in range(n_iter):
+        assign = np.argmax(vecs @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = vecs[assign == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        centroids = _normalize(centroids)
+    return centroids, np.argmax(vecs @ centroids.T, axis=1)
+
+
+def build_local_index(out_dir, place_ids, categories, vectors, dislike_vectors, n_lists=None):
+    """
+    IVF 인덱스 저장. 카테고리별로 k-means 리스트를 만들고 (카테고리, 리스트) 순으로
+    벡터를 연속 배치해 각 리스트가 .npy 안의 연속 구간이 되도록 합니다.
+    dislike_vectors: 장소별 벡터 또는 None(없음)
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    vectors = _normalize(vectors)
+    dim = vectors.shape[1]
+    place_ids = np.asarray(place_ids, dtype=np.int64)
+    categories = np.asarray(categories)
+    dislike = np.zeros((len(place_ids), dim), dtype=np.float32)
+    has_dislike = np.zeros(len(place_ids), dtype=bool)
+    for i, dv in enumerate(dislike_vectors):
+        if dv is not None and len(dv) > 0:
+            dislike[i] = dv
+            has_dislike[i] = True
+
+    order, centroids, meta_cats = [], [], {}
+    offset = 0
+    for cat in sorted(set(categories.tolist())):
+        idx = np.flatnonzero(categories == cat)
+        k = n_lists or max(1, int(np.sqrt(len(idx))))
+        k = min(k, len(idx))
+        cents, assign = _spherical_kmeans(vectors[idx], k)
+        lists, cat_start = [], offset
+        for c in range(k):
+            members = idx[assign == c]
+            lists.append([offset, offset + len(members)])
+            order.extend(members.tolist())
+            offset += len(members)
+        meta_cats[cat] = {
+            "start": cat_start, "end": offset,
+            "centroid_start": sum(len(v) for v in centroids), "lists": lists
+        }
+        centroids.append(cents)
+
+    order = np.asarray(order, dtype=np.int64)
+    np.save(out_dir / "vectors.npy", vectors[order])
+    np.save(out_dir / "dislike.npy", dislike[order])
+    np.save(out_dir / "has_dislike.npy", has_dislike[order])
+    np.save(out_dir / "place_ids.npy", place_ids[order])
+    np.save(out_dir / "centroids.npy", np.vstack(centroids).astype(np.float32))
+    with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"format": INDEX_FORMAT, "dim": dim, "count": int(len(order)),
+                   "categories": meta_cats}, f, ensure_ascii=False, indent=2)
+    print(f"[INDEX] {len(order)}개 장소, {len(meta_cats)}개 카테고리 저장 -> {out_dir}")
+    return out_dir
+
+
+class LocalPlaceStore:
+    """로컬 IVF 인덱스 검색 (카테고리 필터 + nprobe 리스트 탐색)"""
+
+    def __init__(self, index_dir=DEFAULT_INDEX_DIR, n_probe=DEFAULT_N_PROBE):
+        index_dir = Path(index_dir)
+        with open(index_dir / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"[ERROR] 지원하지 않는 인덱스 포맷: {self.meta.get('format')}")
+        self.n_probe = n_probe
+        self.vectors = np.load(index_dir / "vectors.npy", mmap_mode="r")
+        self.dislike = np.load(index_dir / "dislike.npy", mmap_mode="r")
+        self.has_dislike = np.load(index_dir / "has_dislike.npy", mmap_mode="r")
+        self.place_ids = np.load(index_dir / "place_ids.npy", mmap_mode="r")
+        self.centroids = np.load(index_dir / "centroids.npy", mmap_mode="r")
+
+    def _candidate_rows(self, query, cat_meta, limit):
+        start, end = cat_meta["start"], cat_meta["end"]
+        lists = cat_meta["lists"]
+        # 카테고리 전체를 돌려줘야 하거나 리스트가 적으면 전수 탐색
+        if limit >= end - start or len(lists) <= self.n_probe:
+            return np.arange(start, end)
+        c0 = cat_meta["centroid_start"]
+        cent_scores = np.asarray(self.centroids[c0:c0 + len(lists)]) @ query
+        probe = np.argsort(-cent_scores)[:self.n_probe]
+        rows = np.concatenate([np.arange(*lists[p]) for p in probe])
+        # nprobe 리스트로 limit을 못 채우면 다음 리스트까지 확장
+        for p in np.argsort(-cent_scores)[self.n_probe:]:
+            if len(rows) >= limit:
+                break
+            rows = np.concatenate([rows, np.arange(*lists[p])])
+        return rows
+
+    def near_vector(self, vector, category, limit):
+        cat_meta = self.meta["categories"].get(category)
+        if cat_meta is None:
+            return []
+        query = _normalize(vector)
+        rows = self._candidate_rows(query, cat_meta, limit)
+        sims = np.asarray(self.vectors[rows]) @ query
+        top = np.argsort(-sims, kind="stable")[:limit]
+        hits = []
+        for r, sim in zip(rows[top], sims[top]):
+            dislike = np.asarray(self.dislike[r]) if self.has_dislike[r] else []
+            hits.append(PlaceHit(int(self.place_ids[r]), float(1 - sim), dislike))
+        return hits
+
+
+# ========== 팩토리 ==========
+def local_index_dir(region=None):
+    """지역 로컬 인덱스 경로: LOCAL_INDEX_DIR/{region} (기본 지역은 하위 디렉토리가 없으면 LOCAL_INDEX_DIR)"""
+    region = normalize_region(region)
+    base = Path(os.getenv("LOCAL_INDEX_DIR", DEFAULT_INDEX_DIR))
+    shard = base / region
+    if region == DEFAULT_REGION and not (shard / "meta.json").exists():
+        return base
+    return shard
+
+
+def _store_version(region):
+    """로컬 인덱스는 meta.json이 바뀌면(재빌드) 다시 열고, Weaviate 저장소는 항상 재사용"""
+    if os.getenv("VECTOR_BACKEND", "weaviate") == "local":
+        return files_version([local_index_dir(region) / "meta.json"])
+    return ()
+
+
+def _open_store(region):
+    backend = os.getenv("VECTOR_BACKEND", "weaviate")
+    if backend == "weaviate":
+        return WeaviatePlaceStore(region)
+    if backend == "local":
+        return LocalPlaceStore(local_index_dir(region),
+                               n_probe=int(os.getenv("LOCAL_INDEX_NPROBE", DEFAULT_N_PROBE)))
+    raise ValueError(f"[ERROR] 알 수 없는 벡터 백엔드: {backend} (지원: weaviate, local)")
+
+
+_stores = ShardCache("vector", _open_store, _store_version)
+
+
+def get_place_store(region=None):
+    """VECTOR_BACKEND 설정에 맞는 지역 저장소 (지역당 1개, 최근 REGION_CACHE_SIZE개 지역 유지)"""
+    return _stores.get(region)
+
+
+# ========== 카테고리 동시 검색 ==========
+def _get_pool():
+    global _pool
+    with _client_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="vector-query")
+        return _pool
+
+
+def near_vector(vector, category, limit, region=None):
+    """get_place_store(region).near_vector + 최근 결과 재사용 (같은 지역/벡터/카테고리/limit)"""
+    region = normalize_region(region)
+    vec = np.asarray(vector, dtype=np.float32)
+    key = (region, category, limit, vec.tobytes())
+    with _hit_cache_lock:
+        hits = _hit_cache.get(key)
+        if hits is not None:
+            _hit_cache.move_to_end(key)
+            return hits
+    hits = get_place_store(region).near_vector(vec, category, limit)
+    with _hit_cache_lock:
+        _hit_cache[key] = hits
+        while len(_hit_cache) > HIT_CACHE_SIZE:
+            _hit_cache.popitem(last=False)
+    return hits
+
+
+def query_categories(vector, categories, limit, region=None):
+    """지역 안에서 카테고리별 검색을 스레드 풀에서 동시에 실행. {category: [PlaceHit, ...]} 반환"""
+    categories = list(categories)
+    get_place_store(region)  # 저장소 초기화는 호출 스레드에서 1회
+    pool = _get_pool()
+    futures = [pool.submit(near_vector, vector, cat, limit, region) for cat in categories]
+    return {cat: f.result() for cat, f in zip(categories, futures)}
+
+
+# ========== 인덱스 빌드 소스 ==========
+def export_from_weaviate(region=None):
+    """Weaviate 지역 Place 컬렉션 전체 → (place_ids, categories, vectors, dislike_vectors)"""
+    place_ids, categories, vectors, dislikes = [], [], [], []
+    for obj in get_collection(region).iterator(include_vector=True):
+        vec = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+        place_ids.append(obj.properties.get("place_id"))
+        categories.append(obj.properties.get("category"))
+        vectors.append(vec)
+        dislikes.append(obj.properties.get("dislike_embedding") or None)
+    return place_ids, categories, np.asarray(vectors, dtype=np.float32), dislikes
+
+
+def place_like_text(row):
+    """카탈로그 행의 like 임베딩용 텍스트 (like 키워드 + 설명)"""
+    parts = [row.get("like"), row.get("description")]
+    parts = [p for p in parts if isinstance(p, str) and p]
+    return ". ".join(parts) or str(row["name"])
+
+
+def export_from_catalog(encoder, region=None):
+    """지역 카탈로그 CSV → (place_ids, categories, vectors, dislike_vectors). category는 CSV 값(한글) 그대로"""
+    import pandas as pd
+    from catalog import SCHEDULE_FILES
+
+    place_ids, categories, like_texts, dislike_texts = [], [], [], []
+    for filename in SCHEDULE_FILES.values():
+        df = pd.read_csv(region_dir(region) / filename)
+        for row in df.to_dict("records"):
+            place_ids.append(row["id"])
+            categories.append(row["category"])
+            like_texts.append(place_like_text(row))
+            dislike = row.get("dislike")
+            dislike_texts.append(dislike if isinstance(dislike, str) and dislike else None)
+
+    vectors = np.asarray(encoder.encode(like_texts, convert_to_numpy=True), dtype=np.float32)
+    has = [i for i, t in enumerate(dislike_texts) if t]
+    encoded = encoder.encode([dislike_texts[i] for i in has], convert_to_numpy=True) if has else []
+    dislikes = [None] * len(place_ids)
+    for i, vec in zip(has, encoded):
+        dislikes[i] = vec
+    return place_ids, categories, vectors, dislikes
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    sys.path.insert(0, str(PLANNING_DIR))
+
+    parser = argparse.ArgumentParser(description="로컬 Place 벡터 인덱스 빌드")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--source", choices=["catalog", "weaviate"], default="catalog")
+    build.add_argument("--out", default=None, help="인덱스 경로 (기본 local_index_dir(region))")
+    build.add_argument("--region", default=None, help="지역 샤드 (기본 gangneung)")
+    build.add_argument("--n-lists", type=int, default=None, help="카테고리별 IVF 리스트 수 (기본 sqrt(N))")
+    args = parser.parse_args()
+
+    if args.source == "weaviate":
+        data = export_from_weaviate(args.region)
+        close_client()
+    else:
+        from softmax import get_model
+        data = export_from_catalog(get_model(), args.region)
+    build_local_index(args.out or local_index_dir(args.region), *data, n_lists=args.n_lists)
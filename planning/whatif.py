@@ -0,0 +1,199 @@
+"""
+점수 가중치 what-if (파이프라인을 다시 돌리지 않고 가중치만 바꿔 hybrid 플랜 미리보기)
+
+가중치는 모듈 CONFIG 상수라 바꾸려면 전체 파이프라인을 다시 돌려야 했습니다.
+softmax.py 가 학번별로 남기는 검색 후보 배열({student_id}_candidates.npz: 카테고리별 id / like 유사도 /
+dislike 유사도, 검색 순서)로 점수 계산 이후 단계만 다시 실행합니다.
+- beta (dislike 페널티), gamma (리뷰수 가중치) : 후보 배열 → 점수 (softmax.py와 같은 계산) → top_k
+- preference_weight, distance_weight           : 클러스터링 (숙소 점수는 preference_weight / 1 - preference_weight)
+번역 / 임베딩 / 벡터 검색이 없으므로 유저당 수십 ms 안에 끝납니다 (benchmarks/bench_whatif.py).
+결과는 저장하지 않습니다 (플랜 파일 / 중간 결과 그대로).
+
+후보는 파이프라인 때 가져온 만큼만 있으므로 beta를 크게 낮추는 등 순위가 크게 바뀌면
+그 밖의 장소는 고려되지 않습니다 (파이프라인을 새 가중치로 돌린 결과와 다를 수 있음).
+후보 파일이 없는 예전 결과는 점수 가중치(beta, gamma) 없이 클러스터링 가중치만 바꿀 수 있습니다.
+"""
+import time
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from .alternatives import new_fraction, plan_place_ids
+    from .artifacts import CategoryScores, find_artifact, load_arrays, load_scores
+    from .catalog import load_place_catalog, load_review_counts, lookup_review_counts
+    from .clustering import (CONFIG as CLUSTERING_CONFIG, accommodation_index, build_spatial_indices,
+                             extract_all_user_places, greedy_clustering_optimized, place_locations,
+                             select_best_accommodation)
+    from .replan import PLANNING_DIR, ReplanUnavailable, _load_json, artifact_paths
+    from .schedule_builder import build_hybrid_schedule, food_budget
+except ImportError:  # planning/ 을 sys.path에 두고 스크립트로 실행하는 경우
+    from alternatives import new_fraction, plan_place_ids
+    from artifacts import CategoryScores, find_artifact, load_arrays, load_scores
+    from catalog import load_place_catalog, load_review_counts, lookup_review_counts
+    from clustering import (CONFIG as CLUSTERING_CONFIG, accommodation_index, build_spatial_indices,
+                            extract_all_user_places, greedy_clustering_optimized, place_locations,
+                            select_best_accommodation)
+    from replan import PLANNING_DIR, ReplanUnavailable, _load_json, artifact_paths
+    from schedule_builder import build_hybrid_schedule, food_budget
+
+CANDIDATES_DIR = PLANNING_DIR / "softmax_result_test"
+
+# 바꿀 수 있는 가중치 → 허용 범위
+WEIGHT_RANGES = {
+    "preference_weight": (0.0, 1.0),
+    "distance_weight": (0.0, 1.0),
+    "gamma": (0.0, 1.0),
+    "beta": (0.0, 2.0),
+}
+SCORING_WEIGHTS = ("gamma", "beta")  # 후보 배열이 필요한 가중치
+
+
+def candidates_path(student_id):
+    """softmax.py 가 저장한 학번별 검색 후보 배열 (softmax.candidates_path 와 같은 위치)"""
+    return CANDIDATES_DIR / f"{student_id}_candidates.npz"
+
+
+def validate_weights(weights):
+    """None 값 제외 + 범위 확인 (벗어나면 ValueError)"""
+    clean = {}
+    for name, value in (weights or {}).items():
+        if value is None:
+            continue
+        if name not in WEIGHT_RANGES:
+            raise ValueError(f"바꿀 수 없는 가중치입니다: {name}")
+        low, high = WEIGHT_RANGES[name]
+        value = float(value)
+        if not low <= value <= high:
+            raise ValueError(f"{name}는 {low}~{high} 사이여야 합니다.")
+        clean[name] = value
+    return clean
+
+
+@lru_cache(maxsize=64)
+def _cached_candidates(path, mtime_ns, size):
+    return load_arrays(path)
+
+
+def load_candidates(student_id):
+    """후보 배열 ({카테고리: {"id", "like", "dislike"}}, meta). 파일이 바뀌면 다시 읽음 (없으면 None)"""
+    path = candidates_path(student_id)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return _cached_candidates(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def score_candidates(candidates, region=None, gamma=0.3, beta=0.5, dislike_threshold=0.75, top_k=300):
+    """
+    후보 배열 → {카테고리: CategoryScores("final_score")} (softmax.rerank_with_penalty + attach_review_scores_and_final)
+    sim = max(0, like - beta × max(0, dislike)), dislike > dislike_threshold 후보 제외, sim 상위 top_k (동점은 검색 순서)
+    final = (1 - gamma) × sim + gamma × softmax(log1p(리뷰 수)), final 내림차순 (동점은 sim 순서)
+    """
+    review_tables = load_review_counts(region)
+    scores = {}
+    for cat, arrays in candidates.items():
+        ids, like, dislike = arrays["id"], arrays["like"], arrays["dislike"]
+        keep = ~(dislike > dislike_threshold)
+        ids = ids[keep]
+        sims = np.maximum(0, like[keep] - beta * np.maximum(0.0, dislike[keep]))
+        top = np.argsort(-sims, kind="stable")[:top_k]
+        if len(top) == 0:
+            continue
+        ids, sims = ids[top], sims[top]
+
+        counts = lookup_review_counts(review_tables.get(cat), ids)
+        if counts.sum() > 0:
+            counts = np.log1p(counts)
+            exp_counts = np.exp(counts - counts.max())
+            review_norms = exp_counts / exp_counts.sum()
+        else:
+            review_norms = np.ones(len(ids)) / len(ids)
+
+        final = (1 - gamma) * sims + gamma * review_norms
+        order = np.argsort(-final, kind="stable")
+        scores[cat] = CategoryScores(ids[order], final[order], "final_score")
+    return scores
+
+
+def default_weights(meta=None):
+    """현재 파이프라인 가중치 (후보 meta가 있으면 점수 계산 때 쓴 gamma / beta)"""
+    meta = meta or {}
+    return {
+        "preference_weight": CLUSTERING_CONFIG["PREFERENCE_WEIGHT"],
+        "distance_weight": CLUSTERING_CONFIG["DISTANCE_WEIGHT"],
+        "gamma": meta.get("gamma", 0.3),
+        "beta": meta.get("beta", 0.5),
+    }
+
+
+def what_if(student_id, weights=None):
+    """
+    가중치를 바꾼 hybrid 플랜 (저장하지 않음)
+    weights: {"preference_weight", "distance_weight", "gamma", "beta"} 중 바꿀 것만 (없는 값은 현재 가중치)
+    중간 결과(유저 템플릿 / 클러스터 / 점수 또는 후보 배열)가 없으면 ReplanUnavailable.
+    반환: {"weights", "days", "Accommodation", "accommodation_score", "changed_fraction", "elapsed_ms"}
+    """
+    t = time.perf_counter()
+    overrides = validate_weights(weights)
+    paths = artifact_paths(student_id)
+    missing = [name for name in ("template", "clusters") if not paths[name].exists()]
+    candidates = load_candidates(student_id)
+    if candidates is None and (set(overrides) & set(SCORING_WEIGHTS) or not find_artifact(paths["scores"])):
+        missing.append("candidates")
+    if missing:
+        raise ReplanUnavailable(f"{student_id}: 중간 결과 없음 ({', '.join(missing)})")
+
+    template = _load_json(paths["template"])
+    cluster_data = _load_json(paths["clusters"])
+    region = cluster_data.get("region")
+    budget = cluster_data["budget"]
+    duration_days = int(cluster_data.get("duration_days") or len(template["itinerary"]))
+    data, meta = candidates if candidates is not None else (None, {})
+    used = dict(default_weights(meta), **overrides)
+
+    if data is not None:
+        scores = score_candidates(data, region, gamma=used["gamma"], beta=used["beta"],
+                                  dislike_threshold=meta.get("dislike_threshold", 0.75),
+                                  top_k=meta.get("top_k", 300))
+    else:
+        scores = load_scores(paths["scores"])  # 점수 가중치는 그대로
+
+    locations = place_locations(region)
+    df = extract_all_user_places(scores, locations)
+    if df.empty:
+        raise ReplanUnavailable(f"{student_id}: 위치가 있는 추천 장소 없음")
+    clusters = greedy_clustering_optimized(df, build_spatial_indices(df), duration_days, budget, weights=used)
+    accommodation_id, accommodation_score = select_best_accommodation(
+        scores, clusters, locations, budget, duration_days, index=accommodation_index(region), weights=used
+    )
+
+    place_data = load_place_catalog(region)
+    food = food_budget(template["budget_per_day"])
+    days = build_hybrid_schedule(template, place_data, {"clusters": clusters, "Accommodation": accommodation_id}, food)
+    baseline = build_hybrid_schedule(template, place_data, cluster_data, food)
+    return {
+        "weights": used,
+        "days": days,
+        "Accommodation": accommodation_id,
+        "accommodation_score": accommodation_score,
+        "changed_fraction": round(new_fraction(days, plan_place_ids(baseline)), 4),
+        "elapsed_ms": round((time.perf_counter() - t) * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="가중치를 바꾼 hybrid 플랜 미리보기 (저장하지 않음)")
+    parser.add_argument("student_id")
+    for name in WEIGHT_RANGES:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, dest=name)
+    args = parser.parse_args()
+
+    result = what_if(args.student_id, {name: getattr(args, name) for name in WEIGHT_RANGES})
+    print(f"[WEIGHTS] {result['weights']}")
+    for day, places in result["days"].items():
+        print(f"[{day}] " + ", ".join(p["name"] for p in places))
+    print(f"[OK] 기존 hybrid 대비 바뀐 장소 비율 {result['changed_fraction']} ({result['elapsed_ms']}ms)")
@@ -1,53 +1,65 @@
 # routers/plans.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from pathlib import Path
-import csv
+from typing import Optional
 import json
 
+from planning.catalog import catalog_version
+from planning.plan_store import load_plan
+from services.file_lock import file_lock
+from services.user_index import user_index
+from services.plan_cache import plan_cache, etag_matches
+
 router = APIRouter()
 
 BASE_DIR = Path(__file__).resolve().parents[1]  # project_root
 DATA_DIR = BASE_DIR / "data"
 PLANS_DIR = DATA_DIR / "plans"
 USERS_CSV = DATA_DIR / "users.csv"
+EDIT_LOCK_DIR = DATA_DIR / "jobs" / "locks"  # survey 재계획과 같은 학번별 잠금 (편집 / 재계획 직렬화, 워커 간 공용)
+
+# user_id → 플랜 파일의 지역 (캐시 키에 그 지역 카탈로그 버전만 넣기 위해, 플랜을 읽을 때 갱신)
+_plan_regions = {}
 
 
 class StudentRequest(BaseModel):
     student_id: str
 
 
-@router.post("/by-student")
-def get_plans_by_student(payload: StudentRequest):
-    student_id = payload.student_id.strip()
-
-    if not student_id:
-        raise HTTPException(status_code=400, detail="학번이 비어 있습니다.")
+class WhatIfRequest(BaseModel):
+    student_id: str
+    # 바꿀 가중치만 (없으면 현재 파이프라인 값)
+    preference_weight: Optional[float] = None
+    distance_weight: Optional[float] = None
+    gamma: Optional[float] = None
+    beta: Optional[float] = None
 
-    if not USERS_CSV.exists():
-        raise HTTPException(status_code=404, detail="등록된 사용자가 없습니다. (users.csv 없음)")
 
-    matched_user_id = None
-    matched_name = None
+class SlotAlternativesRequest(BaseModel):
+    student_id: str
+    plan: str = "hybrid"  # plans 키 (hybrid, popularity, personalized, hybrid_2, ...)
+    day: str              # "day1"
+    slot: int             # 그날 일정에서 0부터 센 순서
+    limit: int = 5
 
-    with open(USERS_CSV, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get("student_id") == student_id:
-                matched_user_id = row.get("user_id")
-                matched_name = row.get("name")
-                break
 
-    if not matched_user_id:
-        raise HTTPException(status_code=404, detail="해당 학번의 사용자를 찾을 수 없습니다.")
+class PlanEditRequest(BaseModel):
+    student_id: str
+    plan: str = "hybrid"
+    day: str                                # "day1"
+    slot: int                               # 그날 일정에서 0부터 센 순서
+    op: str                                 # pin / unpin / remove / swap
+    place_id: Optional[int] = None          # swap 할 장소
+    expected_version: Optional[int] = None  # 조회한 플랜 version (다르면 409)
 
-    plan_path = PLANS_DIR / f"{matched_user_id}.json"
-    if not plan_path.exists():
-        raise HTTPException(status_code=404, detail="해당 사용자의 플랜 파일이 존재하지 않습니다.")
 
+def _build_plan_body(plan_path, user_id, name, student_id):
+    """플랜 파일을 읽어 응답 JSON 바이트와 플랜 지역 반환 (캐시 미스일 때만 호출)"""
     try:
-        with open(plan_path, "r", encoding="utf-8") as f:
-            raw = json.load(f)
+        # compact 포맷이면 카탈로그에서 장소 정보를 채워 복원
+        raw = load_plan(plan_path)
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="플랜 JSON 파일이 손상되었습니다.")
 
@@ -62,10 +74,194 @@ def get_plans_by_student(payload: StudentRequest):
         plan_order = ["popularity", "personalized", "hybrid"]
 
     # 응답에는 내부 타입명 그대로, UI에서만 플랜1/2/3으로 숨김
-    return {
-        "user_id": matched_user_id,
-        "name": matched_name,
+    body = {
+        "user_id": user_id,
+        "name": name,
         "student_id": student_id,
         "plan_order": plan_order,
+        "version": raw.get("version", 0),  # 편집 요청의 expected_version
         "plans": plans
     }
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), raw.get("region")
+
+
+async def _plan_response(student_id, request):
+    student_id = student_id.strip()
+
+    if not student_id:
+        raise HTTPException(status_code=400, detail="학번이 비어 있습니다.")
+
+    await user_index.arefresh()
+    if not user_index.exists():
+        raise HTTPException(status_code=404, detail="등록된 사용자가 없습니다. (users.csv 없음)")
+
+    user = user_index.get(student_id)
+    matched_user_id = user.get("user_id") if user else None
+    if not matched_user_id:
+        raise HTTPException(status_code=404, detail="해당 학번의 사용자를 찾을 수 없습니다.")
+    matched_name = user.get("name")
+
+    plan_path = PLANS_DIR / f"{matched_user_id}.json"
+    try:
+        # 플랜 파일 + users.csv + 플랜 지역 카탈로그 CSV 중 하나라도 바뀌면 캐시 무효화
+        # (지역은 플랜 파일에 기록 → 플랜 파일이 바뀌면 어차피 미스이므로 마지막으로 읽은 지역을 사용)
+        region = _plan_regions.get(matched_user_id)
+        cached, version = plan_cache.lookup(
+            matched_user_id, plan_path, (user_index.version, catalog_version(region))
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="해당 사용자의 플랜 파일이 존재하지 않습니다.")
+
+    if cached is None:
+        # 캐시 미스일 때만 파일 읽기/직렬화 (이벤트 루프 밖에서)
+        body, plan_region = await run_in_threadpool(_build_plan_body, plan_path, matched_user_id, matched_name, student_id)
+        if plan_region != region:
+            _plan_regions[matched_user_id] = plan_region
+            version = version[:-1] + ((user_index.version, catalog_version(plan_region)),)
+        cached = plan_cache.store(matched_user_id, version, body)
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+@router.post("/by-student")
+async def get_plans_by_student(payload: StudentRequest, request: Request):
+    return await _plan_response(payload.student_id, request)
+
+
+@router.get("/by-student/{student_id}")
+async def get_plans_by_student_path(student_id: str, request: Request):
+    """GET 버전: 브라우저 HTTP 캐시가 ETag 재검증을 자동으로 처리"""
+    return await _plan_response(student_id, request)
+
+
+def _what_if(student_id, weights):
+    # clustering/pandas 는 첫 what-if 요청 때 로드 (라우터 import 시에는 로드하지 않음)
+    from planning.replan import ReplanUnavailable
+    from planning.whatif import what_if
+
+    try:
+        return what_if(student_id, weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ReplanUnavailable as e:
+        raise HTTPException(status_code=404, detail=f"저장된 중간 결과가 없습니다. ({e})")
+
+
+@router.post("/what-if")
+async def what_if_plan(payload: WhatIfRequest):
+    """
+    점수 가중치를 바꾼 hybrid 플랜 미리보기 (저장된 검색 후보로 다시 계산, 플랜 파일은 바꾸지 않음)
+    분석용: 가중치를 바꿔 가며 같은 유저의 플랜이 어떻게 달라지는지 바로 확인
+    """
+    student_id = payload.student_id.strip()
+    if not student_id:
+        raise HTTPException(status_code=400, detail="학번이 비어 있습니다.")
+
+    await user_index.arefresh()
+    user = user_index.get(student_id)
+    if not user or not user.get("user_id"):
+        raise HTTPException(status_code=404, detail="해당 학번의 사용자를 찾을 수 없습니다.")
+
+    weights = {name: getattr(payload, name) for name in ("preference_weight", "distance_weight", "gamma", "beta")}
+    result = await run_in_threadpool(_what_if, student_id, weights)
+
+    return {
+        "student_id": student_id,
+        "weights": result["weights"],
+        "plan": {"label": "인기도 + 개인화 (what-if)", "days": result["days"]},
+        "accommodation": result["Accommodation"],
+        "changed_fraction": result["changed_fraction"],
+        "elapsed_ms": result["elapsed_ms"]
+    }
+
+
+def _slot_alternatives(student_id, plan_path, plan_key, day, slot, limit):
+    # 이웃 목록 / BallTree 는 첫 요청 때 로드 (라우터 import 시에는 로드하지 않음)
+    from planning.neighbours import SlotNotFound, slot_alternatives
+    from planning.replan import artifact_paths
+
+    try:
+        raw = load_plan(plan_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="해당 사용자의 플랜 파일이 존재하지 않습니다.")
+    plan = raw.get("plans", {}).get(plan_key)
+    if plan is None:
+        raise HTTPException(status_code=404, detail=f"플랜이 없습니다: {plan_key}")
+
+    # 1일 예산은 유저 템플릿 기준 (없으면 예산 확인 없이)
+    budget_per_day = None
+    template_path = artifact_paths(student_id)["template"]
+    if template_path.exists():
+        with open(template_path, "r", encoding="utf-8") as f:
+            budget_per_day = json.load(f).get("budget_per_day") or None
+
+    try:
+        alternatives = slot_alternatives(plan["days"], day, slot, raw.get("region"), budget_per_day, limit)
+    except SlotNotFound as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="대체 장소 이웃 목록이 없습니다. (planning/neighbours.py build)")
+    return {"current": plan["days"][day][slot], "alternatives": alternatives}
+
+
+@router.post("/slot-alternatives")
+async def get_slot_alternatives(payload: SlotAlternativesRequest):
+    """
+    플랜의 한 슬롯을 대신할 같은 카테고리 장소 (임베딩 유사도 + 앞뒤 장소와의 거리 + 남은 예산)
+    플랜은 바꾸지 않고 후보만 반환합니다.
+    """
+    student_id = payload.student_id.strip()
+    if not student_id:
+        raise HTTPException(status_code=400, detail="학번이 비어 있습니다.")
+
+    await user_index.arefresh()
+    user = user_index.get(student_id)
+    user_id = user.get("user_id") if user else None
+    if not user_id:
+        raise HTTPException(status_code=404, detail="해당 학번의 사용자를 찾을 수 없습니다.")
+
+    result = await run_in_threadpool(_slot_alternatives, student_id, PLANS_DIR / f"{user_id}.json",
+                                     payload.plan, payload.day, payload.slot, payload.limit)
+    return {"student_id": student_id, "plan": payload.plan, "day": payload.day, "slot": payload.slot, **result}
+
+
+def _edit_plan(student_id, plan_path, plan_key, day, slot, op, place_id, expected_version):
+    # clustering/numpy 는 첫 편집 요청 때 로드 (라우터 import 시에는 로드하지 않음)
+    from planning.plan_edit import edit_plan
+    from planning.plan_store import PlanVersionConflict
+
+    try:
+        with file_lock(EDIT_LOCK_DIR / f"{student_id}.lock"):
+            return edit_plan(student_id, plan_path, plan_key, day, slot, op, place_id, expected_version)
+    except PlanVersionConflict as e:
+        raise HTTPException(status_code=409, detail=f"{e} 플랜을 다시 조회해 주세요.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="해당 사용자의 플랜 파일이 존재하지 않습니다.")
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"플랜이 없습니다: {plan_key}")
+
+
+@router.post("/edit")
+async def edit_plan_slot(payload: PlanEditRequest):
+    """
+    저장된 플랜 한 슬롯 편집 (고정 / 삭제 / 교체) → 그 day의 예산 / 빈 슬롯 / 동선만 다시 계산해 저장
+    파이프라인은 다시 돌리지 않습니다. 저장할 때마다 플랜 version 이 1 오릅니다.
+    """
+    student_id = payload.student_id.strip()
+    if not student_id:
+        raise HTTPException(status_code=400, detail="학번이 비어 있습니다.")
+
+    await user_index.arefresh()
+    user = user_index.get(student_id)
+    user_id = user.get("user_id") if user else None
+    if not user_id:
+        raise HTTPException(status_code=404, detail="해당 학번의 사용자를 찾을 수 없습니다.")
+
+    result = await run_in_threadpool(_edit_plan, student_id, PLANS_DIR / f"{user_id}.json", payload.plan,
+                                     payload.day, payload.slot, payload.op, payload.place_id, payload.expected_version)
+    return {"student_id": student_id, "plan": payload.plan, **result}
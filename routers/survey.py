@@ -1,14 +1,20 @@
 # routers/survey.py
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from pathlib import Path
+from starlette.concurrency import run_in_threadpool
 import json
 import csv
-import os
-import sys
-import subprocess
+import random
+import re
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+from services.user_index import user_index
+from services.jobs import IN_FLIGHT, LOCKS_DIR, in_flight_job, pipeline_jobs
+from services.file_lock import file_lock
+from planning.plan_store import write_json_atomic
+from planning.regions import UnknownRegion, available_regions, validate_region
 
 router = APIRouter()
 
@@ -19,10 +25,25 @@ PLANS_DIR = DATA_DIR / "plans"
 USERS_CSV = DATA_DIR / "users.csv"
 PLANNING_DIR = BASE_DIR / "planning"
 INPUT_JSON = PLANNING_DIR / "input.json"
+SURVEY_INPUT_DIR = PLANNING_DIR / "survey_inputs"  # 학번별 입력 (동시 제출 시 input.json 덮어쓰기 방지)
 
 DATA_DIR.mkdir(exist_ok=True)
 PLANS_DIR.mkdir(exist_ok=True)
 PLANNING_DIR.mkdir(exist_ok=True)
+SURVEY_INPUT_DIR.mkdir(exist_ok=True)
+
+# user_id 발급 ~ users.csv 기록 구간 직렬화 (워커 프로세스 간 공용 파일 잠금)
+USERS_LOCK = DATA_DIR / "users.csv.lock"
+
+# 학번은 파일 이름에 쓰이므로 영문/숫자/-/_ 만 허용
+STUDENT_ID_PATTERN = re.compile(r"^[0-9A-Za-z_-]{1,32}$")
+
+# 재계획 요청에서 바꿀 수 있는 설문 항목 (이름/학번 제외)
+REPLAN_FIELDS = {
+    "rank_category", "keyword_history", "keyword_nature", "keyword_food",
+    "keyword_activity", "keyword_accomodation", "budget", "duration_days", "region"
+}
+REPLAN_LOCK_DIR = LOCKS_DIR  # 같은 학번 재계획 / 작업 등록 직렬화 (워커 간 공용)
 
 
 # 구글폼 응답 형식에 맞춘 Pydantic 모델
@@ -36,6 +57,8 @@ class SurveyResponse(BaseModel):
     keyword_activity: str
     keyword_accomodation: str
     budget: str
+    duration_days: Optional[str] = None  # 여행 일수 (1~14, 없으면 2일)
+    region: Optional[str] = None  # 여행 지역 (GET /survey/regions, 없으면 gangneung)
 
 
 class SurveyInput(BaseModel):
@@ -44,110 +67,94 @@ class SurveyInput(BaseModel):
     formUrl: Optional[str] = None
 
 
-def run_pipeline_for_student(student_id: str):
-    """
-    백그라운드에서 파이프라인 실행 (특정 학번만 처리)
-    """
-    try:
-        print(f"\n[PIPELINE START] {student_id} - Plan generation started")
-        
-        # Python 실행 파일 경로
-        python_exe = sys.executable
-        
-        # process_single_student.py 실행 (student_id 전달)
-        result = subprocess.run(
-            [python_exe, str(PLANNING_DIR / "process_single_student.py"), student_id],
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',  # 인코딩 오류 무시
-            timeout=300  # 5분 타임아웃
-        )
-        
-        if result.returncode == 0:
-            print(f"[PIPELINE SUCCESS] {student_id} - Plan generated successfully")
-            # 출력은 영어로만 (인코딩 문제 방지)
-        else:
-            print(f"[PIPELINE ERROR] {student_id} - Failed with return code {result.returncode}")
-            # stderr 출력 시 인코딩 안전하게 처리
-            if result.stderr:
-                try:
-                    error_msg = result.stderr[-500:] if len(result.stderr) > 500 else result.stderr
-                    # ASCII 범위 외 문자 제거
-                    error_msg = error_msg.encode('ascii', errors='ignore').decode('ascii')
-                    print(f"STDERR: {error_msg}")
-                except:
-                    print("STDERR: (encoding error, message omitted)")
-            
-    except subprocess.TimeoutExpired:
-        print(f"[PIPELINE TIMEOUT] {student_id} - Exceeded 5 minutes")
-    except Exception as e:
-        print(f"[PIPELINE ERROR] {student_id} - Exception: {str(e)}")
-        # traceback 출력 시 인코딩 오류 방지
-        try:
-            import traceback
-            import io
-            buf = io.StringIO()
-            traceback.print_exc(file=buf)
-            tb = buf.getvalue()
-            # ASCII만 출력
-            tb_safe = tb.encode('ascii', errors='ignore').decode('ascii')
-            print(tb_safe)
-        except:
-            print("(traceback omitted due to encoding error)")
+class ReplanRequest(BaseModel):
+    student_id: str
+    changes: Dict[str, Any]  # 바뀐 설문 항목만, 예: {"budget": "300000"}
 
 
 def generate_user_id():
     """
     user_id 생성: u + 3자리 숫자 (u001, u002, ...)
     """
-    if not USERS_CSV.exists():
+    existing_ids = user_index.user_ids()
+    if not existing_ids:
         return "u001"
-    
-    with open(USERS_CSV, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        existing_ids = [row["user_id"] for row in reader]
-    
+
     # 마지막 번호 찾기
     max_num = 0
     for uid in existing_ids:
         if uid.startswith("u") and uid[1:].isdigit():
             max_num = max(max_num, int(uid[1:]))
-    
+
     return f"u{max_num + 1:03d}"
 
 
-@router.post("/submit")
-def submit_survey(payload: SurveyInput, background_tasks: BackgroundTasks):
+def _write_input_files(student_id, input_data):
+    """파이프라인 입력 저장: 학번별 파일 + 최근 제출(input.json, 레거시 run_pipeline용)"""
+    input_path = SURVEY_INPUT_DIR / f"{student_id}_input.json"
+    for path in (input_path, INPUT_JSON):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(input_data, f, ensure_ascii=False, indent=2)
+    return input_path
+
+
+def _append_user_row(row):
+    write_header = not USERS_CSV.exists()
+    with open(USERS_CSV, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(["user_id", "name", "student_id", "rotate", "created_at"])
+        writer.writerow(row)
+
+
+def _register_user(student_id, name, input_data):
     """
-    구글폼 설문 제출 → 파이프라인 실행
+    중복 체크 → user_id 발급 → 입력 저장 → users.csv 등록 (워커 스레드에서 실행)
+    파일 잠금 안에서 처리하므로 여러 워커가 같은 user_id를 발급하지 않습니다.
+    이미 등록된 학번이면 None 반환
     """
-    try:
-        responses = payload.responses
-        student_id = responses.studentID.strip()
-        name = responses.name.strip()
-        
+    with file_lock(USERS_LOCK):
         # 1. 중복 체크
-        if USERS_CSV.exists():
-            with open(USERS_CSV, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get("student_id") == student_id:
-                        raise HTTPException(
-                            status_code=400, 
-                            detail=f"이미 제출된 학번입니다: {student_id}"
-                        )
-        
+        user_index.refresh()
+        if user_index.get(student_id):
+            return None
+
         # 2. user_id 생성
         user_id = generate_user_id()
-        
+
         # 3. plan_order 결정 (랜덤 로테이션)
-        import random
         plan_order = ["hybrid", "popularity", "personalized"]
         random.shuffle(plan_order)
-        
+
         # 4. input.json 생성 (파이프라인 입력용)
+        input_path = _write_input_files(student_id, input_data)
+        print(f"[INPUT JSON] {student_id} input.json 생성 완료")
+
+        # 5. users.csv에 임시 등록 (파이프라인 완료 후 플랜이 생성됨)
+        _append_user_row([
+            user_id,
+            name,
+            student_id,
+            json.dumps(plan_order, ensure_ascii=False),
+            datetime.utcnow().isoformat()
+        ])
+        user_index.refresh()
+        return user_id, plan_order, input_path
+
+
+@router.post("/submit")
+async def submit_survey(payload: SurveyInput):
+    """
+    구글폼 설문 제출 → 파이프라인 실행
+    """
+    try:
+        responses = payload.responses
+        student_id = responses.studentID.strip()
+        name = responses.name.strip()
+
+        if not STUDENT_ID_PATTERN.match(student_id):
+            raise HTTPException(status_code=400, detail="학번 형식이 올바르지 않습니다. (영문/숫자만 허용)")
+
         input_data = {
             "responses": {
                 "name": name,
@@ -163,32 +170,28 @@ def submit_survey(payload: SurveyInput, background_tasks: BackgroundTasks):
             "timestamp": payload.timestamp or datetime.utcnow().isoformat(),
             "formUrl": payload.formUrl or ""
         }
-        
-        with open(INPUT_JSON, "w", encoding="utf-8") as f:
-            json.dump(input_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"[INPUT JSON] {student_id} input.json 생성 완료")
-        
-        # 5. users.csv에 임시 등록 (파이프라인 완료 후 플랜이 생성됨)
-        write_header = not USERS_CSV.exists()
-        with open(USERS_CSV, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            if write_header:
-                writer.writerow(["user_id", "name", "student_id", "rotate", "created_at"])
-            writer.writerow([
-                user_id,
-                name,
-                student_id,
-                json.dumps(plan_order, ensure_ascii=False),
-                datetime.utcnow().isoformat()
-            ])
-        
+        if responses.duration_days:
+            input_data["responses"]["duration_days"] = responses.duration_days
+        if responses.region:
+            try:
+                input_data["responses"]["region"] = validate_region(responses.region)
+            except UnknownRegion as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        registered = await run_in_threadpool(_register_user, student_id, name, input_data)
+        if registered is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"이미 제출된 학번입니다: {student_id}"
+            )
+        user_id, plan_order, input_path = registered
+
         print(f"[USER REGISTERED] {user_id} ({name} / {student_id})")
-        
-        # 6. 백그라운드에서 파이프라인 실행
-        background_tasks.add_task(run_pipeline_for_student, student_id)
-        
-        # 7. 즉시 응답 (백그라운드 작업은 계속 실행됨)
+
+        # 6. 파이프라인 작업 등록 (asyncio 서브프로세스, 스레드풀 미사용)
+        job = await pipeline_jobs.submit(student_id, input_path)
+
+        # 7. 즉시 응답 (작업은 계속 실행됨)
         return {
             "status": "processing",
             "message": f"설문이 제출되었습니다. 여행 플랜을 생성 중입니다.",
@@ -196,9 +199,10 @@ def submit_survey(payload: SurveyInput, background_tasks: BackgroundTasks):
             "student_id": student_id,
             "name": name,
             "plan_order": plan_order,
+            "job_id": job["job_id"],
             "estimated_time": "약 20-30초 소요됩니다."
         }
-        
+
     except HTTPException:
         raise
     except Exception as e:
@@ -206,45 +210,158 @@ def submit_survey(payload: SurveyInput, background_tasks: BackgroundTasks):
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
 
+def _apply_changes(student_id, changes):
+    """학번별 설문 입력 파일에 변경 반영 (이후 전체 재실행이 새 값을 보도록). 입력 파일이 없으면 None"""
+    input_path = SURVEY_INPUT_DIR / f"{student_id}_input.json"
+    if not input_path.exists():
+        return None
+    with open(input_path, "r", encoding="utf-8") as f:
+        input_data = json.load(f)
+    input_data["responses"].update(changes)
+    write_json_atomic(input_path, input_data)
+    return input_path
+
+
+def _replan(student_id, user_id, changes):
+    """
+    증분 재계획 시도 (워커 스레드에서 실행)
+    ("incremental", 단계 리포트) 또는 전체 파이프라인이 필요하면 ("full", 입력 파일 경로) 반환,
+    같은 학번 파이프라인 작업이 대기/실행 중이면 아무것도 바꾸지 않고 ("busy", None)
+    """
+    # clustering/pandas 는 첫 재계획 요청 때 로드 (라우터 import 시에는 로드하지 않음)
+    from planning.replan import needs_full_run, replan_budget, ReplanUnavailable
+
+    with file_lock(REPLAN_LOCK_DIR / f"{student_id}.lock"):
+        # 진행 중 확인도 잠금 안에서 (전체 실행이 중간 결과를 쓰는 동안 입력 / 플랜을 건드리지 않도록)
+        if in_flight_job(student_id):
+            return "busy", None
+        input_path = _apply_changes(student_id, changes)
+        if not needs_full_run(changes):
+            try:
+                return "incremental", replan_budget(student_id, changes["budget"], PLANS_DIR / f"{user_id}.json")
+            except ReplanUnavailable as e:
+                print(f"[REPLAN] {e} → 전체 파이프라인 실행")
+        return "full", input_path
+
+
+@router.post("/replan")
+async def replan_survey(payload: ReplanRequest):
+    """
+    설문 항목 일부 변경 → 영향받는 단계만 다시 실행
+    예산만 바뀌면 저장된 점수/클러스터 결과로 숙소 + hybrid 일정만 다시 계산해 바로 응답하고,
+    그 외 항목이 바뀌면 전체 파이프라인 작업을 등록합니다.
+    """
+    student_id = payload.student_id.strip()
+    if not STUDENT_ID_PATTERN.match(student_id):
+        raise HTTPException(status_code=400, detail="학번 형식이 올바르지 않습니다. (영문/숫자만 허용)")
+
+    changes = dict(payload.changes)
+    unknown = set(changes) - REPLAN_FIELDS
+    if not changes or unknown:
+        raise HTTPException(status_code=400, detail=f"변경할 수 없는 항목입니다: {sorted(unknown) or '없음'}")
+    if "budget" in changes:
+        try:
+            budget = int(str(changes["budget"]).strip())
+        except ValueError:
+            budget = -1
+        if budget < 0:
+            raise HTTPException(status_code=400, detail="예산은 0 이상의 정수여야 합니다.")
+        changes["budget"] = str(budget)
+    if "region" in changes:
+        try:
+            changes["region"] = validate_region(changes["region"])
+        except UnknownRegion as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    await user_index.arefresh()
+    user = user_index.get(student_id)
+    user_id = user.get("user_id") if user else None
+    if not user_id:
+        raise HTTPException(status_code=404, detail="해당 학번을 찾을 수 없습니다.")
+
+    try:
+        mode, result = await run_in_threadpool(_replan, student_id, user_id, changes)
+    except Exception as e:
+        print(f"[ERROR] 재계획 오류: {e}")
+        raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
+
+    if mode == "busy":
+        raise HTTPException(status_code=409, detail="플랜을 생성 중입니다. 완료 후 다시 시도해주세요.")
+
+    if mode == "incremental":
+        return {
+            "status": "completed",
+            "mode": "incremental",
+            "user_id": user_id,
+            "student_id": student_id,
+            "stages": [s["stage"] for s in result["stages"]],
+            "elapsed_s": result["total"]["wall_s"]
+        }
+
+    if result is None:
+        raise HTTPException(status_code=409, detail="저장된 설문 입력이 없어 플랜을 다시 생성할 수 없습니다.")
+    job = await pipeline_jobs.submit(student_id, result)
+    return {
+        "status": "processing",
+        "mode": "full",
+        "message": "변경 사항으로 여행 플랜을 다시 생성 중입니다.",
+        "user_id": user_id,
+        "student_id": student_id,
+        "job_id": job["job_id"]
+    }
+
+
+@router.get("/regions")
+async def list_regions():
+    """설문에서 고를 수 있는 여행 지역"""
+    return {"regions": available_regions()}
+
+
 @router.get("/status/{student_id}")
-def check_status(student_id: str):
+async def check_status(student_id: str):
     """
     플랜 생성 상태 확인
     """
     try:
-        # users.csv에서 user_id 찾기
-        if not USERS_CSV.exists():
+        # users.csv 인덱스에서 user_id 찾기
+        await user_index.arefresh()
+        if not user_index.exists():
             raise HTTPException(status_code=404, detail="등록된 사용자가 없습니다.")
-        
-        user_id = None
-        with open(USERS_CSV, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get("student_id") == student_id:
-                    user_id = row.get("user_id")
-                    break
-        
+
+        user = user_index.get(student_id)
+        user_id = user.get("user_id") if user else None
+
         if not user_id:
             raise HTTPException(status_code=404, detail="해당 학번을 찾을 수 없습니다.")
-        
-        # 플랜 파일 존재 여부 확인
+
+        # 플랜 파일 존재 여부 확인 (재계획으로 전체 파이프라인이 다시 도는 중이면 processing)
         plan_file = PLANS_DIR / f"{user_id}.json"
-        
-        if plan_file.exists():
+        job = await pipeline_jobs.get(student_id)
+
+        if plan_file.exists() and not (job and job["status"] in IN_FLIGHT):
             return {
                 "status": "completed",
                 "message": "플랜 생성이 완료되었습니다.",
                 "user_id": user_id,
                 "student_id": student_id
             }
-        else:
+
+        if job and job["status"] in ("failed", "timeout"):
             return {
-                "status": "processing",
-                "message": "플랜을 생성 중입니다. 잠시만 기다려주세요.",
+                "status": "failed",
+                "message": "플랜 생성에 실패했습니다. 관리자에게 문의해주세요.",
                 "user_id": user_id,
-                "student_id": student_id
+                "student_id": student_id,
+                "job_id": job["job_id"]
             }
-            
+
+        return {
+            "status": "processing",
+            "message": "플랜을 생성 중입니다. 잠시만 기다려주세요.",
+            "user_id": user_id,
+            "student_id": student_id
+        }
+
     except HTTPException:
         raise
     except Exception as e:
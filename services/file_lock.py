@@ -0,0 +1,72 @@
+# services/file_lock.py
+"""
+프로세스 간 파일 잠금 (uvicorn --workers N 환경용)
+Linux에서는 fcntl.flock을 사용하고, fcntl이 없는 환경(Windows 로컬 개발)에서는
+프로세스 내부 잠금으로 대체합니다. 이 경우 워커 1개 실행만 지원합니다.
+"""
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def _local_lock(path):
+    with _local_locks_guard:
+        return _local_locks.setdefault(str(path), threading.Lock())
+
+
+@contextmanager
+def file_lock(path):
+    """배타 잠금 (블로킹). async 핸들러에서는 워커 스레드에서 사용"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        with _local_lock(path):
+            yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class HeldLock:
+    """try_lock()으로 잡은 잠금. release()로 해제"""
+
+    def __init__(self, file=None, local=None):
+        self._file = file
+        self._local = local
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        if self._local is not None:
+            self._local.release()
+            self._local = None
+
+
+def try_lock(path):
+    """논블로킹 배타 잠금. 잡으면 HeldLock, 다른 프로세스가 잡고 있으면 None"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        lock = _local_lock(path)
+        return HeldLock(local=lock) if lock.acquire(blocking=False) else None
+    f = open(path, "a")
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return HeldLock(file=f)
@@ -0,0 +1,331 @@
+# services/jobs.py
+"""
+플랜 생성 작업 관리
+process_single_student.py 를 asyncio 서브프로세스로 실행해서
+작업 대기 중에도 이벤트 루프와 공용 스레드풀을 점유하지 않습니다.
+
+uvicorn --workers N 으로 여러 프로세스가 떠 있어도 동작하도록
+- 작업 레코드는 data/jobs/{student_id}.json 에 저장하고 (상태 조회는 어느 워커에서든 가능)
+- 동시 실행 수(PIPELINE_CONCURRENCY)는 data/jobs/slots/ 의 파일 잠금으로 전체 워커 합계 기준으로 제한합니다.
+
+실패/타임아웃 시 PIPELINE_MAX_ATTEMPTS 회까지 다시 실행합니다 (시도 사이 PIPELINE_RETRY_BACKOFF × 2^n 초 대기,
+대기 중에는 실행 슬롯을 반납). 파이프라인이 단계별 체크포인트를 남기므로 재시도는 마지막 성공 단계 다음부터 재개하고,
+작업 레코드의 reused_stages 에 건너뛴 단계가 남습니다.
+
+같은 학번에는 대기/실행 중 작업이 하나만 있습니다: 등록은 학번별 파일 잠금(data/jobs/locks/) 안에서
+디스크 레코드를 확인하고, 진행 중 작업이 있으면 새로 실행하지 않고 그 작업을 반환합니다.
+증분 재계획(routers/survey.py)도 같은 잠금 안에서 진행 중 작업을 확인합니다.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from services.file_lock import file_lock, try_lock
+from services import metrics
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PLANNING_DIR = BASE_DIR / "planning"
+JOBS_DIR = BASE_DIR / "data" / "jobs"
+SLOTS_DIR = JOBS_DIR / "slots"
+REPORTS_DIR = JOBS_DIR / "reports"  # 서브프로세스 단계 리포트 (읽은 뒤 삭제)
+LOCKS_DIR = JOBS_DIR / "locks"  # 학번별 잠금 (작업 등록 / 증분 재계획 / 플랜 편집 공용, 워커 간)
+
+PIPELINE_TIMEOUT = int(os.getenv("PIPELINE_TIMEOUT", "300"))  # 5분 타임아웃
+PIPELINE_CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", "4"))  # 동시 실행 작업 수 (전체 워커 합계)
+MAX_JOB_RECORDS = 1000  # 워커별 인메모리 작업 레코드 상한
+SLOT_POLL_INTERVAL = 0.5  # 실행 슬롯 대기 폴링 간격 (초)
+PIPELINE_MAX_ATTEMPTS = max(1, int(os.getenv("PIPELINE_MAX_ATTEMPTS", "2")))  # 첫 실행 포함 최대 시도 수
+PIPELINE_RETRY_BACKOFF = float(os.getenv("PIPELINE_RETRY_BACKOFF", "2"))  # 재시도 전 대기 (초, 시도마다 2배)
+RETRY_STATUSES = ("failed", "timeout")
+IN_FLIGHT = ("queued", "running")
+
+
+def _ascii_only(text, limit=500):
+    """로그 출력용 (인코딩 문제 방지: ASCII 범위 외 문자 제거)"""
+    text = text[-limit:] if len(text) > limit else text
+    return text.encode("ascii", errors="ignore").decode("ascii")
+
+
+def _job_path(student_id):
+    return JOBS_DIR / f"{student_id}.json"
+
+
+def _save_job(job):
+    """작업 레코드 저장 (임시 파일 → 교체)"""
+    JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    path = _job_path(job["student_id"])
+    fd, tmp = tempfile.mkstemp(dir=JOBS_DIR, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _load_job(student_id):
+    if Path(student_id).name != student_id:  # 경로 구분자 포함 학번은 조회하지 않음
+        return None
+    try:
+        with open(_job_path(student_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def student_lock_path(student_id):
+    return LOCKS_DIR / f"{student_id}.lock"
+
+
+def in_flight_job(student_id):
+    """디스크 작업 레코드 기준 대기/실행 중 작업 (없으면 None). 학번별 잠금 안에서 호출"""
+    job = _load_job(str(student_id))
+    return job if job and job.get("status") in IN_FLIGHT else None
+
+
+def _claim(job):
+    """학번별 잠금 안에서 진행 중 작업이 없을 때만 레코드 저장 → (등록한 작업 또는 진행 중 작업, 새로 등록했는지)"""
+    with file_lock(student_lock_path(job["student_id"])):
+        existing = in_flight_job(job["student_id"])
+        if existing is not None:
+            return existing, False
+        _save_job(job)
+        return job, True
+
+
+def _read_report(path):
+    """서브프로세스가 남긴 단계 리포트 읽고 삭제 (없거나 깨졌으면 None)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def disk_status_counts():
+    """data/jobs 레코드 기준 상태별 작업 수 (전체 워커 합계)"""
+    counts = {}
+    if not JOBS_DIR.exists():
+        return counts
+    for path in JOBS_DIR.glob("*.json"):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                status = json.load(f).get("status")
+        except (OSError, json.JSONDecodeError):
+            continue
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+class PipelineJobs:
+    """학번별 작업 레코드 + 동시 실행 제한"""
+
+    def __init__(self, concurrency=PIPELINE_CONCURRENCY, timeout=PIPELINE_TIMEOUT,
+                 max_attempts=PIPELINE_MAX_ATTEMPTS, retry_backoff=PIPELINE_RETRY_BACKOFF):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._jobs = OrderedDict()  # 이 워커가 실행한 최근 작업 (MAX_JOB_RECORDS개까지)
+        self._tasks = set()
+
+    def _remember(self, job):
+        self._jobs[job["student_id"]] = job
+        self._jobs.move_to_end(job["student_id"])
+        while len(self._jobs) > MAX_JOB_RECORDS:
+            self._jobs.popitem(last=False)
+
+    async def _persist(self, job):
+        await asyncio.to_thread(_save_job, dict(job))
+
+    async def get(self, student_id):
+        """학번의 최근 작업 레코드 (없으면 None). 다른 워커가 실행한 작업은 디스크에서 조회"""
+        student_id = str(student_id)
+        job = self._jobs.get(student_id)
+        if job is not None:
+            return job
+        return await asyncio.to_thread(_load_job, student_id)
+
+    def counts(self):
+        """이 워커의 상태별 작업 수"""
+        counts = {}
+        for job in self._jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
+
+    async def _acquire_slot(self):
+        """전체 워커 공용 실행 슬롯 1개 확보 (빈 슬롯이 생길 때까지 대기)"""
+        while True:
+            for i in range(self.concurrency):
+                held = await asyncio.to_thread(try_lock, SLOTS_DIR / f"slot{i}.lock")
+                if held is not None:
+                    return held
+            await asyncio.sleep(SLOT_POLL_INTERVAL)
+
+    async def submit(self, student_id, input_path=None):
+        """
+        작업 등록 후 바로 반환 (실행은 이벤트 루프의 태스크에서 진행)
+        같은 학번 작업이 대기/실행 중이면 (다른 워커 포함) 새로 실행하지 않고 그 작업 레코드를 반환
+        """
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "student_id": str(student_id),
+            "status": "queued",
+            "submitted_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "returncode": None,
+            "error": None,
+            "stages": None,
+            "peak_rss_mb": None,
+            "attempts": [],  # 시도별 {attempt, status, returncode, reused_stages, error}
+            "reused_stages": [],  # 마지막 시도에서 체크포인트로 건너뛴 단계
+        }
+        job, created = await asyncio.to_thread(_claim, job)
+        if not created:
+            print(f"[PIPELINE] {student_id} - already in flight ({job['job_id']})")
+            return job
+        self._remember(job)
+        task = asyncio.get_running_loop().create_task(self._run(job, input_path))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job, input_path):
+        """실패/타임아웃이면 max_attempts까지 재시도 (시도 사이에는 슬롯 반납 후 backoff 대기)"""
+        student_id = job["student_id"]
+        started = time.perf_counter()
+        for attempt in range(1, self.max_attempts + 1):
+            record = await self._run_attempt(job, input_path, attempt)
+            retry = record["status"] in RETRY_STATUSES and attempt < self.max_attempts
+            # 재시도 대기 중에는 queued (상태 조회에서 실패로 보이지 않도록), 시도별 오류는 attempts에 남음
+            job["status"] = "queued" if retry else record["status"]
+            if not retry:
+                break
+            delay = self.retry_backoff * 2 ** (attempt - 1)
+            print(f"[PIPELINE RETRY] {student_id} - attempt {attempt + 1}/{self.max_attempts} in {delay:.1f}s")
+            metrics.pipeline_job_retries_total.inc()
+            await self._persist(job)
+            await asyncio.sleep(delay)
+
+        metrics.pipeline_jobs_total.inc(job["status"])
+        metrics.pipeline_job_duration_seconds.observe(time.perf_counter() - started)
+        job["finished_at"] = datetime.utcnow().isoformat()
+        await self._persist(job)
+
+    async def _run_attempt(self, job, input_path, attempt):
+        """
+        서브프로세스 1회 실행 (슬롯 확보 → 실행 → 단계 리포트 반영 → 슬롯 반납)
+        시도 기록 {attempt, status, returncode, reused_stages, error} 반환 (job["status"]는 호출한 쪽에서 결정)
+        """
+        student_id = job["student_id"]
+        queued_at = time.perf_counter()
+        slot = await self._acquire_slot()
+        metrics.pipeline_queue_wait_seconds.observe(time.perf_counter() - queued_at)
+        report_path = REPORTS_DIR / f"{job['job_id']}_{attempt}.json"
+        record = {"attempt": attempt, "status": None, "returncode": None, "reused_stages": [], "error": None}
+        try:
+            job["status"] = "running"
+            job["started_at"] = job["started_at"] or datetime.utcnow().isoformat()
+            await self._persist(job)
+            print(f"\n[PIPELINE START] {student_id} - Plan generation started (job {job['job_id']}, attempt {attempt})")
+
+            args = [sys.executable, str(PLANNING_DIR / "process_single_student.py"), student_id]
+            if input_path:
+                args.append(str(input_path))
+
+            REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+            # 단계 리포트 경로 + 프로파일 파일 이름용 job_id (PLANNER_PROFILE=1 이면 단계별 cProfile 저장)
+            env = dict(os.environ, PIPELINE_REPORT_PATH=str(report_path), PIPELINE_JOB_ID=job["job_id"])
+
+            proc = None
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *args,
+                    cwd=str(BASE_DIR),
+                    env=env,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=self.timeout)
+                record["returncode"] = proc.returncode
+
+                if proc.returncode == 0:
+                    record["status"] = "completed"
+                    print(f"[PIPELINE SUCCESS] {student_id} - Plan generated successfully")
+                else:
+                    record["status"] = "failed"
+                    # process_single_student는 오류를 stdout에 출력하므로 stderr가 비면 stdout 끝부분 사용
+                    output = stderr or stdout
+                    error_msg = _ascii_only(output.decode("utf-8", errors="replace")) if output else ""
+                    record["error"] = error_msg or f"return code {proc.returncode}"
+                    print(f"[PIPELINE ERROR] {student_id} - Failed with return code {proc.returncode}")
+                    if error_msg:
+                        print(f"STDERR: {error_msg}")
+
+            except asyncio.TimeoutError:
+                record["status"] = "timeout"
+                record["error"] = f"Exceeded {self.timeout} seconds"
+                print(f"[PIPELINE TIMEOUT] {student_id} - Exceeded {self.timeout} seconds")
+                if proc is not None and proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+            except asyncio.CancelledError:
+                # 서버 종료 등으로 태스크가 취소되면 자식 프로세스도 정리
+                if proc is not None and proc.returncode is None:
+                    proc.kill()
+                job["status"] = "failed"
+                job["error"] = "cancelled"
+                _save_job(dict(job))
+                raise
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"] = _ascii_only(str(e))
+                print(f"[PIPELINE ERROR] {student_id} - Exception: {_ascii_only(str(e))}")
+
+            report = await asyncio.to_thread(_read_report, report_path)
+            if report is not None:
+                # 단계별 시간/메모리 (PLANNER_MEMORY_TRACE=1 이면 상위 할당 위치 포함)
+                job["stages"] = report.get("stages")
+                job["peak_rss_mb"] = report.get("total", {}).get("peak_rss_mb")
+                record["reused_stages"] = report.get("reused") or []
+                metrics.observe_stage_report(report)
+
+            job["returncode"] = record["returncode"]
+            job["error"] = record["error"]
+            job["reused_stages"] = record["reused_stages"]
+            job["attempts"].append(record)
+            return record
+        finally:
+            slot.release()
+
+
+pipeline_jobs = PipelineJobs()
+
+
+def _queue_gauges():
+    counts = disk_status_counts()
+    return counts.get("queued", 0), counts.get("running", 0)
+
+
+metrics.registry.register(metrics.Gauge(
+    "pipeline_queue_depth", "Jobs waiting for an execution slot (all workers)",
+    lambda: _queue_gauges()[0]))
+metrics.registry.register(metrics.Gauge(
+    "pipeline_jobs_in_flight", "Jobs currently running (all workers)",
+    lambda: _queue_gauges()[1]))
+metrics.registry.register(metrics.Gauge(
+    "pipeline_concurrency_limit", "Configured PIPELINE_CONCURRENCY",
+    lambda: pipeline_jobs.concurrency))
@@ -0,0 +1,152 @@
+# services/metrics.py
+"""
+Prometheus 텍스트 포맷 메트릭 (/metrics)
+
+외부 라이브러리 없이 Counter / Histogram 과 스크레이프 시점에 계산하는 Gauge만 구현합니다.
+- HTTP 요청 수/지연시간 (라우트 템플릿 기준, main.py 미들웨어에서 기록)
+- 파이프라인 단계별 소요 시간 (서브프로세스가 남긴 단계 리포트를 services/jobs.py 가 기록)
+- 작업 대기열 깊이 / 실행 중 작업 수 / 플랜 캐시 적중률
+
+Counter/Histogram 값은 워커 프로세스별입니다 (uvicorn --workers N 이면 스크레이프한 워커의 값).
+대기열/실행 중 작업 수는 data/jobs 레코드 기준이라 전체 워커 합계입니다.
+"""
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+RSS_BUCKETS_MB = (1, 5, 10, 25, 50, 100, 200, 400, 800, 1600, 3200)
+
+
+def _labels_text(names, values, extra=None):
+    pairs = list(zip(names, values)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _num(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels_text(self.labelnames, labelvalues)} {_num(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}  # labelvalues -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            series = self._series.setdefault(labelvalues, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labelvalues, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _labels_text(self.labelnames, labelvalues, {"le": _num(bound)})
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _labels_text(self.labelnames, labelvalues)
+                lines.append(f"{self.name}_sum{labels} {_num(round(series[-2], 6))}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    """스크레이프 시점에 callback()으로 값을 계산하는 게이지 ({labelvalues: value} 또는 숫자)"""
+
+    def __init__(self, name, help_text, callback, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.callback = callback
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labelvalues, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels_text(self.labelnames, labelvalues)} {_num(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+
+pipeline_jobs_total = registry.register(Counter(
+    "pipeline_jobs_total", "Finished plan generation jobs by final status", ("status",)))
+pipeline_job_retries_total = registry.register(Counter(
+    "pipeline_job_retries_total", "Plan generation retries after a failed or timed-out attempt"))
+pipeline_stage_reused_total = registry.register(Counter(
+    "pipeline_stage_reused_total", "Pipeline stages skipped by resuming from a checkpoint", ("stage",)))
+pipeline_job_duration_seconds = registry.register(Histogram(
+    "pipeline_job_duration_seconds", "Plan generation job wall time (first attempt queued to final exit, incl. retries)",
+    buckets=STAGE_BUCKETS))
+pipeline_queue_wait_seconds = registry.register(Histogram(
+    "pipeline_queue_wait_seconds", "Time a job waited for an execution slot", buckets=STAGE_BUCKETS))
+pipeline_stage_duration_seconds = registry.register(Histogram(
+    "pipeline_stage_duration_seconds", "Pipeline stage wall time", ("stage",), buckets=STAGE_BUCKETS))
+pipeline_stage_peak_rss_delta_mb = registry.register(Histogram(
+    "pipeline_stage_peak_rss_delta_mb", "Growth of the pipeline process peak RSS during a stage (MB)",
+    ("stage",), buckets=RSS_BUCKETS_MB))
+pipeline_job_peak_rss_mb = registry.register(Histogram(
+    "pipeline_job_peak_rss_mb", "Peak RSS of a pipeline subprocess (MB)", buckets=RSS_BUCKETS_MB))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def observe_stage_report(report):
+    """process_single_student 단계 리포트({"stages": [...], "reused": [...], "total": {...}})를 메트릭에 기록"""
+    for stage in report.get("reused") or []:
+        pipeline_stage_reused_total.inc(stage)
+    for stage in report.get("stages", []):
+        pipeline_stage_duration_seconds.observe(stage["wall_s"], stage["stage"])
+        if stage.get("peak_rss_delta_mb") is not None:
+            pipeline_stage_peak_rss_delta_mb.observe(stage["peak_rss_delta_mb"], stage["stage"])
+    peak = report.get("total", {}).get("peak_rss_mb")
+    if peak is not None:
+        pipeline_job_peak_rss_mb.observe(peak)
@@ -0,0 +1,100 @@
+# services/plan_cache.py
+"""
+플랜 조회 응답 LRU 캐시
+user_id별로 직렬화가 끝난 응답 바이트와 ETag를 보관하고,
+플랜 파일(mtime/size) 또는 users.csv 버전이 바뀌면 다시 만듭니다.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from services import metrics
+
+CachedPlan = namedtuple("CachedPlan", ["body", "etag"])
+
+
+def make_etag(body):
+    """응답 바이트 기준 strong ETag"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더가 현재 ETag와 일치하는지 확인 (W/ 접두어, 복수 값, * 지원)"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class PlanCache:
+    """user_id → CachedPlan LRU"""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, user_id, plan_path, extra_version):
+        """
+        (캐시 항목 또는 None, 현재 버전) 반환.
+        plan_path가 없으면 FileNotFoundError를 그대로 올립니다.
+        """
+        st = os.stat(plan_path)
+        version = (st.st_mtime_ns, st.st_size, extra_version)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1], version
+            self.misses += 1
+        return None, version
+
+    def store(self, user_id, version, body):
+        """응답 바이트 저장 후 CachedPlan 반환"""
+        cached = CachedPlan(body=body, etag=make_etag(body))
+        with self._lock:
+            self._entries[user_id] = (version, cached)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return cached
+
+    def get(self, user_id, plan_path, extra_version, build):
+        """캐시된 응답 반환. 없거나 오래됐으면 build()로 응답 바이트를 만들어 저장"""
+        cached, version = self.lookup(user_id, plan_path, extra_version)
+        if cached is None:
+            cached = self.store(user_id, version, build())
+        return cached
+
+    def invalidate(self, user_id=None):
+        """특정 user_id(또는 전체) 캐시 제거"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+plan_cache = PlanCache()
+
+
+metrics.registry.register(metrics.Gauge(
+    "plan_cache_requests", "Plan response cache lookups by result (this worker)",
+    lambda: {("hit",): plan_cache.hits, ("miss",): plan_cache.misses}, ("result",)))
+metrics.registry.register(metrics.Gauge(
+    "plan_cache_hit_ratio", "Plan response cache hit ratio (this worker)",
+    lambda: plan_cache.hits / (plan_cache.hits + plan_cache.misses) if plan_cache.hits + plan_cache.misses else 0.0))
+metrics.registry.register(metrics.Gauge(
+    "plan_cache_entries", "Plan response cache entries (this worker)",
+    lambda: len(plan_cache._entries)))
@@ -0,0 +1,78 @@
+# services/user_index.py
+"""
+users.csv 인메모리 인덱스
+파일이 바뀌었을 때(mtime/size 변경)만 다시 읽고, 나머지 요청은 메모리에서 바로 조회합니다.
+"""
+import asyncio
+import csv
+import os
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+USERS_CSV = BASE_DIR / "data" / "users.csv"
+
+
+class UserIndex:
+    """
+    학번(student_id) → 사용자 행(dict) 인덱스
+
+    조회 메서드는 마지막으로 읽은 스냅샷만 보고 파일을 다시 읽지 않습니다.
+    다시 읽기는 refresh()(동기, 워커 스레드용) / arefresh()(async 핸들러용)에서만 일어납니다.
+    """
+
+    def __init__(self, csv_path):
+        self.csv_path = Path(csv_path)
+        self._lock = threading.Lock()
+        # (stamp, 학번 → 행, user_id 집합) — 통째로 교체해서 읽는 쪽이 항상 일관된 스냅샷을 보도록
+        self._snapshot = (None, {}, frozenset())
+
+    def _current_stamp(self):
+        try:
+            st = os.stat(self.csv_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def refresh(self):
+        """파일이 바뀐 경우에만 다시 읽기 (블로킹, 이벤트 루프에서 직접 호출하지 말 것)"""
+        stamp = self._current_stamp()
+        if stamp == self._snapshot[0]:
+            return
+        with self._lock:
+            if stamp == self._snapshot[0]:
+                return
+            by_student, user_ids = {}, set()
+            if stamp is not None:
+                with open(self.csv_path, "r", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        # 같은 학번이 여러 번 있으면 처음 등록된 행 기준 (기존 선형 탐색과 동일)
+                        by_student.setdefault(row.get("student_id"), row)
+                        if row.get("user_id"):
+                            user_ids.add(row["user_id"])
+            self._snapshot = (stamp, by_student, frozenset(user_ids))
+
+    async def arefresh(self):
+        """async 핸들러용: 파일이 바뀐 경우에만 워커 스레드에서 다시 읽기"""
+        if self._current_stamp() != self._snapshot[0]:
+            await asyncio.to_thread(self.refresh)
+
+    def exists(self):
+        """users.csv 존재 여부 (스냅샷 기준)"""
+        return self._snapshot[0] is not None
+
+    @property
+    def version(self):
+        """인덱스 버전 (파일 mtime/size). 캐시 무효화 키로 사용"""
+        return self._snapshot[0]
+
+    def get(self, student_id):
+        """학번으로 사용자 행 조회 (없으면 None)"""
+        return self._snapshot[1].get(str(student_id))
+
+    def user_ids(self):
+        """등록된 user_id 전체"""
+        return self._snapshot[2]
+
+
+user_index = UserIndex(USERS_CSV)